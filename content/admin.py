@@ -1,10 +1,22 @@
-from django.contrib import admin
-from .models import Service, Feature, ServiceBooking, ContactSubmission, NewsletterSubscriber, Blog
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+
+from . import archive, bookings, identity, search, spam
+from .decorators import replica_reads
+from .models import (
+    Service, Feature, ServiceBooking, ContactSubmission, NewsletterSubscriber, Blog, WebsiteContent,
+    DashboardCounter, ClientInteraction, OutboundEmail, QuarantinedSubmission, AdminDigestItem,
+    BookingReminder, JournalReplay,
+)
+
 
 class FeatureInline(admin.TabularInline):
     model = Feature
     extra = 1
 
+
 @admin.register(Service)
 class ServiceAdmin(admin.ModelAdmin):
     list_display = ['name', 'category', 'price', 'is_active', 'created_at']
@@ -23,19 +35,68 @@ class ServiceAdmin(admin.ModelAdmin):
         }),
     )
 
+
 @admin.register(Feature)
 class FeatureAdmin(admin.ModelAdmin):
     list_display = ['name', 'service']
     list_filter = ['service']
     search_fields = ['name', 'service__name']
 
+
+class ArchiveAdminMixin:
+    """Adds an 'archive/' page to search and restore rows moved out by archive_submissions"""
+    archive_kind = None
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        urls = [
+            path('archive/', self.admin_site.admin_view(self.archive_view), name='%s_%s_archive' % info),
+        ]
+        return urls + super().get_urls()
+
+    def archive_view(self, request):
+        if request.method == 'POST':
+            if not self.has_add_permission(request):
+                return redirect(request.get_full_path())
+            ids = [int(pk) for pk in request.POST.getlist('restore') if pk.isdigit()]
+            restored = archive.restore(self.archive_kind, ids)
+            self.message_user(request, f'Restored {restored} archived row{"s" if restored != 1 else ""}.', messages.SUCCESS)
+            return redirect(request.get_full_path())
+
+        term = request.GET.get('q', '').strip()
+        start_month = request.GET.get('from', '').strip() or None
+        end_month = request.GET.get('to', '').strip() or None
+        rows = archive.search(self.archive_kind, term, start_month, end_month)
+        live = set(self.model.objects.filter(pk__in=[row['id'] for row in rows]).values_list('pk', flat=True))
+        for row in rows:
+            row['restored'] = row['id'] in live
+            row['cells'] = [row.get(column, '') for column in self.archive_columns]
+        context = dict(
+            self.admin_site.each_context(request),
+            title=f'Archived {self.model._meta.verbose_name_plural}',
+            opts=self.model._meta,
+            term=term,
+            start_month=start_month or '',
+            end_month=end_month or '',
+            rows=rows,
+            changelist_url=reverse('admin:%s_%s_changelist' % (self.model._meta.app_label, self.model._meta.model_name)),
+            archived_before=archive.archived_before(self.archive_kind),
+            columns=self.archive_columns,
+        )
+        return TemplateResponse(request, 'admin/content/archive.html', context)
+
+
 @admin.register(ServiceBooking)
-class ServiceBookingAdmin(admin.ModelAdmin):
+class ServiceBookingAdmin(ArchiveAdminMixin, admin.ModelAdmin):
     list_display = ['full_name', 'phone', 'service_type', 'session_mode', 'preferred_date', 'preferred_time', 'status', 'submitted_at']  # ADDED session_mode
     list_filter = ['service_type', 'session_mode', 'status', 'submitted_at', 'preferred_date']  # ADDED session_mode
     search_fields = ['full_name', 'phone', 'description']
     readonly_fields = ['submitted_at']
     list_editable = ['status']
+    change_list_template = 'admin/content/servicebooking/change_list.html'
+    archive_kind = 'booking'
+    archive_columns = ['full_name', 'email', 'phone', 'service_type', 'preferred_date', 'status']
+    actions = ['mark_confirmed', 'mark_completed', 'mark_cancelled']
     
     fieldsets = (
         ('Client Information', {
@@ -49,13 +110,51 @@ class ServiceBookingAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_urls(self):
+        urls = [
+            path('analytics/', self.admin_site.admin_view(self.analytics_view), name='content_servicebooking_analytics'),
+        ]
+        return urls + super().get_urls()
+
+    def _transition(self, request, queryset, status):
+        count = bookings.transition(queryset, status)
+        self.message_user(
+            request,
+            f'Marked {count} booking{"s" if count != 1 else ""} as {status}; client emails are queued.',
+            messages.SUCCESS,
+        )
+
+    @admin.action(description='Mark selected bookings as confirmed', permissions=['change'])
+    def mark_confirmed(self, request, queryset):
+        self._transition(request, queryset, 'confirmed')
+
+    @admin.action(description='Mark selected bookings as completed', permissions=['change'])
+    def mark_completed(self, request, queryset):
+        self._transition(request, queryset, 'completed')
+
+    @admin.action(description='Mark selected bookings as cancelled', permissions=['change'])
+    def mark_cancelled(self, request, queryset):
+        self._transition(request, queryset, 'cancelled')
+
+    def analytics_view(self, request):
+        context = dict(
+            self.admin_site.each_context(request),
+            title='Booking analytics',
+            opts=self.model._meta,
+        )
+        return TemplateResponse(request, 'admin/content/servicebooking/analytics.html', context)
+
+
 @admin.register(ContactSubmission)
-class ContactSubmissionAdmin(admin.ModelAdmin):
+class ContactSubmissionAdmin(ArchiveAdminMixin, admin.ModelAdmin):
     list_display = ['name', 'email', 'subject', 'submitted_at', 'is_read']
     list_filter = ['is_read', 'submitted_at']
     search_fields = ['name', 'email', 'subject']
     readonly_fields = ['submitted_at']
     list_editable = ['is_read']
+    archive_kind = 'contact'
+    archive_columns = ['name', 'email', 'subject', 'is_read']
+
 
 @admin.register(NewsletterSubscriber)
 class NewsletterSubscriberAdmin(admin.ModelAdmin):
@@ -64,6 +163,7 @@ class NewsletterSubscriberAdmin(admin.ModelAdmin):
     search_fields = ['email']
     list_editable = ['is_active']
 
+
 @admin.register(Blog)
 class BlogAdmin(admin.ModelAdmin):
     list_display = ['title', 'is_published', 'created_at', 'updated_at']
@@ -71,13 +171,162 @@ class BlogAdmin(admin.ModelAdmin):
     search_fields = ['title', 'excerpt', 'content']
     list_editable = ['is_published']
     readonly_fields = ['created_at', 'updated_at']
+    prepopulated_fields = {'slug': ('title',)}
     
     fieldsets = (
         ('Blog Content', {
-            'fields': ('title', 'excerpt', 'content', 'image')
+            'fields': ('title', 'slug', 'excerpt', 'content', 'image')
         }),
         ('Publication Settings', {
             'fields': ('is_published', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the full-text index instead of icontains over the TextFields
+        if not search_term or search.backend() == 'basic':
+            return super().get_search_results(request, queryset, search_term)
+        ids, _ = search.search_ids(search_term, published_only=False)
+        return queryset.filter(pk__in=ids), False
+
+
+@admin.register(WebsiteContent)
+class WebsiteContentAdmin(admin.ModelAdmin):
+    list_display = ['key', 'content_type', 'value', 'updated_at']
+    list_filter = ['content_type']
+    search_fields = ['key', 'value']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(DashboardCounter)
+class DashboardCounterAdmin(admin.ModelAdmin):
+    list_display = ['name', 'value', 'updated_at']
+    readonly_fields = ['name', 'value', 'updated_at']
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ClientInteraction)
+class ClientInteractionAdmin(admin.ModelAdmin):
+    list_display = ['occurred_at', 'kind', 'name', 'email', 'phone', 'summary', 'archived']
+    list_filter = ['kind', 'archived']
+    readonly_fields = ['kind', 'object_id', 'email', 'phone', 'name', 'summary', 'occurred_at', 'archived']
+    search_fields = ['email']
+    search_help_text = 'Exact email address or phone number'
+    change_list_template = 'admin/content/clientinteraction/change_list.html'
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_search_results(self, request, queryset, search_term):
+        # Exact lookups on the normalized, indexed columns
+        if not search_term:
+            return queryset, False
+        if '@' in search_term:
+            return queryset.filter(email=identity.normalize_email(search_term)), False
+        return queryset.filter(phone=identity.normalize_phone(search_term)), False
+
+    def get_urls(self):
+        urls = [
+            path('timeline/', self.admin_site.admin_view(self.timeline_view), name='content_clientinteraction_timeline'),
+        ]
+        return urls + super().get_urls()
+
+    @replica_reads
+    def timeline_view(self, request):
+        term = request.GET.get('q', '').strip()
+        interactions = identity.timeline(term) if term else []
+        admin_urls = {
+            'booking': 'admin:content_servicebooking_change',
+            'contact': 'admin:content_contactsubmission_change',
+            'subscription': 'admin:content_newslettersubscriber_change',
+        }
+        archive_urls = {
+            'booking': 'admin:content_servicebooking_archive',
+            'contact': 'admin:content_contactsubmission_archive',
+        }
+        for interaction in interactions:
+            if interaction.archived:
+                interaction.admin_url_name = archive_urls[interaction.kind]
+            else:
+                interaction.admin_url_name = admin_urls[interaction.kind]
+        context = dict(
+            self.admin_site.each_context(request),
+            title='Client timeline',
+            opts=self.model._meta,
+            term=term,
+            interactions=interactions,
+            emails=sorted({i.email for i in interactions if i.email}),
+            phones=sorted({i.phone for i in interactions if i.phone}),
+        )
+        return TemplateResponse(request, 'admin/content/clientinteraction/timeline.html', context)
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'to', 'created_at', 'sent_at', 'attempts', 'next_attempt_at']
+    list_filter = [('sent_at', admin.EmptyFieldListFilter), 'created_at']
+    search_fields = ['to', 'subject']
+    readonly_fields = ['to', 'subject', 'body', 'html_body', 'created_at', 'sent_at', 'attempts', 'last_error',
+                       'deferrals', 'next_attempt_at']
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(AdminDigestItem)
+class AdminDigestItemAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'kind', 'created_at', 'sent_at']
+    list_filter = ['kind', ('sent_at', admin.EmptyFieldListFilter), 'created_at']
+    search_fields = ['subject']
+    readonly_fields = ['kind', 'subject', 'body', 'created_at', 'sent_at']
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(BookingReminder)
+class BookingReminderAdmin(admin.ModelAdmin):
+    list_display = ['booking', 'offset_minutes', 'skipped', 'created_at', 'sent_at']
+    list_filter = ['offset_minutes', 'skipped', 'created_at']
+    search_fields = ['booking__full_name', 'booking__email']
+    list_select_related = ['booking']
+    readonly_fields = ['booking', 'offset_minutes', 'claimed_by', 'skipped', 'created_at', 'sent_at']
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(JournalReplay)
+class JournalReplayAdmin(admin.ModelAdmin):
+    list_display = ['entry_id', 'kind', 'journaled_at', 'replayed_at', 'rejected']
+    list_filter = ['rejected', 'kind', 'replayed_at']
+    search_fields = ['entry_id']
+    readonly_fields = ['entry_id', 'kind', 'journaled_at', 'replayed_at', 'rejected', 'error', 'payload']
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(QuarantinedSubmission)
+class QuarantinedSubmissionAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'email', 'reason', 'status', 'received_at']
+    list_filter = ['status', 'reason', 'kind', 'received_at']
+    search_fields = ['email']
+    readonly_fields = ['kind', 'email', 'payload', 'reason', 'fingerprint', 'status', 'received_at']
+    actions = ['release', 'mark_spam']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Release selected (save and notify as normal submissions)', permissions=['change'])
+    def release(self, request, queryset):
+        count = spam.release(queryset)
+        self.message_user(request, f'Released {count} submission{"s" if count != 1 else ""}.', messages.SUCCESS)
+
+    @admin.action(description='Confirm selected as spam (hold identical messages)', permissions=['change'])
+    def mark_spam(self, request, queryset):
+        count = spam.mark_spam(queryset)
+        self.message_user(request, f'Marked {count} submission{"s" if count != 1 else ""} as spam.', messages.SUCCESS)
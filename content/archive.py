@@ -0,0 +1,180 @@
+"""
+Cold archive for old contact submissions and finished bookings.
+
+Rows older than the cutoff are appended to gzip JSONL partitions, one file
+per kind and month of submission:
+
+    ARCHIVE_ROOT/<kind>/<YYYY>/<YYYY-MM>.jsonl.gz
+
+Each chunk is written and fsync'd before its rows are deleted in the same
+bounded transaction, so a crash can at worst archive a chunk twice (search
+and restore de-duplicate by id). Appends add a new gzip member, which
+gzip readers handle transparently.
+"""
+
+import contextlib
+import contextvars
+import gzip
+import json
+import logging
+import os
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import identity
+from .models import ContactSubmission, ServiceBooking
+
+logger = logging.getLogger(__name__)
+
+# kind -> (model, which rows may be archived)
+ARCHIVABLE = {
+    'contact': (ContactSubmission, Q()),
+    'booking': (ServiceBooking, Q(status__in=['completed', 'cancelled'])),
+}
+
+# Set while archived rows are being deleted, so the identity index keeps
+# their history instead of dropping it
+ARCHIVING = contextvars.ContextVar('archiving', default=False)
+
+
+@contextlib.contextmanager
+def archiving():
+    token = ARCHIVING.set(True)
+    try:
+        yield
+    finally:
+        ARCHIVING.reset(token)
+
+
+def _root():
+    return settings.ARCHIVE_ROOT
+
+
+def partition_path(kind, when):
+    when = timezone.localtime(when) if isinstance(when, datetime) else when
+    return _root() / kind / f'{when:%Y}' / f'{when:%Y-%m}.jsonl.gz'
+
+
+def _append(path, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb') as gz:
+            for row in rows:
+                gz.write(json.dumps(row, cls=DjangoJSONEncoder).encode() + b'\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def _cutoff_marker(kind):
+    return _root() / kind / 'cutoff'
+
+
+def archived_before(kind):
+    """Submission date below which ``kind`` rows may have been archived, or None"""
+    try:
+        return date.fromisoformat(_cutoff_marker(kind).read_text().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def archive(kind, cutoff, chunk_size=500, dry_run=False):
+    """Move rows submitted before ``cutoff`` into the archive; returns the count"""
+    model, eligible = ARCHIVABLE[kind]
+    candidates = model.objects.filter(eligible, submitted_at__lt=cutoff).order_by('pk')
+    if dry_run:
+        return candidates.count()
+
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(candidates.select_for_update().values()[:chunk_size])
+            if not rows:
+                break
+
+            partitions = {}
+            for row in rows:
+                partitions.setdefault(partition_path(kind, row['submitted_at']), []).append(row)
+            for path, partition_rows in partitions.items():
+                _append(path, partition_rows)
+
+            with archiving():
+                model.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        moved += len(rows)
+        logger.info("Archived %s %s rows (%s so far)", len(rows), kind, moved)
+
+    previous = archived_before(kind)
+    cutoff_day = timezone.localdate(cutoff)
+    if previous is None or cutoff_day > previous:
+        marker = _cutoff_marker(kind)
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.write_text(cutoff_day.isoformat())
+    return moved
+
+
+def iter_archived(kind, start_month=None, end_month=None):
+    """
+    Yield archived rows for ``kind``, newest partition first, reading only
+    partitions whose month (YYYY-MM) lies within the given bounds. Later
+    copies of a row override earlier ones within a partition.
+    """
+    base = _root() / kind
+    paths = sorted(base.glob('*/*.jsonl.gz'), reverse=True)
+    for path in paths:
+        month = path.name[:7]
+        if (start_month and month < start_month) or (end_month and month > end_month):
+            continue
+        rows = {}
+        with gzip.open(path, 'rt') as f:
+            for line in f:
+                row = json.loads(line)
+                rows[row['id']] = row
+        yield from sorted(rows.values(), key=lambda row: row['submitted_at'], reverse=True)
+
+
+def search(kind, term='', start_month=None, end_month=None, limit=100):
+    """Archived rows whose text fields contain ``term`` (case-insensitive)"""
+    term = term.strip().lower()
+    results = []
+    seen = set()
+    for row in iter_archived(kind, start_month, end_month):
+        if row['id'] in seen:
+            continue
+        if term and not any(term in str(value).lower() for value in row.values() if isinstance(value, str)):
+            continue
+        seen.add(row['id'])
+        results.append(row)
+        if len(results) >= limit:
+            break
+    return results
+
+
+def restore(kind, ids):
+    """Re-insert archived rows by id (skipping any already live); returns the count"""
+    model, _ = ARCHIVABLE[kind]
+    wanted = set(ids) - set(model.objects.filter(pk__in=ids).values_list('pk', flat=True))
+    if not wanted:
+        return 0
+    found = {}
+    for row in iter_archived(kind):
+        if row['id'] in wanted and row['id'] not in found:
+            found[row['id']] = row
+            if len(found) == len(wanted):
+                break
+
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+    with transaction.atomic():
+        for row in found.values():
+            values = {name: fields[name].to_python(value) for name, value in row.items() if name in fields}
+            instance = model(**values)
+            # Restored rows keep their id; save() only sends mail for new pks
+            instance.save(force_insert=True)
+            # auto_now_add overwrote the original submission time on insert
+            model.objects.filter(pk=instance.pk).update(submitted_at=values['submitted_at'])
+            instance.submitted_at = values['submitted_at']
+            identity.index_many([instance])
+    return len(found)
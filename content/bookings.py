@@ -0,0 +1,185 @@
+"""
+Set-based booking operations.
+
+``transition`` moves a whole selection of bookings to a new status with one
+UPDATE and then does, in bulk, what the per-row save signals would have
+done: dashboard counter deltas from a GROUP BY of the old statuses, rollup
+shifts, identity index upserts, and client notifications queued in the
+outbox rather than sent inline.
+
+``register_group`` books training for an organization's roster with one
+bulk_create, the same bulk bookkeeping, one consolidated email to the
+organizer and one admin notification (through ``notify_admin``, so it
+follows ADMIN_NOTIFY_MODE) instead of two emails per attendee.
+"""
+
+import logging
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+from . import counters, identity, mail, outbox, rollups, schemas
+from .models import ServiceBooking, notify_admin
+
+logger = logging.getLogger(__name__)
+
+STATUSES = [value for value, label in ServiceBooking._meta.get_field('status').choices]
+
+# Statuses that send the client an email, and its subject
+NOTIFY_SUBJECTS = {
+    'confirmed': 'Appointment Confirmed - Mwasamwanda Well-being Services',
+    'cancelled': 'Appointment Cancelled - Mwasamwanda Well-being Services',
+    'completed': 'Thank You - Mwasamwanda Well-being Services',
+}
+
+def status_notification(booking):
+    """(to, subject, text, html) for the client email about ``booking``'s current status, or None"""
+    if booking.status not in NOTIFY_SUBJECTS or not booking.email:
+        return None
+    subject = NOTIFY_SUBJECTS[booking.status]
+    text, html = mail.render('booking_status', {'booking': booking, 'subject': subject})
+    return booking.email, subject, text, html
+
+
+def transition(queryset, status, notify=True):
+    """
+    Move every booking in ``queryset`` that isn't already ``status`` to it.
+    Returns the number of bookings changed.
+    """
+    if status not in STATUSES:
+        raise ValueError(f'Unknown booking status: {status}')
+
+    with transaction.atomic():
+        ids = list(queryset.exclude(status=status).select_for_update().values_list('pk', flat=True))
+        if not ids:
+            return 0
+        moving = ServiceBooking.objects.filter(pk__in=ids)
+
+        groups = Counter({
+            (row['day'], row['service_type'], row['session_mode'], row['status']): row['n']
+            for row in moving.annotate(day=TruncDate('submitted_at'))
+            .values('day', 'service_type', 'session_mode', 'status')
+            .annotate(n=Count('id'))
+            .order_by()
+        })
+        moving.update(status=status)
+
+        by_old_status = Counter()
+        for (_, _, _, old_status), n in groups.items():
+            by_old_status[old_status] += n
+        deltas = Counter()
+        for old_status, n in by_old_status.items():
+            deltas.update(counters.transition_deltas(ServiceBooking, old_status, status, n))
+        counters.adjust(deltas)
+        rollups.move_booking_status(groups, status)
+
+        bookings = list(moving)
+        identity.index_many(bookings)
+        if notify:
+            messages = [m for m in map(status_notification, bookings) if m]
+            if messages:
+                outbox.queue(messages)
+
+    logger.info("Moved %s bookings to %s", len(ids), status)
+    return len(ids)
+
+
+GROUP_SERVICE = 'training'
+
+
+def register_group(group):
+    """
+    Book GROUP_SERVICE for every valid attendee in a cleaned
+    schemas.GROUP_REGISTRATION payload, in one transaction.
+
+    Returns per-row results in roster order, each with a 'status' of
+    'created' (with the booking 'id'), 'invalid' (with 'errors') or
+    'duplicate' (already in this roster, or already booked for this session,
+    so resubmitting a roster is safe).
+    """
+    results = []
+    valid = {}
+    for row, item in enumerate(group['attendees']):
+        try:
+            attendee = schemas.ATTENDEE.validate(item)
+        except schemas.ValidationError as e:
+            results.append({'row': row, 'status': 'invalid', 'errors': e.errors})
+            continue
+        if attendee['email'] in valid:
+            results.append({'row': row, 'status': 'duplicate', 'message': 'Listed more than once in this roster.'})
+            continue
+        valid[attendee['email']] = row
+        results.append({'row': row, 'status': 'pending', 'attendee': attendee})
+
+    session = {
+        'service_type': GROUP_SERVICE,
+        'session_mode': group['session_mode'],
+        'preferred_date': group['preferred_date'],
+        'preferred_time': group['preferred_time'],
+    }
+    description = f"Group registration: {group['organization']} (organizer {group['organizer_name']}, {group['organizer_email']})"
+    if group['notes']:
+        description += f"\n\n{group['notes']}"
+
+    with transaction.atomic():
+        booked = set(
+            ServiceBooking.objects.filter(email__in=list(valid), **session).values_list('email', flat=True)
+        )
+        new = []
+        for result in results:
+            if result['status'] != 'pending':
+                continue
+            attendee = result.pop('attendee')
+            if attendee['email'] in booked:
+                result.update(status='duplicate', message='Already booked for this session.')
+                continue
+            result['status'] = 'created'
+            # Notifications go through the outbox below, not ServiceBooking.save()
+            new.append(ServiceBooking(
+                description=description, email_sent=True, admin_email_sent=True, client_email_sent=True,
+                **session, **attendee,
+            ))
+
+        bookings = ServiceBooking.objects.bulk_create(new)
+        for result, booking in zip((r for r in results if r['status'] == 'created'), bookings):
+            result['id'] = booking.pk
+
+        if bookings:
+            counters.adjust({name: len(bookings) for name in counters.counter_names(ServiceBooking, 'pending')})
+            identity.index_many(bookings)
+            (subject, text, html), messages = group_notifications(group, bookings, results)
+            outbox.queue(messages)
+            transaction.on_commit(lambda: notify_admin(
+                'booking', subject, text, html_message=html,
+                immediate=settings.ADMIN_DIGEST_BOOKINGS_IMMEDIATE,
+            ))
+
+    logger.info("Group registration for %s: %s booked of %s listed", group['organization'], len(bookings), len(results))
+    return results
+
+
+def group_notifications(group, bookings, results):
+    """
+    ((subject, text, html) for the admin, [outbox messages]): the organizer
+    summary, then one confirmation per attendee
+    """
+    context = {
+        'group': group,
+        'bookings': bookings,
+        'session': bookings[0],
+        'skipped': [r for r in results if r['status'] != 'created'],
+    }
+    text, html = mail.render('group_registration', context)
+    admin = (f"New Group Registration - {group['organization']} ({len(bookings)} attendees)", text, html)
+    messages = [
+        (group['organizer_email'], f"Group Registration Received - {group['organization']}", text, html),
+    ]
+    rendered = mail.render_many('booking_confirmation', [{'booking': booking} for booking in bookings])
+    subject = 'Booking Confirmation - Mwasamwanda Well-being Services'
+    messages.extend(
+        (booking.email, subject, text, html) for booking, (text, html) in zip(bookings, rendered)
+    )
+    return admin, messages
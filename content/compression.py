@@ -0,0 +1,216 @@
+"""
+Response compression for dynamic HTML and JSON.
+
+Codecs are tried in server preference order (brotli, zstd, gzip) among
+those the client accepts; brotli and zstd are only offered when the
+``brotli`` / ``zstandard`` packages are installed. Each codec has a normal
+level and a cheap one used while the load average per CPU is above
+COMPRESSION_HIGH_LOAD; above COMPRESSION_MAX_LOAD nothing new is
+compressed at all.
+
+Compressed bytes are kept in a small per-process LRU keyed by a digest of
+the body, so pages served from the cache (or any repeated identical body)
+are compressed once rather than on every request.
+
+Responses that embed a CSRF token only get gzip with a random-length
+header field, as Django's GZipMiddleware does, to blunt BREACH-style
+attacks.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Compressing anything else (images, archives, fonts) wastes CPU
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/rss+xml',
+    'application/atom+xml',
+    'image/svg+xml',
+)
+
+
+def _gzip(body, level):
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def _brotli(body, level):
+    return brotli.compress(body, quality=level)
+
+
+def _zstd(body, level):
+    return zstandard.ZstdCompressor(level=level).compress(body)
+
+
+class Codec:
+    def __init__(self, name, compress, level, cheap_level):
+        self.name = name
+        self.compress = compress
+        self.level = level
+        self.cheap_level = cheap_level
+
+
+def available_codecs():
+    """Installed codecs, most preferred first"""
+    codecs = []
+    if brotli is not None:
+        codecs.append(Codec('br', _brotli, level=5, cheap_level=1))
+    if zstandard is not None:
+        codecs.append(Codec('zstd', _zstd, level=6, cheap_level=1))
+    codecs.append(Codec('gzip', _gzip, level=6, cheap_level=1))
+    return codecs
+
+
+CODECS = available_codecs()
+
+
+def parse_accept_encoding(header):
+    """{coding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate(header, codecs=None):
+    """The codec to use for this Accept-Encoding header, or None"""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best, best_q = None, 0.0
+    for codec in CODECS if codecs is None else codecs:
+        q = accepted.get(codec.name, wildcard)
+        # Ties go to the earlier (preferred) codec
+        if q > best_q:
+            best, best_q = codec, q
+    return best
+
+
+def is_compressible(content_type):
+    content_type = content_type.split(';', 1)[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+# ---------------------- CPU pressure ----------------------
+
+_load = {'checked': 0.0, 'value': 0.0}
+
+
+def load_per_cpu():
+    """1-minute load average per CPU, sampled at most once a second"""
+    now = time.monotonic()
+    if now - _load['checked'] >= 1:
+        try:
+            _load['value'] = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except OSError:
+            _load['value'] = 0.0
+        _load['checked'] = now
+    return _load['value']
+
+
+def pressure():
+    """'normal', 'high' or 'overloaded'"""
+    load = load_per_cpu()
+    if load >= settings.COMPRESSION_MAX_LOAD:
+        return 'overloaded'
+    if load >= settings.COMPRESSION_HIGH_LOAD:
+        return 'high'
+    return 'normal'
+
+
+# ---------------------- compressed bytes cache ----------------------
+
+class CompressedCache:
+    """Thread-safe LRU of compressed bodies keyed by (digest, codec, level)"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return data
+
+    def set(self, key, data):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+compressed_cache = CompressedCache(settings.COMPRESSION_CACHE_ENTRIES)
+
+
+def compress(body, codec, cheap=False, allow_new=True):
+    """
+    Compressed ``body``, reusing an earlier result for an identical body.
+    Returns None when nothing is cached and ``allow_new`` is false.
+    """
+    cacheable = len(body) <= settings.COMPRESSION_CACHE_MAX_BYTES
+    if cacheable:
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        # Any level will do when we can't afford to compress
+        levels = (codec.level, codec.cheap_level) if cheap or not allow_new else (codec.level,)
+        for level in levels:
+            data = compressed_cache.get((digest, codec.name, level))
+            if data is not None:
+                return data
+    if not allow_new:
+        return None
+
+    level = codec.cheap_level if cheap else codec.level
+    data = codec.compress(body, level)
+    if cacheable:
+        compressed_cache.set((digest, codec.name, level), data)
+    return data
+
+
+def compress_with_padding(body, max_random_bytes=100):
+    """gzip with a random-length FNAME field, for bodies containing secrets"""
+    return compress_string(body, max_random_bytes=max_random_bytes)
@@ -0,0 +1,25 @@
+"""
+Cached snapshot of all WebsiteContent keys.
+
+Templates read every key from one cached dict; any write to WebsiteContent
+drops it and the next read rebuilds it with a single query.
+"""
+
+from django.core.cache import cache
+
+WEBSITE_CONTENT_KEY = 'content:website'
+
+
+def get_website_content():
+    """Return {key: value} for all website content"""
+    snapshot = cache.get(WEBSITE_CONTENT_KEY)
+    if snapshot is None:
+        from .models import WebsiteContent
+
+        snapshot = dict(WebsiteContent.objects.values_list('key', 'value'))
+        cache.add(WEBSITE_CONTENT_KEY, snapshot, None)
+    return snapshot
+
+
+def invalidate_website_content():
+    cache.delete(WEBSITE_CONTENT_KEY)
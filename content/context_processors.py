@@ -0,0 +1,8 @@
+from django.utils.functional import SimpleLazyObject
+
+from .content_store import get_website_content
+
+
+def website_content(request):
+    """Expose editable site text as ``content``; loaded only if a template uses it"""
+    return {'content': SimpleLazyObject(get_website_content)}
@@ -0,0 +1,122 @@
+"""
+Incrementally maintained dashboard counters.
+
+Bookings, contact submissions, newsletter subscribers, blog posts and
+services adjust their DashboardCounter rows with F() expressions from
+save/delete signals, inside the same transaction as the write.
+
+QuerySet.update() sends no signals, so code that changes a tracked field
+that way (bookings.transition) adjusts the counters itself; anything else
+would make them drift. ``reconcile`` recomputes them from the source
+tables: the scheduler runs it every COUNTERS_RECONCILE_SECONDS and
+``manage.py reconcile_counters`` on demand.
+"""
+
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count, F
+
+from .models import Blog, ContactSubmission, DashboardCounter, NewsletterSubscriber, Service, ServiceBooking
+
+# Model -> field whose value decides which counters a row contributes to
+TRACKED_FIELDS = {
+    ServiceBooking: 'status',
+    ContactSubmission: 'is_read',
+    NewsletterSubscriber: 'is_active',
+    Blog: 'is_published',
+    Service: 'is_active',
+}
+
+BOOKING_STATUSES = [value for value, label in ServiceBooking._meta.get_field('status').choices]
+
+COUNTER_NAMES = (
+    ['bookings_total'] + [f'bookings_{status}' for status in BOOKING_STATUSES]
+    + ['contacts_total', 'contacts_unread', 'subscribers_total', 'subscribers_active']
+    + ['blogs_total', 'blogs_published', 'services_total', 'services_active']
+)
+
+
+def counter_names(model, state):
+    """Counters a row of ``model`` with tracked field value ``state`` is included in"""
+    if model is ServiceBooking:
+        return ['bookings_total', f'bookings_{state}']
+    if model is ContactSubmission:
+        return ['contacts_total'] if state else ['contacts_total', 'contacts_unread']
+    if model is NewsletterSubscriber:
+        return ['subscribers_total', 'subscribers_active'] if state else ['subscribers_total']
+    if model is Blog:
+        return ['blogs_total', 'blogs_published'] if state else ['blogs_total']
+    if model is Service:
+        return ['services_total', 'services_active'] if state else ['services_total']
+    return []
+
+
+def transition_deltas(model, old_state, new_state, count=1):
+    """Counter deltas for ``count`` rows moving from one tracked state to another"""
+    deltas = Counter()
+    for name in counter_names(model, old_state):
+        deltas[name] -= count
+    for name in counter_names(model, new_state):
+        deltas[name] += count
+    return deltas
+
+
+def adjust(deltas):
+    """Apply {name: delta} with one UPDATE per distinct delta"""
+    by_delta = {}
+    for name, delta in deltas.items():
+        if delta:
+            by_delta.setdefault(delta, []).append(name)
+    for delta, names in by_delta.items():
+        DashboardCounter.objects.filter(name__in=names).update(value=F('value') + delta)
+
+
+def get_counters():
+    """All counter values in one query on the unique name index"""
+    values = dict(DashboardCounter.objects.filter(name__in=COUNTER_NAMES).values_list('name', 'value'))
+    return {name: values.get(name, 0) for name in COUNTER_NAMES}
+
+
+def compute_counters():
+    """Recount everything from the source tables"""
+    values = dict.fromkeys(COUNTER_NAMES, 0)
+    for status, n in ServiceBooking.objects.values_list('status').annotate(n=Count('id')).order_by():
+        values['bookings_total'] += n
+        if f'bookings_{status}' in values:
+            values[f'bookings_{status}'] += n
+    values['contacts_total'] = ContactSubmission.objects.count()
+    values['contacts_unread'] = ContactSubmission.objects.filter(is_read=False).count()
+    values['subscribers_total'] = NewsletterSubscriber.objects.count()
+    values['subscribers_active'] = NewsletterSubscriber.objects.filter(is_active=True).count()
+    values['blogs_total'] = Blog.objects.count()
+    values['blogs_published'] = Blog.objects.filter(is_published=True).count()
+    values['services_total'] = Service.objects.count()
+    values['services_active'] = Service.objects.filter(is_active=True).count()
+    return values
+
+
+def reconcile():
+    """
+    Repair drifted counters and return {name: (stored, actual)} for the ones
+    that were wrong. Counter rows are locked first so concurrent signal
+    updates queue behind the recount instead of being lost.
+    """
+    with transaction.atomic():
+        stored = dict(
+            DashboardCounter.objects.select_for_update()
+            .filter(name__in=COUNTER_NAMES).values_list('name', 'value')
+        )
+        actual = compute_counters()
+        drift = {
+            name: (stored.get(name), value)
+            for name, value in actual.items() if stored.get(name) != value
+        }
+        if drift:
+            options = {'update_conflicts': True, 'update_fields': ['value', 'updated_at']}
+            if connection.features.supports_update_conflicts_with_target:
+                options['unique_fields'] = ['name']
+            DashboardCounter.objects.bulk_create(
+                [DashboardCounter(name=name, value=actual[name]) for name in drift], **options
+            )
+    return drift
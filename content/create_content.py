@@ -62,28 +62,7 @@ def create_initial_content():
     # Combine all content
     all_content = hero_content + services_content + contact_content
 
-    created_count = 0
-    updated_count = 0
-
-    for key, value, content_type, description in all_content:
-        obj, created = WebsiteContent.objects.get_or_create(
-            key=key,
-            defaults={
-                'value': value,
-                'content_type': content_type,
-                'description': description
-            }
-        )
-        
-        if created:
-            created_count += 1
-        else:
-            # Update existing content
-            obj.value = value
-            obj.content_type = content_type
-            obj.description = description
-            obj.save()
-            updated_count += 1
+    created_count, updated_count = WebsiteContent.bulk_upsert(all_content)
 
     print(f"Content creation completed!")
     print(f"Created: {created_count} new items")
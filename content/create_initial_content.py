@@ -43,14 +43,10 @@ initial_content = [
     ('hours_weekend', 'Sat: 9:00 AM - 2:00 PM', 'contact'),
 ]
 
-for key, value, content_type in initial_content:
-    WebsiteContent.objects.get_or_create(
-        key=key,
-        defaults={
-            'value': value,
-            'content_type': content_type,
-            'description': f'Content for {key}'
-        }
-    )
+# Existing keys are left untouched
+WebsiteContent.bulk_upsert(
+    [(key, value, content_type, f'Content for {key}') for key, value, content_type in initial_content],
+    overwrite=False,
+)
 
 print("Initial content created successfully!")
\ No newline at end of file
@@ -0,0 +1,16 @@
+def public_page(view_func):
+    """
+    Mark a view as a public page: it never reads or writes the session and
+    its response may be cached at a CDN (see PublicPageSessionMiddleware).
+    """
+    view_func.public_page = True
+    return view_func
+
+
+def replica_reads(view_func):
+    """
+    Mark a read-only view whose queries may be served by the read replica
+    (see content/routers.py and ReplicaRoutingMiddleware).
+    """
+    view_func.replica_reads = True
+    return view_func
@@ -0,0 +1,143 @@
+"""
+Bounded-latency mail delivery.
+
+Every send runs on a small per-process thread pool and the caller waits at
+most EMAIL_SEND_DEADLINE seconds for it; the SMTP socket itself times out
+after EMAIL_TIMEOUT. A circuit breaker shared through the cache stops all
+workers from trying after MAIL_BREAKER_THRESHOLD consecutive failures, then
+lets a single probe through every MAIL_BREAKER_COOLDOWN seconds until one
+succeeds.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+SEND_WORKERS = 4
+
+
+class MailUnavailable(Exception):
+    """Raised when a send is refused by the breaker or misses its deadline"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with its state in the shared cache,
+    so every worker process sees the same state.
+
+    closed -> open after ``threshold`` consecutive failures. Once ``cooldown``
+    seconds have passed it is half-open: one caller gets to probe, and its
+    result closes or re-opens the breaker.
+    """
+
+    STATS = ('succeeded', 'failed', 'short_circuited', 'opened')
+
+    def __init__(self, name, threshold, cooldown):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.prefix = f'breaker:{name}:'
+
+    def _incr(self, key):
+        key = self.prefix + key
+        cache.add(key, 0, None)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+            return 1
+
+    def state(self):
+        opened_at = cache.get(self.prefix + 'opened_at')
+        if opened_at is None:
+            return 'closed'
+        if time.time() - opened_at < self.cooldown:
+            return 'open'
+        return 'half-open'
+
+    def allow(self):
+        """True if the caller may attempt the operation now"""
+        state = self.state()
+        if state == 'closed':
+            return True
+        # Only one probe per cooldown window, across all workers
+        if state == 'half-open' and cache.add(self.prefix + 'probe', 1, self.cooldown):
+            logger.info("Circuit breaker %s half-open, probing", self.name)
+            return True
+        self._incr('short_circuited')
+        return False
+
+    def record_success(self):
+        self._incr('succeeded')
+        if cache.get(self.prefix + 'failures'):
+            cache.set(self.prefix + 'failures', 0, None)
+        if cache.get(self.prefix + 'opened_at') is not None:
+            cache.delete_many([self.prefix + 'opened_at', self.prefix + 'probe'])
+            logger.warning("Circuit breaker %s closed", self.name)
+
+    def record_failure(self):
+        self._incr('failed')
+        failures = self._incr('failures')
+        if failures >= self.threshold or self.state() != 'closed':
+            cache.set(self.prefix + 'opened_at', time.time(), None)
+            cache.delete(self.prefix + 'probe')
+            self._incr('opened')
+            logger.warning("Circuit breaker %s open after %s consecutive failures", self.name, failures)
+
+    def stats(self):
+        values = cache.get_many([self.prefix + key for key in self.STATS + ('failures',)])
+        data = {key: values.get(self.prefix + key, 0) for key in self.STATS}
+        data['consecutive_failures'] = values.get(self.prefix + 'failures', 0)
+        data['state'] = self.state()
+        return data
+
+
+smtp_breaker = CircuitBreaker(
+    'smtp',
+    threshold=settings.MAIL_BREAKER_THRESHOLD,
+    cooldown=settings.MAIL_BREAKER_COOLDOWN,
+)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    # Pools don't survive fork; build one per worker process
+    global _executor, _executor_pid
+    if _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(max_workers=SEND_WORKERS, thread_name_prefix='mail')
+                _executor_pid = os.getpid()
+    return _executor
+
+
+def send_mail(subject, message, from_email, recipient_list, **kwargs):
+    """
+    django.core.mail.send_mail within EMAIL_SEND_DEADLINE, guarded by the
+    SMTP breaker. Raises MailUnavailable or the underlying error on failure.
+    """
+    if not smtp_breaker.allow():
+        raise MailUnavailable('mail circuit breaker is open')
+
+    future = _get_executor().submit(mail.send_mail, subject, message, from_email, recipient_list, **kwargs)
+    try:
+        result = future.result(timeout=settings.EMAIL_SEND_DEADLINE)
+    except FutureTimeout:
+        smtp_breaker.record_failure()
+        raise MailUnavailable(f'send did not finish within {settings.EMAIL_SEND_DEADLINE}s')
+    except Exception:
+        smtp_breaker.record_failure()
+        raise
+    smtp_breaker.record_success()
+    return result
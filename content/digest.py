@@ -0,0 +1,90 @@
+"""
+Admin notification digests.
+
+With ADMIN_NOTIFY_MODE = 'digest', the admin halves of booking, contact and
+subscriber notifications are stored as AdminDigestItem rows instead of
+being emailed one by one (bookings only if ADMIN_DIGEST_BOOKINGS_IMMEDIATE
+is off). ``send_digest``, run by the scheduler (content/scheduler.py)
+every tick and by ``manage.py send_admin_digest`` on demand, sends
+everything pending as one summary once the oldest item is
+ADMIN_DIGEST_WINDOW seconds old, so the inbox gets at most one digest per
+window. Pending items are rows, so they survive restarts; a failed send
+leaves them pending for the next run.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import AdminDigestItem, safe_send_mail
+
+logger = logging.getLogger(__name__)
+
+SEND_LOCK_KEY = 'digest:send-lock'
+
+KIND_LABELS = {
+    'booking': 'New bookings',
+    'contact': 'Contact messages',
+    'subscriber': 'Newsletter subscribers',
+}
+
+
+def pending():
+    return AdminDigestItem.objects.filter(sent_at__isnull=True)
+
+
+def overdue():
+    """Pending items that have missed at least one digest"""
+    cutoff = timezone.now() - timedelta(seconds=2 * settings.ADMIN_DIGEST_WINDOW)
+    return pending().filter(created_at__lt=cutoff)
+
+
+def build(items):
+    """(subject, text) of the summary email for ``items``"""
+    by_kind = defaultdict(list)
+    for item in items:
+        by_kind[item.kind].append(item)
+
+    counts = ', '.join(f'{len(group)} {KIND_LABELS.get(kind, kind).lower()}' for kind, group in by_kind.items())
+    subject = f'Admin digest: {counts}'
+    lines = [f'{len(items)} notifications since {timezone.localtime(items[0].created_at):%b %d, %Y %I:%M %p}.', '']
+    for kind, group in by_kind.items():
+        lines.append(f'== {KIND_LABELS.get(kind, kind)} ({len(group)}) ==')
+        lines.append('')
+        for item in group:
+            lines.append(f'--- {item.subject} ({timezone.localtime(item.created_at):%b %d %I:%M %p})')
+            lines.append(item.body.strip())
+            lines.append('')
+    return subject[:300], '\n'.join(lines)
+
+
+def send_digest(force=False):
+    """
+    Send pending items as one email if the oldest has waited a full window
+    (or ``force``). Returns the number of items sent.
+    """
+    # One sender at a time across schedulers and manual runs
+    if not cache.add(SEND_LOCK_KEY, 1, 300):
+        return 0
+    try:
+        items = list(pending().order_by('created_at')[:settings.ADMIN_DIGEST_MAX_ITEMS])
+        if not items:
+            return 0
+        now = timezone.now()
+        if not force and now - items[0].created_at < timedelta(seconds=settings.ADMIN_DIGEST_WINDOW):
+            return 0
+
+        subject, text = build(items)
+        sent = safe_send_mail(subject, text, settings.DEFAULT_FROM_EMAIL, [settings.DEFAULT_FROM_EMAIL], fail_silently=False)
+        if not sent:
+            logger.warning("Admin digest of %s items not sent: %s", len(items), sent.error)
+            return 0
+        AdminDigestItem.objects.filter(pk__in=[item.pk for item in items]).update(sent_at=now)
+        logger.info("Admin digest sent with %s items", len(items))
+        return len(items)
+    finally:
+        cache.delete(SEND_LOCK_KEY)
@@ -0,0 +1,175 @@
+"""
+Background health monitor behind the /health/ready probe.
+
+Checks run in a daemon thread at a fixed cadence and the last result is
+kept in memory, so probes never touch the database, cache or mail system
+themselves. Gunicorn workers start the monitor in ``post_worker_init``
+(gunicorn.conf.py) with the first run done before they take traffic, so a
+new worker isn't reported as not ready; elsewhere the first probe starts it.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CHECKS = []
+
+
+def register_check(name, critical=True):
+    """Register a check function; non-critical failures only degrade readiness"""
+    def decorator(func):
+        CHECKS.append((name, func, critical))
+        return func
+    return decorator
+
+
+@register_check('database')
+def check_database():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    return 'ok'
+
+
+@register_check('cache')
+def check_cache():
+    token = uuid.uuid4().hex
+    cache.set('health:probe', token, 30)
+    if cache.get('health:probe') != token:
+        raise RuntimeError('cache read-back mismatch')
+    return 'ok'
+
+
+@register_check('mail_backlog', critical=False)
+def check_mail_backlog():
+    from .models import ServiceBooking, ContactSubmission, NewsletterSubscriber
+    from .digest import overdue
+    from .outbox import pending
+
+    since = timezone.now() - timedelta(hours=24)
+    backlog = (
+        ServiceBooking.objects.filter(email_sent=False, submitted_at__gte=since).count()
+        + ContactSubmission.objects.filter(email_sent=False, submitted_at__gte=since).count()
+        + NewsletterSubscriber.objects.filter(welcome_email_sent=False, subscribed_at__gte=since).count()
+        + pending().filter(created_at__gte=since).count()
+        + overdue().count()
+    )
+    if backlog > settings.MAIL_BACKLOG_THRESHOLD:
+        raise RuntimeError(f'{backlog} unsent notifications in the last 24h')
+    return f'{backlog} unsent'
+
+
+@register_check('mail_breaker', critical=False)
+def check_mail_breaker():
+    from .delivery import smtp_breaker
+
+    stats = smtp_breaker.stats()
+    summary = ', '.join(f'{key}={value}' for key, value in stats.items())
+    if stats['state'] != 'closed':
+        raise RuntimeError(summary)
+    return summary
+
+
+@register_check('journal', critical=False)
+def check_journal():
+    from .journal import depth
+
+    waiting = depth()
+    if waiting:
+        raise RuntimeError(f'{waiting} journaled submissions waiting for replay')
+    return 'empty'
+
+
+class HealthMonitor:
+    """Runs the registered checks every ``interval`` seconds in one thread per process"""
+
+    def __init__(self, interval, max_staleness):
+        self.interval = interval
+        self.max_staleness = max_staleness
+        # (result, monotonic time) swapped in one assignment so readers never see a torn pair
+        self.state = (None, None)
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def ensure_started(self, check_first=False):
+        """
+        Start the check thread for this process. With ``check_first`` the
+        first run happens before returning, so probes get a result at once.
+        """
+        # Checking the pid restarts the thread in forked workers
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            if check_first:
+                self._run()
+            threading.Thread(target=self._loop, args=(check_first,), name='health-monitor', daemon=True).start()
+
+    def _run(self):
+        try:
+            self.run_checks()
+        except Exception:
+            logger.exception("Health monitor run failed")
+
+    def _loop(self, checked):
+        if checked:
+            time.sleep(self.interval)
+        while True:
+            self._run()
+            time.sleep(self.interval)
+
+    def run_checks(self):
+        close_old_connections()
+        checks = {}
+        status = 'ready'
+        for name, func, critical in CHECKS:
+            start = time.perf_counter()
+            try:
+                detail = func()
+                ok = True
+            except Exception as e:
+                detail = str(e)
+                ok = False
+                logger.warning("Health check %s failed: %s", name, e)
+            checks[name] = {
+                'ok': ok,
+                'critical': critical,
+                'detail': detail,
+                'latency_ms': round((time.perf_counter() - start) * 1000, 2),
+            }
+            if not ok:
+                status = 'unavailable' if critical else ('degraded' if status == 'ready' else status)
+
+        self.state = ({'status': status, 'checks': checks}, time.monotonic())
+
+    def snapshot(self):
+        """Return (payload, http_status) from the last run, without doing any I/O"""
+        self.ensure_started()
+        result, checked_at = self.state
+        if result is None:
+            return {'status': 'starting'}, 503
+
+        age = time.monotonic() - checked_at
+        payload = dict(result, age_seconds=round(age, 2))
+        if age > self.max_staleness:
+            payload['status'] = 'stale'
+            return payload, 503
+        return payload, 503 if result['status'] == 'unavailable' else 200
+
+
+monitor = HealthMonitor(
+    interval=settings.HEALTH_CHECK_INTERVAL,
+    max_staleness=settings.HEALTH_MAX_STALENESS,
+)
@@ -0,0 +1,121 @@
+"""
+Normalized client identity index.
+
+Bookings, contact messages and subscriptions are mirrored into
+ClientInteraction rows with a lowercased email and an E.164 phone number,
+so a client's full history can be assembled from two indexed lookups.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from .models import ClientInteraction, ContactSubmission, NewsletterSubscriber, ServiceBooking
+
+NON_DIGITS = re.compile(r'\D')
+
+# Models mirrored into the index and the interaction kind they produce
+KINDS = {
+    ServiceBooking: 'booking',
+    ContactSubmission: 'contact',
+    NewsletterSubscriber: 'subscription',
+}
+
+# Saves touching only these fields don't change anything the index shows
+NOTIFICATION_FIELDS = {'email_sent', 'email_error', 'welcome_email_sent'}
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def normalize_phone(phone):
+    """Best-effort E.164, assuming CLIENT_DEFAULT_COUNTRY_CODE for local numbers"""
+    raw = (phone or '').strip()
+    digits = NON_DIGITS.sub('', raw)
+    if not digits:
+        return ''
+    country = settings.CLIENT_DEFAULT_COUNTRY_CODE
+    if raw.startswith('+'):
+        return '+' + digits
+    if digits.startswith('00'):
+        return '+' + digits[2:]
+    if digits.startswith('0'):
+        return '+' + country + digits.lstrip('0')
+    if digits.startswith(country) and len(digits) > 9:
+        return '+' + digits
+    return '+' + country + digits
+
+
+def build_interaction(instance):
+    """Unsaved ClientInteraction mirroring a booking, contact or subscriber"""
+    kind = KINDS[type(instance)]
+    if kind == 'booking':
+        fields = {
+            'name': instance.full_name,
+            'phone': normalize_phone(instance.phone),
+            'occurred_at': instance.submitted_at,
+            'summary': (
+                f"{instance.get_service_type_display()} ({instance.get_session_mode_display()}) "
+                f"on {instance.preferred_date} - {instance.get_status_display()}"
+            ),
+        }
+    elif kind == 'contact':
+        fields = {
+            'name': instance.name,
+            'occurred_at': instance.submitted_at,
+            'summary': instance.subject,
+        }
+    else:
+        fields = {
+            'occurred_at': instance.subscribed_at,
+            'summary': 'Subscribed to newsletter' + ('' if instance.is_active else ' (inactive)'),
+        }
+    fields['summary'] = fields['summary'][:300]
+    return ClientInteraction(kind=kind, object_id=instance.pk, email=normalize_email(instance.email), **fields)
+
+
+def index_many(instances):
+    """Upsert index rows for saved instances in one statement"""
+    rows = [build_interaction(instance) for instance in instances]
+    if not rows:
+        return 0
+    options = {
+        'update_conflicts': True,
+        'update_fields': ['email', 'phone', 'name', 'summary', 'occurred_at', 'archived'],
+    }
+    if connection.features.supports_update_conflicts_with_target:
+        options['unique_fields'] = ['kind', 'object_id']
+    ClientInteraction.objects.bulk_create(rows, **options)
+    return len(rows)
+
+
+def remove(instance, keep_history=False):
+    rows = ClientInteraction.objects.filter(kind=KINDS[type(instance)], object_id=instance.pk)
+    if keep_history:
+        rows.update(archived=True)
+    else:
+        rows.delete()
+
+
+def timeline(term):
+    """
+    Every interaction for the client identified by an email or phone.
+
+    The first query matches the term on the email and phone indexes; the
+    second widens it to every email and phone seen in those rows, so a
+    client who booked by phone and wrote in by email shows up as one.
+    """
+    email = normalize_email(term) if '@' in term else ''
+    phone = '' if '@' in term else normalize_phone(term)
+    if not email and not phone:
+        return []
+
+    direct = list(ClientInteraction.objects.filter(Q(email=email) if email else Q(phone=phone)))
+    emails = {row.email for row in direct if row.email}
+    phones = {row.phone for row in direct if row.phone}
+    if not direct or (emails <= {email} and phones <= {phone}):
+        return direct
+    return list(ClientInteraction.objects.filter(Q(email__in=emails) | Q(phone__in=phones)))
@@ -0,0 +1,269 @@
+"""
+Write-ahead journal for submissions that arrive while the database is down.
+
+When a submit view's write fails with a connection-level error (or SQLite
+is still locked after DB_WRITE_RETRIES), ``accept`` appends the cleaned
+submission to JOURNAL_ROOT/submissions.jsonl. Each entry is one JSON line
+that is fsync'd before the client gets a 202. The lead is then safe on
+disk rather than lost to a 500.
+
+``replay`` applies entries in the order they arrived. It first renames the
+journal to replaying.jsonl, so new submissions keep appending to a fresh
+file. Each entry is saved through the model, so signals, counters and
+notifications run as usual. A JournalReplay row is written in the same
+transaction, which lets a replay that stops part-way (the database drops
+again) start over without duplicating anything. Entries the database
+rejects outright are kept in JournalReplay with their data, not retried
+forever.
+
+A background thread per process replays every JOURNAL_REPLAY_INTERVAL
+seconds while anything is journaled. ``manage.py replay_journal`` does the
+same on demand.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, close_old_connections, transaction
+from django.http import JsonResponse
+from django.utils import timezone
+
+from .models import ContactSubmission, JournalReplay, NewsletterSubscriber, ServiceBooking
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Errors meaning the database can't take writes right now, rather than a bad row
+DB_UNAVAILABLE = (OperationalError, InterfaceError)
+
+JOURNAL_FILE = 'submissions.jsonl'
+REPLAYING_FILE = 'replaying.jsonl'
+LOCK_FILE = '.lock'
+REPLAY_LOCK_FILE = '.replay-lock'
+
+# Journal kind -> (model, fields the view adds)
+KINDS = {
+    'booking': (ServiceBooking, {}),
+    'contact': (ContactSubmission, {}),
+    'footer_contact': (ContactSubmission, {'subject': 'Footer Quick Inquiry'}),
+    'newsletter': (NewsletterSubscriber, {}),
+}
+
+
+def _path(name):
+    return settings.JOURNAL_ROOT / name
+
+
+@contextmanager
+def _flock(name, blocking=True):
+    """Exclusive lock shared by every process; yields False if not blocking and it's held"""
+    settings.JOURNAL_ROOT.mkdir(parents=True, exist_ok=True)
+    with open(_path(name), 'a') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _dumps(entry):
+    if orjson is not None:
+        return orjson.dumps(entry)
+    # Same output as orjson for the dates and times cleaned submissions carry
+    return json.dumps(entry, default=lambda value: value.isoformat(), ensure_ascii=False,
+                      separators=(',', ':')).encode()
+
+
+def _loads(line):
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+def _fsync_dir():
+    fd = os.open(settings.JOURNAL_ROOT, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# ---------------------- writing ----------------------
+
+def append(kind, data):
+    """Durably journal one cleaned submission; returns its entry id"""
+    if kind not in KINDS:
+        raise ValueError(f'Unknown journal kind: {kind}')
+    entry = {'id': uuid.uuid4().hex, 'kind': kind, 'at': timezone.now(), 'data': data}
+    line = _dumps(entry) + b'\n'
+    path = _path(JOURNAL_FILE)
+    with _flock(LOCK_FILE):
+        created = not path.exists()
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        if created:
+            # A new file's directory entry must be durable too
+            _fsync_dir()
+    return entry['id']
+
+
+def accept(kind, data, message):
+    """
+    For a view whose write hit DB_UNAVAILABLE: journal the submission and
+    acknowledge it with 202 and the view's usual success message.
+    """
+    try:
+        entry_id = append(kind, data)
+    except OSError:
+        logger.exception("Could not journal %s submission from %s", kind, data.get('email'))
+        return JsonResponse({
+            'success': False,
+            'message': 'An unexpected error occurred. Please try again or contact us directly.'
+        }, status=500)
+    logger.warning("Database unavailable; journaled %s submission %s from %s", kind, entry_id, data.get('email'))
+    replayer.ensure_started()
+    return JsonResponse({'success': True, 'queued': True, 'message': message}, status=202)
+
+
+# ---------------------- reading ----------------------
+
+def _entries(path):
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        for number, line in enumerate(f, 1):
+            try:
+                yield _loads(line)
+            except ValueError:
+                # Only a crash mid-append leaves a torn line, and that entry was never acknowledged
+                logger.error("Skipping unreadable line %s of %s", number, path)
+
+
+def depth():
+    """Journaled submissions not yet replayed (entries of an interrupted replay included)"""
+    count = 0
+    for name in (REPLAYING_FILE, JOURNAL_FILE):
+        try:
+            with open(_path(name), 'rb') as f:
+                count += sum(1 for _ in f)
+        except FileNotFoundError:
+            pass
+    return count
+
+
+# ---------------------- replay ----------------------
+
+def _instance(entry):
+    model, extra = KINDS[entry['kind']]
+    fields = {name: model._meta.get_field(name).to_python(value) for name, value in entry['data'].items()}
+    return model(**extra, **fields)
+
+
+def apply(entry):
+    """Write one entry unless it already was; returns 'applied', 'duplicate' or 'rejected'"""
+    journaled_at = datetime.fromisoformat(entry['at'])
+    if JournalReplay.objects.filter(entry_id=entry['id']).exists():
+        return 'duplicate'
+    try:
+        with transaction.atomic():
+            instance = _instance(entry)
+            # The subscriber may have signed up again since
+            if not (isinstance(instance, NewsletterSubscriber)
+                    and NewsletterSubscriber.objects.filter(email=instance.email).exists()):
+                instance.save()
+            JournalReplay.objects.create(entry_id=entry['id'], kind=entry['kind'], journaled_at=journaled_at)
+    except DB_UNAVAILABLE:
+        raise
+    except Exception as e:
+        logger.exception("Journal entry %s rejected", entry['id'])
+        JournalReplay.objects.create(
+            entry_id=entry['id'], kind=entry['kind'], journaled_at=journaled_at,
+            rejected=True, error=str(e), payload=entry['data'],
+        )
+        return 'rejected'
+    return 'applied'
+
+
+def replay():
+    """
+    Apply journaled entries in order. Returns {'applied', 'duplicate',
+    'rejected'} counts, or None if another process is already replaying.
+    DB_UNAVAILABLE propagates, leaving the rest for the next attempt.
+    """
+    totals = {'applied': 0, 'duplicate': 0, 'rejected': 0}
+    with _flock(REPLAY_LOCK_FILE, blocking=False) as acquired:
+        if not acquired:
+            return None
+        replaying = _path(REPLAYING_FILE)
+        while True:
+            with _flock(LOCK_FILE):
+                if not replaying.exists():
+                    if not _path(JOURNAL_FILE).exists():
+                        break
+                    os.replace(_path(JOURNAL_FILE), replaying)
+                    _fsync_dir()
+            for entry in _entries(replaying):
+                totals[apply(entry)] += 1
+            # Every entry is in JournalReplay now, so the file can go
+            replaying.unlink()
+    if any(totals.values()):
+        logger.info("Journal replay: %(applied)s applied, %(duplicate)s already applied, %(rejected)s rejected", totals)
+    return totals
+
+
+class Replayer:
+    """Replays every JOURNAL_REPLAY_INTERVAL seconds in one thread per process until the journal is empty"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def ensure_started(self):
+        with self._lock:
+            # Checking the pid restarts the thread in forked workers
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._loop, name='journal-replay', daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            time.sleep(settings.JOURNAL_REPLAY_INTERVAL)
+            try:
+                replay()
+            except DB_UNAVAILABLE as e:
+                logger.warning("Journal replay waiting for the database: %s", e)
+            except Exception:
+                logger.exception("Journal replay failed")
+            finally:
+                close_old_connections()
+            # Decided under the lock so an append racing this exit starts a new thread
+            with self._lock:
+                if not depth():
+                    self._thread = None
+                    return
+
+
+replayer = Replayer()
@@ -0,0 +1,194 @@
+"""
+Precompiled HTML + text emails from templates/emails.
+
+The first render of an email in a process loads its template chain (the
+email and base_email.html), inlines the stylesheet's class and tag rules
+into the markup's style attributes, derives a plain-text twin from the same
+source, and compiles both into a private template engine. Every message
+after that is two template renders; no CSS work happens per message.
+"""
+
+import html
+import re
+import threading
+
+from django.template import Context, Engine, engines
+
+EMAILS = {
+    'booking_confirmation': 'emails/booking_confirmation.html',
+    'admin_booking_notification': 'emails/admin_booking_notification.html',
+    'welcome_newsletter': 'emails/welcome_newsletter.html',
+    'group_registration': 'emails/group_registration.html',
+    'booking_status': 'emails/booking_status.html',
+    'booking_reminder': 'emails/booking_reminder.html',
+}
+
+EXTENDS_RE = re.compile(r'{%\s*extends\s+["\']([^"\']+)["\']\s*%}')
+STYLE_RE = re.compile(r'<style[^>]*>(.*?)</style>', re.S | re.I)
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+MEDIA_RE = re.compile(r'@media[^{]*\{(?:[^{}]*\{[^{}]*\})*[^{}]*\}', re.S)
+RULE_RE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+SIMPLE_SELECTOR_RE = re.compile(r'^(\.[\w-]+|[a-z][a-z0-9]*)$')
+TAG_RE = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)(\s[^<>]*?)?(\s*/?)>')
+CLASS_ATTR_RE = re.compile(r'\sclass="([^"]*)"')
+STYLE_ATTR_RE = re.compile(r'\sstyle="([^"]*)"')
+
+HEAD_RE = re.compile(r'<head.*?</head>', re.S | re.I)
+LINK_RE = re.compile(r'<a\s[^>]*href="(https?://[^"]*)"[^>]*>(.*?)</a>', re.S | re.I)
+LIST_ITEM_RE = re.compile(r'<li[^>]*>', re.I)
+BREAK_RE = re.compile(r'<br\s*/?>|</(p|div|h[1-6]|li|tr|ol|ul|table)>', re.I)
+ANY_TAG_RE = re.compile(r'<[^>]+>')
+BLANK_LINES_RE = re.compile(r'\n\s*\n(\s*\n)+')
+
+
+# ---------------------- build time ----------------------
+
+def parse_stylesheet(css):
+    """{selector: [(property, value), ...]} for plain class and tag selectors"""
+    css = MEDIA_RE.sub('', COMMENT_RE.sub('', css))
+    rules = {}
+    for selectors, body in RULE_RE.findall(css):
+        declarations = [
+            tuple(part.strip() for part in declaration.split(':', 1))
+            for declaration in body.split(';') if ':' in declaration
+        ]
+        for selector in selectors.split(','):
+            selector = selector.strip()
+            # Pseudo-classes, descendants and '*' can't be expressed inline
+            if SIMPLE_SELECTOR_RE.match(selector):
+                rules.setdefault(selector, []).extend(declarations)
+    return rules
+
+
+def _parse_style(style):
+    return [tuple(part.strip() for part in item.split(':', 1)) for item in style.split(';') if ':' in item]
+
+
+def inline_css(source, rules):
+    """Copy matching ``rules`` into each tag's style attribute; existing inline styles win"""
+    def replace(match):
+        tag, attrs, close = match.group(1), match.group(2) or '', match.group(3)
+        class_match = CLASS_ATTR_RE.search(attrs)
+        selectors = [tag.lower()] + (['.' + name for name in class_match.group(1).split()] if class_match else [])
+        declarations = [d for selector in selectors for d in rules.get(selector, [])]
+        if not declarations:
+            return match.group(0)
+
+        style_match = STYLE_ATTR_RE.search(attrs)
+        if style_match:
+            declarations += _parse_style(style_match.group(1))
+            attrs = attrs[:style_match.start()] + attrs[style_match.end():]
+        merged = {}
+        for prop, value in declarations:
+            merged.pop(prop, None)
+            merged[prop] = value
+        style = '; '.join(f'{prop}: {value}' for prop, value in merged.items())
+        return f'<{tag}{attrs} style="{style}"{close}>'
+
+    # Leave the <head> (title, meta, the stylesheet itself) untouched
+    body_start = source.lower().find('<body')
+    if body_start == -1:
+        return TAG_RE.sub(replace, source)
+    return source[:body_start] + TAG_RE.sub(replace, source[body_start:])
+
+
+def html_to_text_template(source):
+    """Plain-text template with the same blocks and variables as an HTML template"""
+    source = HEAD_RE.sub('', source)
+    source = LINK_RE.sub(r'\2 (\1)', source)
+    source = LIST_ITEM_RE.sub('\n• ', source)
+    source = BREAK_RE.sub('\n', source)
+    source = html.unescape(ANY_TAG_RE.sub('', source))
+    return '\n'.join(line.strip() for line in source.splitlines())
+
+
+def _load_sources(name, sources):
+    """Add ``name`` and every template it extends to ``sources``"""
+    while name and name not in sources:
+        template = engines['django'].engine.find_template(name)[1]
+        source = template.loader.get_contents(template)
+        sources[name] = source
+        parent = EXTENDS_RE.search(source)
+        name = parent.group(1) if parent else None
+
+
+class CompiledEmail:
+    """An email template compiled once into HTML (CSS inlined) and text templates"""
+
+    def __init__(self, html_template, text_template):
+        self.html_template = html_template
+        self.text_template = text_template
+
+    def render(self, context):
+        """Return (text, html) for one context dict"""
+        return self._render(Context(context, autoescape=False), Context(context))
+
+    def render_many(self, contexts, shared=None):
+        """
+        Render (text, html) for each per-recipient context, layered over
+        ``shared`` values, reusing one pair of Contexts for the whole batch.
+        """
+        text_ctx = Context(shared, autoescape=False)
+        html_ctx = Context(shared)
+        results = []
+        for context in contexts:
+            with text_ctx.push(context), html_ctx.push(context):
+                results.append(self._render(text_ctx, html_ctx))
+        return results
+
+    def _render(self, text_ctx, html_ctx):
+        text = BLANK_LINES_RE.sub('\n\n', self.text_template.render(text_ctx)).strip()
+        return text, self.html_template.render(html_ctx)
+
+
+_compiled = {}
+_lock = threading.Lock()
+
+
+def _build():
+    sources = {}
+    for name in EMAILS.values():
+        _load_sources(name, sources)
+
+    rules = {}
+    for source in sources.values():
+        for css in STYLE_RE.findall(source):
+            for selector, declarations in parse_stylesheet(css).items():
+                rules.setdefault(selector, []).extend(declarations)
+
+    html_engine = Engine(loaders=[
+        ('django.template.loaders.locmem.Loader', {n: inline_css(s, rules) for n, s in sources.items()}),
+    ])
+    text_engine = Engine(autoescape=False, loaders=[
+        ('django.template.loaders.locmem.Loader', {n: html_to_text_template(s) for n, s in sources.items()}),
+    ])
+    return {
+        key: CompiledEmail(html_engine.get_template(name), text_engine.get_template(name))
+        for key, name in EMAILS.items()
+    }
+
+
+def get_email(key):
+    """The compiled email for an EMAILS key, building all of them on first use"""
+    if not _compiled:
+        with _lock:
+            if not _compiled:
+                _compiled.update(_build())
+    return _compiled[key]
+
+
+def clear_cache():
+    """Forget compiled emails so the next render picks up template edits"""
+    with _lock:
+        _compiled.clear()
+
+
+# ---------------------- render time ----------------------
+
+def render(key, context):
+    return get_email(key).render(context)
+
+
+def render_many(key, contexts, shared=None):
+    return get_email(key).render_many(contexts, shared)
+
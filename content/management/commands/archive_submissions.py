@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from content import rollups
+from content.archive import ARCHIVABLE, archive
+
+
+class Command(BaseCommand):
+    help = 'Move old contact submissions and completed/cancelled bookings into compressed monthly archive files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+                            help='Archive rows submitted more than this many days ago')
+        parser.add_argument('--kind', choices=sorted(ARCHIVABLE), help='Only archive this kind')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would move')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        if not options['dry_run']:
+            # Make sure the analytics rollups have counted these rows first
+            rollups.refresh_all()
+
+        kinds = [options['kind']] if options['kind'] else sorted(ARCHIVABLE)
+        for kind in kinds:
+            count = archive(kind, cutoff, chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+            verb = 'would be archived' if options['dry_run'] else 'archived'
+            self.stdout.write(self.style.SUCCESS(f'{kind}: {count} rows {verb} (submitted before {cutoff:%Y-%m-%d})'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from content.identity import KINDS, index_many
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the normalized client identity index from bookings, contacts and subscribers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        for model, kind in KINDS.items():
+            total = 0
+            chunk = []
+            for instance in model.objects.order_by('pk').iterator(chunk_size=chunk_size):
+                chunk.append(instance)
+                if len(chunk) == chunk_size:
+                    total += index_many(chunk)
+                    chunk = []
+            total += index_many(chunk)
+            self.stdout.write(self.style.SUCCESS(f'{kind}: indexed {total} rows'))
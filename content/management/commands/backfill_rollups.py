@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from content.rollups import SOURCES, backfill
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily booking/contact rollups from the raw submission tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=sorted(SOURCES), help='Only rebuild this kind')
+        parser.add_argument('--since', help='First day to rebuild (YYYY-MM-DD); defaults to the oldest submission')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--since must be YYYY-MM-DD')
+
+        kinds = [options['kind']] if options['kind'] else sorted(SOURCES)
+        for kind in kinds:
+            hwm = backfill(kind, since=since)
+            if hwm is None:
+                self.stdout.write(self.style.WARNING(f'{kind}: no submissions to roll up'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{kind}: rollups rebuilt up to {hwm}'))
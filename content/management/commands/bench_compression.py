@@ -0,0 +1,58 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from content import compression
+
+
+class Command(BaseCommand):
+    help = 'CPU cost against bytes saved for each available codec and level on real responses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def bodies(self):
+        client = Client(HTTP_X_PRERENDER='1')
+        home = client.get('/')
+        bodies = [('home page (html)', home.content)]
+        search = client.get('/api/blogs/search/', {'q': 'the'})
+        if search.status_code == 200:
+            bodies.append(('blog search (json)', search.content))
+        # Stand-in for a larger JSON payload such as the analytics endpoints
+        rows = [{'day': f'2024-01-{d % 28 + 1:02d}', 'service_type': 'therapy', 'status': 'confirmed', 'total': d}
+                for d in range(500)]
+        bodies.append(('500-row report (json)', json.dumps(rows).encode()))
+        return bodies
+
+    def time_it(self, func, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            result = func()
+        return (time.perf_counter() - start) / iterations, result
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        names = ', '.join(codec.name for codec in compression.CODECS)
+        self.stdout.write(f'Codecs available: {names} ({iterations} iterations each)')
+
+        for label, body in self.bodies():
+            self.stdout.write(f'\n{label}: {len(body)} bytes')
+            for codec in compression.CODECS:
+                for level in sorted({codec.cheap_level, codec.level}):
+                    seconds, data = self.time_it(lambda: codec.compress(body, level), iterations)
+                    saved = 1 - len(data) / len(body)
+                    self.stdout.write(
+                        f'  {codec.name:<5} level {level:<2} {seconds * 1e6:8.0f} us  '
+                        f'{len(data):7d} bytes  saved {saved:6.1%}  '
+                        f'{(len(body) - len(data)) / seconds / 1e6:8.1f} MB saved per CPU-second'
+                    )
+
+            codec = compression.CODECS[0]
+            compression.compressed_cache.clear()
+            compression.compress(body, codec)
+            seconds, _ = self.time_it(lambda: compression.compress(body, codec), iterations)
+            self.stdout.write(f'  cached {codec.name} body (digest + LRU hit) {seconds * 1e6:8.0f} us')
+            seconds, _ = self.time_it(lambda: compression.compress_with_padding(body), iterations)
+            self.stdout.write(f'  padded gzip (CSRF pages)          {seconds * 1e6:8.0f} us')
@@ -0,0 +1,74 @@
+import datetime
+import re
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from content import mail
+from content.models import ServiceBooking
+
+
+def sample_bookings(count):
+    return [
+        ServiceBooking(
+            id=i,
+            full_name=f'Client {i}',
+            email=f'client{i}@example.com',
+            phone='0712345678',
+            service_type='counselling',
+            session_mode='online',
+            preferred_date=datetime.date(2025, 1, 1) + datetime.timedelta(days=i % 30),
+            preferred_time=datetime.time(9 + i % 8),
+            description='Looking for support with work-related stress.',
+            submitted_at=timezone.now(),
+        )
+        for i in range(count)
+    ]
+
+
+def naive_render(booking):
+    """What per-message rendering costs without the compiled layer: render, inline, strip"""
+    html = render_to_string('emails/booking_confirmation.html', {'booking': booking})
+    rules = {}
+    for css in mail.STYLE_RE.findall(html):
+        rules.update(mail.parse_stylesheet(css))
+    html = mail.inline_css(html, rules)
+    text = re.sub(r'\n\s*\n+', '\n\n', mail.ANY_TAG_RE.sub('', mail.HEAD_RE.sub('', html))).strip()
+    return text, html
+
+
+class Command(BaseCommand):
+    help = 'Measure per-message render cost of booking_confirmation: naive vs compiled vs batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=500)
+
+    def timed(self, func, count):
+        start = time.perf_counter()
+        func()
+        return (time.perf_counter() - start) / count * 1e6
+
+    def handle(self, *args, **options):
+        count = options['messages']
+        bookings = sample_bookings(count)
+
+        start = time.perf_counter()
+        mail.clear_cache()
+        mail.get_email('booking_confirmation')
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        results = [
+            ('naive (render + inline + strip)', self.timed(lambda: [naive_render(b) for b in bookings], count)),
+            ('compiled render()', self.timed(
+                lambda: [mail.render('booking_confirmation', {'booking': b}) for b in bookings], count)),
+            ('compiled render_many()', self.timed(
+                lambda: mail.render_many('booking_confirmation', [{'booking': b} for b in bookings]), count)),
+        ]
+
+        self.stdout.write(f'one-off compile of all email templates: {build_ms:.1f} ms')
+        self.stdout.write(f'{count} booking confirmations (text + HTML)')
+        naive_us = results[0][1]
+        for label, us in results:
+            self.stdout.write(f'  {label:<34} {us:8.1f} us/message  ({naive_us / us:5.2f}x)')
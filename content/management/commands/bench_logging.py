@@ -0,0 +1,70 @@
+import logging
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from mwasa.log import QueuedJsonHandler, SamplingFilter
+
+
+def simulate_request(logger, i):
+    """The log calls made by one booking submission, including a failure every 50th"""
+    email = f'client{i}@example.com'
+    logger.info("Booking submission received: %s", email)
+    logger.info("Booking created successfully for: %s", email)
+    logger.info("Email sent successfully to %s", [email])
+    if i % 50 == 0:
+        try:
+            raise ValueError(f"simulated failure for {email}")
+        except ValueError as e:
+            logger.exception("Unexpected error in booking submission: %s", e)
+
+
+class Command(BaseCommand):
+    help = 'Measure per-request logging overhead: synchronous StreamHandler vs the queued JSON handler'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument('--sample-rate', type=int, default=10)
+
+    def run(self, handler, requests):
+        logger = logging.getLogger('bench.logging')
+        logger.handlers = [handler]
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+
+        start = time.perf_counter()
+        for i in range(requests):
+            simulate_request(logger, i)
+        elapsed = time.perf_counter() - start
+
+        logger.handlers = []
+        return elapsed / requests * 1e6
+
+    def handle(self, *args, **options):
+        requests = options['requests']
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, 'sync.log'), 'w') as sync_stream:
+                sync = logging.StreamHandler(sync_stream)
+                sync.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+                sync_us = self.run(sync, requests)
+
+            results = [('sync StreamHandler', sync_us)]
+            for rate in (1, options['sample_rate']):
+                with open(os.path.join(tmp, f'queued_{rate}.log'), 'w') as stream:
+                    queued = QueuedJsonHandler(stream=stream)
+                    queued.addFilter(SamplingFilter(rate))
+                    queued_us = self.run(queued, requests)
+                    start = time.perf_counter()
+                    queued.close()
+                    drain_ms = (time.perf_counter() - start) * 1e3
+                    self.stdout.write(f'queued (sample 1/{rate}) listener drained backlog in {drain_ms:.1f} ms')
+                    if queued.dropped:
+                        self.stdout.write(self.style.WARNING(f'queued (sample 1/{rate}) dropped {queued.dropped} records'))
+                results.append((f'queued JSON (sample 1/{rate})', queued_us))
+
+        self.stdout.write(f'{requests} simulated requests, 3-4 log calls each')
+        for label, us in results:
+            self.stdout.write(f'  {label:<32} {us:8.2f} us/request  ({us / sync_us:5.2f}x sync)')
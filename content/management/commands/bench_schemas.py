@@ -0,0 +1,83 @@
+import json
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from content import schemas
+
+BOOKING = {
+    'fullName': '  Jane Wanjiku ',
+    'email': 'Jane.Wanjiku@Example.com',
+    'phone': '+254 712 345 678',
+    'serviceType': 'counselling',
+    'sessionMode': 'online',
+    'preferredDate': '2025-03-14',
+    'preferredTime': '02:30 PM',
+    'description': 'Would like to discuss workplace stress. ' * 5,
+}
+
+
+def legacy_booking(request):
+    """The hand-written parsing submit_booking did before schemas"""
+    data = json.loads(request.body.decode('utf-8'))
+    required_fields = ['fullName', 'email', 'phone', 'serviceType', 'sessionMode', 'preferredDate', 'preferredTime']
+    missing_fields = [field for field in required_fields if not data.get(field)]
+    if missing_fields:
+        return None
+    date_obj = datetime.strptime(data.get('preferredDate'), '%Y-%m-%d').date()
+    time_str = data.get('preferredTime')
+    if 'AM' in time_str.upper() or 'PM' in time_str.upper():
+        time_obj = datetime.strptime(time_str, '%I:%M %p').time()
+    else:
+        time_obj = datetime.strptime(time_str, '%H:%M').time()
+    return dict(
+        full_name=data.get('fullName').strip(),
+        email=data.get('email').strip().lower(),
+        phone=data.get('phone').strip(),
+        service_type=data.get('serviceType'),
+        session_mode=data.get('sessionMode'),
+        preferred_date=date_obj,
+        preferred_time=time_obj,
+        description=data.get('description', '').strip(),
+    )
+
+
+class Command(BaseCommand):
+    help = 'Per-request cost of parsing and validating a booking submission'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000)
+
+    def time_it(self, label, func, iterations, baseline=None):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        per_call = (time.perf_counter() - start) / iterations
+        note = f'  ({baseline / per_call:.1f}x)' if baseline else ''
+        self.stdout.write(f'  {label:<44} {per_call * 1e6:7.2f} us{note}')
+        return per_call
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        factory = RequestFactory()
+        valid = factory.post('/api/submit-booking/', BOOKING, content_type='application/json')
+        broken = factory.post('/api/submit-booking/', {
+            **BOOKING, 'email': 'nope', 'preferredDate': '14/03/2025', 'phone': '',
+        }, content_type='application/json')
+        valid.body, broken.body  # read once, as the view would
+        data = schemas.loads(valid.body)
+
+        def reject():
+            try:
+                schemas.BOOKING.parse(broken)
+            except schemas.ValidationError:
+                pass
+
+        decoder = 'orjson' if schemas.orjson is not None else 'json'
+        self.stdout.write(f'{len(valid.body)}-byte booking, {iterations} iterations, decoder: {decoder}')
+        baseline = self.time_it('legacy json.loads + strptime', lambda: legacy_booking(valid), iterations)
+        self.time_it('schema parse (decode + validate)', lambda: schemas.BOOKING.parse(valid), iterations, baseline)
+        self.time_it('schema validate only', lambda: schemas.BOOKING.validate(data), iterations)
+        self.time_it('schema parse, 3 errors reported', reject, iterations)
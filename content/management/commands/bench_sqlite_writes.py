@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+SCHEMA = """
+CREATE TABLE booking (id INTEGER PRIMARY KEY, email TEXT, submitted_at REAL);
+CREATE TABLE counter (name TEXT PRIMARY KEY, value INTEGER);
+INSERT INTO counter VALUES ('bookings_total', 0);
+"""
+
+
+def submission(conn, worker, i):
+    """What one booking submission does: read, insert, bump the counter, commit"""
+    conn.execute('SELECT value FROM counter WHERE name = ?', ['bookings_total']).fetchone()
+    conn.execute('INSERT INTO booking (email, submitted_at) VALUES (?, ?)', [f'{worker}-{i}@example.com', time.time()])
+    conn.execute("UPDATE counter SET value = value + 1 WHERE name = 'bookings_total'")
+
+
+def worker_main(path, profile, worker, writes, retries, results):
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+    begin = 'BEGIN'
+    if profile == 'tuned':
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        begin = 'BEGIN IMMEDIATE'
+
+    ok = locked = retried = 0
+    for i in range(writes):
+        for attempt in range(retries + 1):
+            try:
+                conn.execute(begin)
+                submission(conn, worker, i)
+                conn.execute('COMMIT')
+                ok += 1
+                break
+            except sqlite3.OperationalError as e:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                if 'locked' not in str(e):
+                    raise
+                if attempt == retries:
+                    locked += 1
+                else:
+                    retried += 1
+                    time.sleep(0.01 * (2 ** attempt))
+    conn.close()
+    results.put((ok, locked, retried))
+
+
+class Command(BaseCommand):
+    help = 'Concurrent submission writes against SQLite: default settings vs the tuned profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--writes', type=int, default=200, help='Submissions per worker')
+
+    def run(self, profile, workers, writes, retries):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.sqlite3')
+            conn = sqlite3.connect(path)
+            conn.executescript(SCHEMA)
+            conn.close()
+
+            ctx = multiprocessing.get_context('fork')
+            results = ctx.Queue()
+            procs = [
+                ctx.Process(target=worker_main, args=(path, profile, w, writes, retries, results))
+                for w in range(workers)
+            ]
+            start = time.perf_counter()
+            for proc in procs:
+                proc.start()
+            totals = [results.get() for _ in procs]
+            for proc in procs:
+                proc.join()
+            elapsed = time.perf_counter() - start
+
+        ok, locked, retried = (sum(column) for column in zip(*totals))
+        return ok, locked, retried, elapsed
+
+    def handle(self, *args, **options):
+        workers, writes = options['workers'], options['writes']
+        attempted = workers * writes
+        self.stdout.write(f'{workers} processes x {writes} submissions (read, insert, counter update)')
+        runs = [
+            ('default (rollback journal, BEGIN)', 'default', 0),
+            ('tuned (WAL, BEGIN IMMEDIATE)', 'tuned', 0),
+            (f'tuned + {settings.DB_WRITE_RETRIES} retries', 'tuned', settings.DB_WRITE_RETRIES),
+        ]
+        for label, profile, retries in runs:
+            ok, locked, retried, elapsed = self.run(profile, workers, writes, retries)
+            self.stdout.write(
+                f'  {label:<36} {ok / elapsed:8.0f} writes/s  '
+                f'locked {locked / attempted:6.1%} ({locked})  retried {retried}'
+            )
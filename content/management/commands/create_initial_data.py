@@ -42,30 +42,10 @@ class Command(BaseCommand):
             ('hours_weekend', 'Sat: 9:00 AM - 2:00 PM', 'contact'),
         ]
 
-        created_count = 0
-        updated_count = 0
-
-        for key, value, content_type in initial_content:
-            obj, created = WebsiteContent.objects.get_or_create(
-                key=key,
-                defaults={
-                    'value': value,
-                    'content_type': content_type,
-                    'description': f'Content for {key}'
-                }
-            )
-            
-            if created:
-                created_count += 1
-                self.stdout.write(self.style.SUCCESS(f'Created: {key}'))
-            else:
-                # Update existing content
-                obj.value = value
-                obj.content_type = content_type
-                obj.description = f'Content for {key}'
-                obj.save()
-                updated_count += 1
-                self.stdout.write(self.style.WARNING(f'Updated: {key}'))
+        created_count, updated_count = WebsiteContent.bulk_upsert(
+            (key, value, content_type, f'Content for {key}')
+            for key, value, content_type in initial_content
+        )
 
         self.stdout.write(
             self.style.SUCCESS(
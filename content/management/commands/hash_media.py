@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from content import prerender
+from content.media import HashedMediaStorage, is_hashed_name
+from content.models import Blog
+from content.versioning import bump_content_version
+
+
+class Command(BaseCommand):
+    help = 'Move blog images saved before HashedMediaStorage to content-hashed names'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, HashedMediaStorage):
+            self.stderr.write('DEFAULT_FILE_STORAGE is not HashedMediaStorage; nothing to do')
+            return
+
+        moved = 0
+        for blog in Blog.objects.exclude(image='').exclude(image__isnull=True).only('pk', 'image'):
+            old = blog.image.name
+            if is_hashed_name(old):
+                continue
+            if not default_storage.exists(old):
+                self.stderr.write(f'Blog {blog.pk}: {old} is missing')
+                continue
+            if options['dry_run']:
+                self.stdout.write(f'Blog {blog.pk}: would rename {old}')
+                moved += 1
+                continue
+            with default_storage.open(old) as f:
+                new = default_storage.save(old, f)
+            # update() keeps this out of the per-save signals; versions are bumped once below
+            Blog.objects.filter(pk=blog.pk).update(image=new)
+            self.stdout.write(f'Blog {blog.pk}: {old} -> {new}')
+            moved += 1
+
+        if moved and not options['dry_run']:
+            bump_content_version()
+            if settings.PRERENDER_ENABLED:
+                prerender.render_all()
+        # Originals are left in place for anything still linking to them
+        self.stdout.write(self.style.SUCCESS(f'{moved} images {"to move" if options["dry_run"] else "moved"}'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from content.prerender import render_all
+
+
+class Command(BaseCommand):
+    help = 'Render the public pages to static HTML (with compressed variants) for the pre-render middleware'
+
+    def handle(self, *args, **options):
+        for path in render_all():
+            self.stdout.write(self.style.SUCCESS(f'Wrote {path}'))
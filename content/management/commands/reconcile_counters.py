@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from content.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recount dashboard counters from the source tables and repair any drift'
+
+    def handle(self, *args, **options):
+        drift = reconcile()
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('All dashboard counters are accurate'))
+            return
+        for name, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(self.style.WARNING(f'Repaired {name}: {stored} -> {actual}'))
+        self.stdout.write(self.style.SUCCESS(f'Repaired {len(drift)} counters'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from content import journal
+
+
+class Command(BaseCommand):
+    help = 'Write submissions journaled during a database outage, in the order they arrived'
+
+    def handle(self, *args, **options):
+        waiting = journal.depth()
+        if not waiting:
+            self.stdout.write('Journal is empty')
+            return
+        try:
+            totals = journal.replay()
+        except journal.DB_UNAVAILABLE as e:
+            raise CommandError(f'Database still unavailable ({e}); {journal.depth()} entries kept')
+        if totals is None:
+            raise CommandError('Another process is replaying the journal')
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['applied']} applied, {totals['duplicate']} already applied, "
+            f"{totals['rejected']} rejected (see Journal replays in the admin)"
+        ))
@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from content.delivery import smtp_breaker
+from content.models import ContactSubmission, NewsletterSubscriber, ServiceBooking
+
+# (model, unsent flag, timestamp field, send method); a booking's method
+# sends only the admin or client email that is still missing
+NOTIFICATIONS = [
+    (ServiceBooking, 'email_sent', 'submitted_at', 'send_booking_email'),
+    (ContactSubmission, 'email_sent', 'submitted_at', 'send_contact_notification'),
+    (NewsletterSubscriber, 'welcome_email_sent', 'subscribed_at', 'send_welcome_email'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Resend booking, contact and welcome emails that failed or were skipped while mail was down'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=72, help='Only retry submissions from the last N hours')
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=options['hours'])
+        for model, flag, timestamp, method in NOTIFICATIONS:
+            pending = model.objects.filter(**{flag: False, f'{timestamp}__gte': since}).order_by(timestamp)
+            total = pending.count()
+            sent = 0
+            for instance in pending.iterator():
+                if smtp_breaker.state() == 'open':
+                    self.stdout.write(self.style.WARNING('Mail circuit breaker is open; stopping'))
+                    return
+                getattr(instance, method)()
+                sent += getattr(instance, flag)
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {sent} of {total} resent')
@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from content import scheduler
+
+
+class Command(BaseCommand):
+    help = ('Every SCHEDULER_TICK_SECONDS: queue appointment reminders, deliver the outbox '
+            'and send the admin digest (safe to run more than one)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run a single tick and exit')
+        parser.add_argument('--no-deliver', action='store_true',
+                            help='Only queue emails; leave delivery to send_queued_emails')
+
+    def tick(self, deliver):
+        result = scheduler.tick(deliver)
+        if result['reminders']:
+            self.stdout.write(f"Queued {result['reminders']} reminders")
+        if result['sent'] or result['failed']:
+            self.stdout.write(f"Delivered {result['sent']} queued emails, {result['failed']} failed")
+        if result['digested']:
+            self.stdout.write(f"Sent the admin digest with {result['digested']} items")
+        if result['repaired']:
+            self.stdout.write(f"Repaired {result['repaired']} drifted dashboard counters")
+
+    def handle(self, *args, **options):
+        deliver = not options['no_deliver']
+        if options['once']:
+            self.tick(deliver)
+            return
+
+        self.stdout.write(f'Scheduler running every {settings.SCHEDULER_TICK_SECONDS}s '
+                          f'(reminder offsets {settings.REMINDER_OFFSETS} minutes)')
+        try:
+            while True:
+                started = time.monotonic()
+                try:
+                    self.tick(deliver)
+                except Exception as e:
+                    # A database or SMTP blip shouldn't stop the scheduler; claims roll back
+                    self.stderr.write(f'Scheduler tick failed: {e}')
+                finally:
+                    close_old_connections()
+                time.sleep(max(settings.SCHEDULER_TICK_SECONDS - (time.monotonic() - started), 1))
+        except KeyboardInterrupt:
+            self.stdout.write('Scheduler stopped')
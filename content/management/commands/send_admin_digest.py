@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from content.digest import pending, send_digest
+
+
+class Command(BaseCommand):
+    help = 'Send pending admin notifications as one digest email once the digest window has passed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Send now, even if the window has not passed')
+
+    def handle(self, *args, **options):
+        if settings.ADMIN_NOTIFY_MODE != 'digest':
+            self.stdout.write('ADMIN_NOTIFY_MODE is not "digest"; sending anything still pending')
+        # Items left over from digest mode are still delivered after switching back
+        sent = send_digest(force=options['force'] or settings.ADMIN_NOTIFY_MODE != 'digest')
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} notifications in a digest, {pending().count()} pending'))
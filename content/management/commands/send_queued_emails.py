@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from content.outbox import pending, send_pending
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued notification emails in batches over one connection per batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Messages per connection (default OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches')
+
+    def handle(self, *args, **options):
+        result = send_pending(options['batch_size'], options['max_batches'])
+        if result is None:
+            raise CommandError('Another process is already sending the outbox; try again shortly')
+        sent, failed = result
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(f'Sent {sent} emails, {failed} failed, {pending().count()} still queued'))
@@ -0,0 +1,27 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from content.routers import PRIMARY, REPLICA, replica_configured
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database onto the SQLite replica (local replica testing)'
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError('No replica database; set REPLICA_DATABASE_URL')
+        primary, replica = connections[PRIMARY], connections[REPLICA]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError('sync_replica only copies SQLite to SQLite; real replicas replicate themselves')
+
+        replica.close()
+        primary.ensure_connection()
+        target = sqlite3.connect(replica.settings_dict['NAME'])
+        try:
+            # Online backup: a consistent snapshot even while the primary takes writes
+            primary.connection.backup(target)
+        finally:
+            target.close()
+        self.stdout.write(self.style.SUCCESS(f"Replica {replica.settings_dict['NAME']} synced from primary"))
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from content.bookings import STATUSES, transition
+from content.models import ServiceBooking
+
+
+class Command(BaseCommand):
+    help = 'Move a selection of bookings to a new status with one UPDATE, queueing client notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('status', choices=STATUSES, help='New status')
+        parser.add_argument('--ids', nargs='+', type=int, help='Only these booking ids')
+        parser.add_argument('--from-status', choices=STATUSES, help='Only bookings currently in this status')
+        parser.add_argument('--date-before', help='Only bookings whose preferred date is before YYYY-MM-DD')
+        parser.add_argument('--no-notify', action='store_true', help="Don't queue client emails")
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many bookings would change')
+
+    def handle(self, *args, **options):
+        bookings = ServiceBooking.objects.all()
+        if options['ids']:
+            bookings = bookings.filter(pk__in=options['ids'])
+        if options['from_status']:
+            bookings = bookings.filter(status=options['from_status'])
+        if options['date_before']:
+            try:
+                day = datetime.strptime(options['date_before'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--date-before must be YYYY-MM-DD')
+            bookings = bookings.filter(preferred_date__lt=day)
+        if not (options['ids'] or options['from_status'] or options['date_before']):
+            raise CommandError('Select bookings with --ids, --from-status and/or --date-before')
+
+        status = options['status']
+        if options['dry_run']:
+            count = bookings.exclude(status=status).count()
+            self.stdout.write(f'{count} bookings would move to {status}')
+            return
+
+        count = transition(bookings, status, notify=not options['no_notify'])
+        self.stdout.write(self.style.SUCCESS(f'Moved {count} bookings to {status}'))
+        if count and not options['no_notify']:
+            self.stdout.write('Client notifications queued; the scheduler delivers them (or run send_queued_emails)')
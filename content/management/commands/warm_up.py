@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from content import warmup
+
+
+class Command(BaseCommand):
+    help = 'Run the deploy warm-up and report how long it took and what the first requests cost'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-prepare', action='store_true',
+                            help='Skip the once-per-deploy cache priming and pre-render')
+
+    def write_timings(self, timings):
+        for step, seconds in timings:
+            self.stdout.write(f'  {step:<30} {seconds * 1000:8.1f} ms')
+
+    def handle(self, *args, **options):
+        # A cold pass first: what the first visitor to an unwarmed worker waits for
+        cold = warmup.request_urls()
+
+        if not options['no_prepare']:
+            self.stdout.write('Once per deploy:')
+            self.write_timings(warmup.prepare())
+        self.stdout.write('Per worker:')
+        try:
+            timings = warmup.warm_worker()
+        except warmup.WarmupError as e:
+            raise CommandError(f'Warm-up failed: {e}')
+        self.write_timings(timings)
+        total = sum(seconds for _, seconds in timings)
+
+        self.stdout.write('First request latency (cold -> after warm-up):')
+        warm = {url: seconds for url, _, seconds in warmup.request_urls()}
+        for url, status, seconds in cold:
+            self.stdout.write(f'  GET {url:<26} {seconds * 1000:8.1f} ms -> {warm[url] * 1000:.1f} ms ({status})')
+        self.stdout.write(self.style.SUCCESS(f'Worker warm-up took {total * 1000:.0f} ms'))
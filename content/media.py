@@ -0,0 +1,185 @@
+"""
+Uploaded media: content-addressed storage and an efficient serving view.
+
+HashedMediaStorage saves every upload as ``<upload_to>/<sha256 prefix><ext>``,
+so the same image uploaded twice is stored once, and a name never changes
+content. ``serve_media`` can therefore mark hashed files immutable for a
+year; files from before this storage keep a short MEDIA_MAX_AGE.
+
+The view answers conditional (ETag / Last-Modified) and single-range
+requests itself. With MEDIA_SENDFILE set it only checks the file and hands
+the transfer to the front server through X-Sendfile (Apache, lighttpd) or
+X-Accel-Redirect (nginx), which then does ranges itself.
+"""
+
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+import tempfile
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+HASH_LENGTH = 32
+HASHED_NAME_RE = re.compile(r'(^|/)[0-9a-f]{%d}(\.[\w]+)?$' % HASH_LENGTH)
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+CHUNK_SIZE = 64 * 1024
+
+
+def is_hashed_name(name):
+    return bool(HASHED_NAME_RE.search(name))
+
+
+class HashedMediaStorage(FileSystemStorage):
+    """FileSystemStorage naming each file after a hash of its content"""
+
+    def get_available_name(self, name, max_length=None):
+        # Names come from the content, so an existing file is simply reused
+        return name
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory = posixpath.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        return posixpath.join(directory, digest.hexdigest()[:HASH_LENGTH] + ext)
+
+    def _save(self, name, content):
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            return name
+        # Not FileSystemStorage._save: on FileExistsError it asks
+        # get_available_name for a new name, which here is the same one, and
+        # loops forever. Write a temporary file and link it into place.
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in content.chunks():
+                    f.write(chunk)
+            os.chmod(tmp, self.file_permissions_mode or 0o644)
+            try:
+                os.link(tmp, full_path)
+            except FileExistsError:
+                # A concurrent upload of the same content got there first
+                return name
+        finally:
+            os.unlink(tmp)
+        self._ensure_location_group_id(full_path)
+        return name
+
+
+# ---------------------- serving ----------------------
+
+def _etag(stat):
+    return quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single byte range, None to serve it all, or 'invalid'"""
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if match is None:
+        # Multiple ranges or another unit: a full response is always allowed
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last or int(last) == 0:
+            return 'invalid'
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or (last and int(last) < start):
+            return 'invalid'
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            data = f.read(min(CHUNK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def _sendfile_response(path, name, content_type):
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + quote(name)
+    else:
+        response['X-Sendfile'] = path
+    # The front server replaces the (empty) body with the file
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve a file from MEDIA_ROOT with caching, conditional and range support"""
+    name = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, ValueError, OSError):
+        raise Http404('No such file')
+    if not os.path.isfile(full_path) or os.path.basename(name).startswith('.'):
+        raise Http404('No such file')
+
+    etag = _etag(stat)
+    cache_control = IMMUTABLE if is_hashed_name(name) else f'public, max-age={settings.MEDIA_MAX_AGE}'
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        if isinstance(not_modified, HttpResponseNotModified):
+            not_modified['Cache-Control'] = cache_control
+        return not_modified
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    if settings.MEDIA_SENDFILE:
+        response = _sendfile_response(full_path, name, content_type)
+    else:
+        byte_range = None
+        if 'HTTP_RANGE' in request.META:
+            # If-Range: only honour the range if the client has this version
+            if_range = request.META.get('HTTP_IF_RANGE')
+            if if_range is None or if_range == etag:
+                byte_range = parse_range(request.META['HTTP_RANGE'], stat.st_size)
+        if byte_range == 'invalid':
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        if byte_range is None:
+            response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _read_range(full_path, start, end - start + 1), status=206, content_type=content_type,
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = str(end - start + 1)
+        response['Accept-Ranges'] = 'bytes'
+
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = cache_control
+    return response
@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.utils.cache import has_vary_header, patch_cache_control, patch_vary_headers
+
+from . import compression, routers
+
+
+class PublicPageSessionMiddleware(SessionMiddleware):
+    """
+    SessionMiddleware that keeps views marked with @public_page away from
+    the session store entirely.
+
+    Public pages get an empty, unsaved session (so request.user is
+    anonymous) and their responses skip session saving. A response that
+    still carries nothing user-specific is marked cacheable by shared
+    caches; anything that sets a cookie or varies on Cookie stays private.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if getattr(view_func, 'public_page', False):
+            request.public_page = True
+            request.session = self.SessionStore()
+
+    def process_response(self, request, response):
+        if not getattr(request, 'public_page', False):
+            return super().process_response(request, response)
+
+        if response.status_code in (200, 304) and not response.cookies and not has_vary_header(response, 'Cookie'):
+            patch_cache_control(response, public=True, max_age=0, s_maxage=settings.PUBLIC_PAGE_S_MAXAGE)
+        else:
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sets up per-request database routing. Views marked @replica_reads read
+    from the replica unless the client made an unsafe request in the last
+    REPLICA_PIN_SECONDS; unsafe requests set the short-lived pin cookie.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = routers.begin_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.end_request(token)
+
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE') and routers.replica_configured():
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+                secure=request.is_secure(),
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if getattr(view_func, 'replica_reads', False) and settings.REPLICA_PIN_COOKIE not in request.COOKIES:
+            routers.current_state().use_replica = True
+
+
+class CompressionMiddleware:
+    """
+    Compress HTML/JSON responses with the best codec the client accepts
+    (see content.compression). Skips streaming and already-encoded
+    responses (WhiteNoise files, pre-rendered pages), small bodies and
+    non-text types; backs off to cheaper levels under CPU pressure.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            not settings.COMPRESSION_ENABLED
+            or response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < settings.COMPRESSION_MIN_SIZE
+            or not compression.is_compressible(response.get('Content-Type', ''))
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        ae = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if request.META.get('CSRF_COOKIE_USED'):
+            # The body holds a secret: padded gzip only, never cached
+            codec = compression.negotiate(ae, [c for c in compression.CODECS if c.name == 'gzip'])
+            if codec is None or compression.pressure() == 'overloaded':
+                return response
+            compressed = compression.compress_with_padding(response.content)
+        else:
+            codec = compression.negotiate(ae)
+            if codec is None:
+                return response
+            state = compression.pressure()
+            compressed = compression.compress(
+                response.content, codec, cheap=state != 'normal', allow_new=state != 'overloaded',
+            )
+            if compressed is None:
+                return response
+
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = codec.name
+        # A strong ETag names one representation; keep conditional requests working
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        return response
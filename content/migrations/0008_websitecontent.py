@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0007_service_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebsiteContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('value', models.TextField()),
+                ('content_type', models.CharField(choices=[('hero', 'Hero Section'), ('service', 'Services Section'), ('contact', 'Contact Section')], max_length=20)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Website content',
+                'ordering': ['content_type', 'key'],
+            },
+        ),
+    ]
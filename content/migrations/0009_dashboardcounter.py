@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:18
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_counters(apps, schema_editor):
+    """Start the counters from the current row counts"""
+    DashboardCounter = apps.get_model('content', 'DashboardCounter')
+    ServiceBooking = apps.get_model('content', 'ServiceBooking')
+    ContactSubmission = apps.get_model('content', 'ContactSubmission')
+    NewsletterSubscriber = apps.get_model('content', 'NewsletterSubscriber')
+
+    values = dict.fromkeys(['bookings_pending', 'bookings_confirmed', 'bookings_completed', 'bookings_cancelled'], 0)
+    for status, n in ServiceBooking.objects.values_list('status').annotate(n=Count('id')).order_by():
+        values[f'bookings_{status}'] = n
+    values['bookings_total'] = ServiceBooking.objects.count()
+    values['contacts_total'] = ContactSubmission.objects.count()
+    values['contacts_unread'] = ContactSubmission.objects.filter(is_read=False).count()
+    values['subscribers_total'] = NewsletterSubscriber.objects.count()
+    values['subscribers_active'] = NewsletterSubscriber.objects.filter(is_active=True).count()
+
+    DashboardCounter.objects.bulk_create(
+        [DashboardCounter(name=name, value=value) for name, value in values.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0008_websitecontent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+PG_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(excerpt, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'C')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    """FTS5 table on SQLite, tsvector column + GIN index on PostgreSQL; nothing elsewhere"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS content_blog_fts USING fts5(title, excerpt, content)"
+        )
+        schema_editor.execute(
+            "INSERT INTO content_blog_fts (rowid, title, excerpt, content) "
+            "SELECT id, title, excerpt, content FROM content_blog"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE content_blog ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        schema_editor.execute(f"UPDATE content_blog SET search_vector = {PG_VECTOR_SQL}")
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS content_blog_search_idx ON content_blog USING GIN (search_vector)"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS content_blog_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS content_blog_search_idx")
+        schema_editor.execute("ALTER TABLE content_blog DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0010_submission_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0011_blog_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientInteraction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('booking', 'Booking'), ('contact', 'Contact message'), ('subscription', 'Newsletter subscription')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('email', models.CharField(blank=True, max_length=254)),
+                ('phone', models.CharField(blank=True, max_length=20)),
+                ('name', models.CharField(blank=True, max_length=200)),
+                ('summary', models.CharField(blank=True, max_length=300)),
+                ('occurred_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['-occurred_at'],
+                'indexes': [models.Index(fields=['email', 'occurred_at'], name='client_email_idx'), models.Index(fields=['phone', 'occurred_at'], name='client_phone_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='clientinteraction',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_client_interaction'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0012_clientinteraction'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clientinteraction',
+            name='archived',
+            field=models.BooleanField(default=False, help_text='Source row moved to the cold archive'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0014_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactsubmission',
+            name='email_error',
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0015_contactsubmission_email_error'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuarantinedSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=30)),
+                ('email', models.EmailField(blank=True, max_length=254)),
+                ('payload', models.JSONField()),
+                ('reason', models.CharField(max_length=30)),
+                ('fingerprint', models.CharField(db_index=True, max_length=64)),
+                ('status', models.CharField(choices=[('held', 'Held for review'), ('spam', 'Confirmed spam'), ('released', 'Released')], default='held', max_length=10)),
+                ('received_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
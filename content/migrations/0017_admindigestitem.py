@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0016_quarantinedsubmission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdminDigestItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('subject', models.CharField(max_length=300)),
+                ('body', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sent_at', 'created_at'], name='digest_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0018_booking_reminders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JournalReplay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_id', models.CharField(max_length=32, unique=True)),
+                ('kind', models.CharField(max_length=20)),
+                ('journaled_at', models.DateTimeField()),
+                ('replayed_at', models.DateTimeField(auto_now_add=True)),
+                ('rejected', models.BooleanField(default=False)),
+                ('error', models.TextField(blank=True)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def fill_slugs(apps, schema_editor):
+    Blog = apps.get_model('content', 'Blog')
+    taken = set()
+    for blog in Blog.objects.order_by('created_at', 'pk').only('pk', 'title'):
+        base = slugify(blog.title)[:200] or 'post'
+        slug, n = base, 2
+        while slug in taken:
+            slug, n = f'{base}-{n}', n + 1
+        taken.add(slug)
+        Blog.objects.filter(pk=blog.pk).update(slug=slug)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0019_journal_replay'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='slug',
+            field=models.SlugField(blank=True, default='', max_length=220),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='blog',
+            name='slug',
+            field=models.SlugField(blank=True, help_text='URL of the post; filled from the title if left blank', max_length=220, unique=True),
+        ),
+    ]
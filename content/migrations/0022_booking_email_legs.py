@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:22
+
+from django.db import migrations, models
+
+
+def mark_sent_legs(apps, schema_editor):
+    ServiceBooking = apps.get_model('content', 'ServiceBooking')
+    ServiceBooking.objects.filter(email_sent=True).update(admin_email_sent=True, client_email_sent=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0021_outbox_deferral'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicebooking',
+            name='admin_email_sent',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='servicebooking',
+            name='client_email_sent',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_sent_legs, migrations.RunPython.noop),
+    ]
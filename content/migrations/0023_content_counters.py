@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+def seed_content_counters(apps, schema_editor):
+    """Start the blog and service counters from the current row counts"""
+    DashboardCounter = apps.get_model('content', 'DashboardCounter')
+    Blog = apps.get_model('content', 'Blog')
+    Service = apps.get_model('content', 'Service')
+
+    values = {
+        'blogs_total': Blog.objects.count(),
+        'blogs_published': Blog.objects.filter(is_published=True).count(),
+        'services_total': Service.objects.count(),
+        'services_active': Service.objects.filter(is_active=True).count(),
+    }
+    for name, value in values.items():
+        DashboardCounter.objects.update_or_create(name=name, defaults={'value': value})
+
+
+def remove_content_counters(apps, schema_editor):
+    DashboardCounter = apps.get_model('content', 'DashboardCounter')
+    DashboardCounter.objects.filter(
+        name__in=['blogs_total', 'blogs_published', 'services_total', 'services_active'],
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0022_booking_email_legs'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_content_counters, remove_content_counters),
+    ]
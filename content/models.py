@@ -1,24 +1,57 @@
-from django.db import models
-from django.core.mail import send_mail
+from django.db import models, connection, transaction
 from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import slugify
+from . import delivery, mail, prerender
+from .content_store import invalidate_website_content
+from .versioning import bump_content_version
 import logging
 
 logger = logging.getLogger(__name__)
 
+class SendResult:
+    """Outcome of safe_send_mail; truthy when the message was sent"""
+
+    def __init__(self, error=''):
+        self.error = error
+
+    def __bool__(self):
+        return not self.error
+
+
 def safe_send_mail(subject, message, from_email, recipient_list, **kwargs):
-    """Safely send email, handling configuration issues gracefully"""
+    """Send email within the delivery deadline, handling configuration issues gracefully"""
     try:
         # Check if email is configured
         if not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD:
             logger.warning("Email not configured - skipping email send")
-            return False
+            return SendResult('Email not configured')
             
-        send_mail(subject, message, from_email, recipient_list, **kwargs)
-        logger.info(f"Email sent successfully to {recipient_list}")
-        return True
+        delivery.send_mail(subject, message, from_email, recipient_list, **kwargs)
+        logger.info("Email sent successfully to %s", recipient_list)
+        return SendResult()
     except Exception as e:
-        logger.error(f"Email sending failed: {str(e)}")
-        return False
+        logger.error("Email sending failed: %s", e)
+        return SendResult(str(e) or type(e).__name__)
+
+def notify_admin(kind, subject, message, html_message=None, immediate=False):
+    """
+    Email the site admin, or in ADMIN_NOTIFY_MODE 'digest' queue the message
+    for the next summary (see content/digest.py) unless ``immediate``.
+    Returns a SendResult; a queued message counts as sent.
+    """
+    if immediate or settings.ADMIN_NOTIFY_MODE != 'digest':
+        return safe_send_mail(
+            subject,
+            message,
+            settings.DEFAULT_FROM_EMAIL,
+            [settings.DEFAULT_FROM_EMAIL],
+            fail_silently=False,
+            html_message=html_message,
+        )
+    AdminDigestItem.objects.create(kind=kind, subject=subject[:300], body=message)
+    return SendResult()
 
 class Service(models.Model):
     SERVICE_CATEGORIES = [
@@ -34,6 +67,7 @@ class Service(models.Model):
     icon_class = models.CharField(max_length=50, default='bi-heart-pulse')
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.name} ({self.get_category_display()})"
@@ -69,7 +103,7 @@ class ServiceBooking(models.Model):
     preferred_date = models.DateField()
     preferred_time = models.TimeField()
     description = models.TextField()
-    submitted_at = models.DateTimeField(auto_now_add=True)
+    submitted_at = models.DateTimeField(auto_now_add=True, db_index=True)
     status = models.CharField(max_length=20, default='pending', choices=[
         ('pending', 'Pending'),
         ('confirmed', 'Confirmed'),
@@ -77,113 +111,102 @@ class ServiceBooking(models.Model):
         ('cancelled', 'Cancelled'),
     ])
     email_sent = models.BooleanField(default=False)
+    # Each email separately, so a retry never resends the one that went out
+    admin_email_sent = models.BooleanField(default=False)
+    client_email_sent = models.BooleanField(default=False)
     email_error = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            # Range scans by the reminder scheduler (content/reminders.py)
+            models.Index(fields=['status', 'preferred_date', 'preferred_time'], name='booking_schedule_idx'),
+        ]
+
     def __str__(self):
         return f"{self.full_name} - {self.get_service_type_display()} ({self.get_session_mode_display()})"
 
     def save(self, *args, **kwargs):
         is_new = self.pk is None
-        super().save(*args, **kwargs)
+        # Dashboard counters are adjusted by post_save inside this transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
         if is_new and not self.email_sent:
             self.send_booking_email()
 
     def send_booking_email(self):
+        """Send whichever of the admin and client emails hasn't gone out yet"""
+        errors = []
         try:
-            # Admin notification email
-            admin_subject = f'New Booking Request - {self.full_name}'
-            admin_message = f"""
-NEW BOOKING RECEIVED!
-
-CLIENT DETAILS:
-• Name: {self.full_name}
-• Email: {self.email}
-• Phone: {self.phone}
-• Service: {self.get_service_type_display()}
-• Mode: {self.get_session_mode_display()}
-
-APPOINTMENT DETAILS:
-• Date: {self.preferred_date}
-• Time: {self.preferred_time.strftime('%I:%M %p')}
-
-CLIENT'S CONCERN:
-{self.description}
-
-Submitted: {self.submitted_at}
-            """
-
-            # Client confirmation email
-            client_subject = 'Booking Confirmation - Mwasamwanda Well-being Services'
-            client_message = f"""
-Dear {self.full_name},
-
-Thank you for choosing Mwasamwanda Well-being Services! Your appointment request has been received.
-
-BOOKING SUMMARY:
-• Service: {self.get_service_type_display()}
-• Mode: {self.get_session_mode_display()}
-• Date: {self.preferred_date}
-• Time: {self.preferred_time.strftime('%I:%M %p')}
-• Phone: {self.phone}
-• Email: {self.email}
-
-We will contact you within 24 hours to confirm your appointment and provide further details.
-
-If you have any questions, please don't hesitate to contact us.
-
-Warm regards,
-Mwasambo Mwandawiro
-Director
-📞 +254 758 283 613
-📧 mwasawellservices@gmail.com
-            """
-
-            # Send to admin
-            admin_sent = safe_send_mail(
-                admin_subject, 
-                admin_message.strip(),
-                settings.DEFAULT_FROM_EMAIL, 
-                [settings.DEFAULT_FROM_EMAIL],
-                fail_silently=False
-            )
-            
-            # Send to client
-            client_sent = safe_send_mail(
-                client_subject, 
-                client_message.strip(),
-                settings.DEFAULT_FROM_EMAIL, 
-                [self.email],
-                fail_silently=False
-            )
-            
-            # Mark email as sent if both were successful
-            if admin_sent and client_sent:
-                self.email_sent = True
-                self.save(update_fields=['email_sent'])
-                logger.info(f"Booking confirmation emails sent successfully for {self.full_name}")
-            else:
-                logger.warning(f"Some emails failed to send for booking {self.id}")
-            
+            if not self.admin_email_sent:
+                admin_subject = f'New Booking Request - {self.full_name}'
+                admin_text, admin_html = mail.render('admin_booking_notification', {
+                    'booking': self,
+                    **self.notification_stats(),
+                })
+                # Bookings can skip the digest
+                admin_sent = notify_admin(
+                    'booking',
+                    admin_subject,
+                    admin_text,
+                    html_message=admin_html,
+                    immediate=settings.ADMIN_DIGEST_BOOKINGS_IMMEDIATE,
+                )
+                self.admin_email_sent = bool(admin_sent)
+                errors.append(admin_sent.error)
+
+            if not self.client_email_sent:
+                client_subject = 'Booking Confirmation - Mwasamwanda Well-being Services'
+                client_text, client_html = mail.render('booking_confirmation', {'booking': self})
+                client_sent = safe_send_mail(
+                    client_subject,
+                    client_text,
+                    settings.DEFAULT_FROM_EMAIL,
+                    [self.email],
+                    fail_silently=False,
+                    html_message=client_html,
+                )
+                self.client_email_sent = bool(client_sent)
+                errors.append(client_sent.error)
         except Exception as e:
-            logger.error(f"Email error for booking {self.id}: {str(e)}")
-            self.email_error = str(e)
-            self.save(update_fields=['email_error'])
+            logger.error("Email error for booking %s: %s", self.id, e)
+            errors.append(str(e))
+
+        self.email_sent = self.admin_email_sent and self.client_email_sent
+        # Left unsent for retry_notifications, which sends only the missing one
+        self.email_error = '' if self.email_sent else next((error for error in errors if error), '')
+        self.save(update_fields=['admin_email_sent', 'client_email_sent', 'email_sent', 'email_error'])
+        if self.email_sent:
+            logger.info("Booking confirmation emails sent successfully for %s", self.full_name)
+        else:
+            logger.warning("Some emails failed to send for booking %s", self.id)
+
+    def notification_stats(self):
+        """Booking counts shown in the admin notification, from the submitted_at index"""
+        now = timezone.localtime()
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        bookings = ServiceBooking.objects.filter(submitted_at__gte=today.replace(day=1))
+        return {
+            'today_count': bookings.filter(submitted_at__gte=today).count(),
+            'service_month_count': bookings.filter(service_type=self.service_type).count(),
+        }
 
 class ContactSubmission(models.Model):
     name = models.CharField(max_length=200)
     email = models.EmailField()
     subject = models.CharField(max_length=300)
     message = models.TextField()
-    submitted_at = models.DateTimeField(auto_now_add=True)
+    submitted_at = models.DateTimeField(auto_now_add=True, db_index=True)
     is_read = models.BooleanField(default=False)
     email_sent = models.BooleanField(default=False)
+    email_error = models.TextField(blank=True)
 
     def __str__(self):
         return f"Contact from {self.name}"
 
     def save(self, *args, **kwargs):
         is_new = self.pk is None
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
         if is_new and not self.email_sent:
             self.send_contact_notification()
 
@@ -205,23 +228,22 @@ Submitted: {self.submitted_at}
 Please respond within 24 hours.
             """
 
-            sent = safe_send_mail(
-                subject,
-                message.strip(),
-                settings.DEFAULT_FROM_EMAIL,
-                [settings.DEFAULT_FROM_EMAIL],
-                fail_silently=False
-            )
+            sent = notify_admin('contact', subject, message.strip())
             
             if sent:
                 self.email_sent = True
-                self.save(update_fields=['email_sent'])
-                logger.info(f"Contact notification email sent for {self.name}")
+                self.email_error = ''
+                self.save(update_fields=['email_sent', 'email_error'])
+                logger.info("Contact notification email sent for %s", self.name)
             else:
-                logger.warning(f"Failed to send contact notification email for {self.name}")
+                self.email_error = sent.error
+                self.save(update_fields=['email_error'])
+                logger.warning("Failed to send contact notification email for %s", self.name)
             
         except Exception as e:
-            logger.error(f"Failed to send contact notification email: {str(e)}")
+            logger.error("Failed to send contact notification email: %s", e)
+            self.email_error = str(e)
+            self.save(update_fields=['email_error'])
 
 class NewsletterSubscriber(models.Model):
     email = models.EmailField(unique=True)
@@ -234,31 +256,24 @@ class NewsletterSubscriber(models.Model):
 
     def save(self, *args, **kwargs):
         is_new = self.pk is None
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
         if is_new and not self.welcome_email_sent:
             self.send_welcome_email()
 
     def send_welcome_email(self):
         try:
             subject = 'Welcome to Our Newsletter!'
-            message = f"""
-Thank you for subscribing to our newsletter!
-
-You'll now receive updates on our latest services, wellness tips, and special offers.
-
-If you ever wish to unsubscribe, simply reply to this email.
-
-Best regards,
-Mwasawell Services Team
-            """
+            text, html = mail.render('welcome_newsletter', {'subscriber': self})
 
             # Send welcome email to subscriber
             subscriber_sent = safe_send_mail(
                 subject,
-                message.strip(),
+                text,
                 settings.DEFAULT_FROM_EMAIL,
                 [self.email],
-                fail_silently=False
+                fail_silently=False,
+                html_message=html,
             )
 
             # Send notification to admin
@@ -270,26 +285,30 @@ Email: {self.email}
 Subscribed: {self.subscribed_at}
             """
 
-            admin_sent = safe_send_mail(
-                admin_subject,
-                admin_message.strip(),
-                settings.DEFAULT_FROM_EMAIL,
-                [settings.DEFAULT_FROM_EMAIL],
-                fail_silently=False
-            )
+            admin_sent = notify_admin('subscriber', admin_subject, admin_message.strip())
             
             if subscriber_sent and admin_sent:
                 self.welcome_email_sent = True
                 self.save(update_fields=['welcome_email_sent'])
-                logger.info(f"Welcome email sent to new subscriber: {self.email}")
+                logger.info("Welcome email sent to new subscriber: %s", self.email)
             else:
-                logger.warning(f"Some welcome emails failed for subscriber: {self.email}")
+                logger.warning("Some welcome emails failed for subscriber: %s", self.email)
             
         except Exception as e:
-            logger.error(f"Failed to send welcome email to {self.email}: {str(e)}")
+            logger.error("Failed to send welcome email to %s: %s", self.email, e)
+
+def unique_slug(model, title, exclude_pk=None):
+    """slugify(title), with -2, -3... appended until no other row has it"""
+    base = slugify(title)[:200] or 'post'
+    taken = set(model.objects.filter(slug__startswith=base).exclude(pk=exclude_pk).values_list('slug', flat=True))
+    slug, n = base, 2
+    while slug in taken:
+        slug, n = f'{base}-{n}', n + 1
+    return slug
 
 class Blog(models.Model):
     title = models.CharField(max_length=200)
+    slug = models.SlugField(max_length=220, unique=True, blank=True, help_text="URL of the post; filled from the title if left blank")
     excerpt = models.TextField(help_text="Short description shown on blog cards")
     content = models.TextField(help_text="Full blog content shown in modal")
     image = models.ImageField(upload_to='blogs/', blank=True, null=True, help_text="Blog featured image")
@@ -300,6 +319,14 @@ class Blog(models.Model):
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = unique_slug(Blog, self.title, exclude_pk=self.pk)
+        super().save(*args, **kwargs)
+
+    def get_absolute_url(self):
+        return reverse('blog_detail', args=[self.slug])
+
     def get_image_url(self):
         """Safe method to get image URL"""
         if self.image and hasattr(self.image, 'url'):
@@ -307,4 +334,241 @@ class Blog(models.Model):
         return '/static/images/default-blog.jpg'
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+
+class WebsiteContent(models.Model):
+    CONTENT_TYPES = [
+        ('hero', 'Hero Section'),
+        ('service', 'Services Section'),
+        ('contact', 'Contact Section'),
+    ]
+
+    key = models.CharField(max_length=100, unique=True)
+    value = models.TextField()
+    content_type = models.CharField(max_length=20, choices=CONTENT_TYPES)
+    description = models.CharField(max_length=255, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.key
+
+    class Meta:
+        ordering = ['content_type', 'key']
+        verbose_name_plural = 'Website content'
+
+    @classmethod
+    def bulk_upsert(cls, items, overwrite=True):
+        """
+        Insert (key, value, content_type, description) tuples in one statement.
+        Existing keys are updated when ``overwrite`` is set and left alone
+        otherwise. Returns (created, updated) counts.
+        """
+        # One row per key; PostgreSQL refuses to upsert the same row twice
+        items = list({item[0]: item for item in items}.values())
+        keys = [item[0] for item in items]
+        existing = set(cls.objects.filter(key__in=keys).values_list('key', flat=True))
+        objs = [
+            cls(key=key, value=value, content_type=content_type, description=description)
+            for key, value, content_type, description in items
+        ]
+
+        if overwrite:
+            options = {
+                'update_conflicts': True,
+                'update_fields': ['value', 'content_type', 'description', 'updated_at'],
+            }
+            # MySQL upserts on any unique key and rejects an explicit target
+            if connection.features.supports_update_conflicts_with_target:
+                options['unique_fields'] = ['key']
+        else:
+            options = {'ignore_conflicts': True}
+        cls.objects.bulk_create(objs, **options)
+
+        # bulk_create skips save signals, so do their work here
+        transaction.on_commit(invalidate_website_content)
+        transaction.on_commit(bump_content_version)
+        transaction.on_commit(prerender.schedule)
+
+        created = len(set(keys) - existing)
+        updated = len(existing) if overwrite else 0
+        return created, updated
+
+
+class DashboardCounter(models.Model):
+    """Running totals for the admin dashboard, kept in step by content/counters.py"""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class SubmissionRollup(models.Model):
+    """Daily submission counts per dimension, maintained by content/rollups.py"""
+    KIND_CHOICES = [
+        ('booking', 'Service booking'),
+        ('contact', 'Contact submission'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    day = models.DateField()
+    service_type = models.CharField(max_length=20, blank=True)
+    session_mode = models.CharField(max_length=20, blank=True)
+    status = models.CharField(max_length=20, blank=True)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'day', 'service_type', 'session_mode', 'status'],
+                name='unique_submission_rollup',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.day}: {self.count}"
+
+
+class RollupState(models.Model):
+    """High-water mark on submitted_at up to which rollups are complete"""
+    kind = models.CharField(max_length=10, unique=True)
+    high_water_mark = models.DateTimeField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.kind} up to {self.high_water_mark}"
+
+
+class ClientInteraction(models.Model):
+    """
+    One row per booking, contact message or subscription, keyed by the
+    client's normalized email and E.164 phone (see content/identity.py).
+    """
+    KIND_CHOICES = [
+        ('booking', 'Booking'),
+        ('contact', 'Contact message'),
+        ('subscription', 'Newsletter subscription'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    email = models.CharField(max_length=254, blank=True)
+    phone = models.CharField(max_length=20, blank=True)
+    name = models.CharField(max_length=200, blank=True)
+    summary = models.CharField(max_length=300, blank=True)
+    occurred_at = models.DateTimeField()
+    archived = models.BooleanField(default=False, help_text="Source row moved to the cold archive")
+
+    class Meta:
+        ordering = ['-occurred_at']
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_client_interaction'),
+        ]
+        indexes = [
+            models.Index(fields=['email', 'occurred_at'], name='client_email_idx'),
+            models.Index(fields=['phone', 'occurred_at'], name='client_phone_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.email or self.phone}"
+
+
+class OutboundEmail(models.Model):
+    """Queued notification, delivered in batches by content/outbox.py"""
+    to = models.EmailField()
+    subject = models.CharField(max_length=300)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Mail server outages postpone a message without using up its attempts
+    deferrals = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sent_at', 'attempts'], name='outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to}"
+
+
+class QuarantinedSubmission(models.Model):
+    """Submission held back by the spam prefilter (content/spam.py) before any write or email"""
+    STATUS_CHOICES = [
+        ('held', 'Held for review'),
+        ('spam', 'Confirmed spam'),
+        ('released', 'Released'),
+    ]
+
+    kind = models.CharField(max_length=30)
+    email = models.EmailField(blank=True)
+    payload = models.JSONField()
+    reason = models.CharField(max_length=30)
+    fingerprint = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='held')
+    received_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind} from {self.email or 'unknown'} ({self.reason})"
+
+
+class AdminDigestItem(models.Model):
+    """Admin notification waiting for the next digest email (content/digest.py)"""
+    kind = models.CharField(max_length=20)
+    subject = models.CharField(max_length=300)
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sent_at', 'created_at'], name='digest_pending_idx'),
+        ]
+
+    def __str__(self):
+        return self.subject
+
+
+class BookingReminder(models.Model):
+    """
+    One reminder (or a decision to skip it) per booking and offset. The
+    unique constraint is what stops concurrent schedulers sending twice.
+    """
+    booking = models.ForeignKey(ServiceBooking, related_name='reminders', on_delete=models.CASCADE)
+    offset_minutes = models.PositiveIntegerField()
+    claimed_by = models.CharField(max_length=32, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    skipped = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['booking', 'offset_minutes'], name='reminder_once'),
+        ]
+
+    def __str__(self):
+        return f"{self.booking_id} reminder {self.offset_minutes} min before"
+
+
+class JournalReplay(models.Model):
+    """
+    A journaled submission (see journal.py) that has been written to the
+    database. Recorded in the same transaction as the row itself, so a
+    replay interrupted part-way never inserts anything twice.
+    """
+    entry_id = models.CharField(max_length=32, unique=True)
+    kind = models.CharField(max_length=20)
+    journaled_at = models.DateTimeField()
+    replayed_at = models.DateTimeField(auto_now_add=True)
+    # Entries the database refused (not an outage) keep their data for staff
+    rejected = models.BooleanField(default=False)
+    error = models.TextField(blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.entry_id}"
@@ -0,0 +1,151 @@
+"""
+Outbound email queue.
+
+Bulk operations queue OutboundEmail rows instead of sending inline;
+``send_pending`` delivers them in batches over one SMTP connection per
+batch; the scheduler (content/scheduler.py) calls it every tick and
+``send_queued_emails`` does the same on demand. Rows aren't claimed, so a
+cache lock keeps to one sender at a time.
+
+A message the server refuses (a rejected recipient, a permanent 5xx) is
+retried up to OUTBOX_MAX_ATTEMPTS times. When the server can't be reached
+at all, nothing is wrong with the messages: the rest of the batch is
+deferred with a doubling delay and keeps its attempts, so an outage of any
+length loses no mail. Batches are skipped while the SMTP circuit breaker
+is open.
+"""
+
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .delivery import smtp_breaker
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+SEND_LOCK_KEY = 'outbox:send-lock'
+
+
+def queue(messages):
+    """Queue (to, subject, body) or (to, subject, body, html_body) tuples in one INSERT"""
+    rows = [
+        OutboundEmail(to=to, subject=subject[:300], body=body, html_body=html_body[0] if html_body else '')
+        for to, subject, body, *html_body in messages
+    ]
+    OutboundEmail.objects.bulk_create(rows)
+    return len(rows)
+
+
+def pending():
+    return OutboundEmail.objects.filter(sent_at__isnull=True, attempts__lt=settings.OUTBOX_MAX_ATTEMPTS)
+
+
+def due(now=None):
+    """Pending messages that aren't waiting out a deferral"""
+    now = now or timezone.now()
+    return pending().filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+
+
+def _message_refused(error):
+    """True if the server refused this message, False if sending failed for every message"""
+    # ValueError: Django couldn't build the message (e.g. BadHeaderError)
+    if isinstance(error, (smtplib.SMTPRecipientsRefused, ValueError)):
+        return True
+    # 4xx replies are temporary (server busy, greylisting) and not the message's fault
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+def _defer(pks, error, now):
+    rows = OutboundEmail.objects.filter(pk__in=pks)
+    # One UPDATE per deferral count, highest first so no row is bumped twice
+    for deferrals in sorted(set(rows.values_list('deferrals', flat=True)), reverse=True):
+        delay = min(settings.OUTBOX_RETRY_DELAY * 2 ** deferrals, settings.OUTBOX_RETRY_MAX_DELAY)
+        rows.filter(deferrals=deferrals).update(
+            deferrals=F('deferrals') + 1, next_attempt_at=now + timedelta(seconds=delay), last_error=error,
+        )
+
+
+def _message(row, connection):
+    message = EmailMultiAlternatives(
+        row.subject, row.body, settings.DEFAULT_FROM_EMAIL, [row.to], connection=connection,
+    )
+    if row.html_body:
+        message.attach_alternative(row.html_body, 'text/html')
+    return message
+
+
+def send_batch(batch_size=None):
+    """
+    Send up to ``batch_size`` due messages over one connection; returns
+    (sent, failed), failed counting deferred messages too.
+    """
+    now = timezone.now()
+    rows = list(due(now).order_by('pk')[:batch_size or settings.OUTBOX_BATCH_SIZE])
+    if not rows:
+        return 0, 0
+    if not smtp_breaker.allow():
+        logger.warning("Outbox batch skipped: mail circuit breaker is open")
+        return 0, 0
+
+    sent, refused, deferred = [], {}, []
+    outage = None
+    try:
+        with get_connection(fail_silently=False) as connection:
+            for row in rows:
+                try:
+                    connection.send_messages([_message(row, connection)])
+                    sent.append(row.pk)
+                except Exception as e:
+                    if not _message_refused(e):
+                        raise
+                    refused[row.pk] = str(e)
+    except Exception as e:
+        # Couldn't connect, or lost the connection: the unsent rest waits
+        outage = str(e) or type(e).__name__
+        logger.error("Outbox connection failed: %s", outage)
+        deferred = [row.pk for row in rows if row.pk not in sent and row.pk not in refused]
+
+    if sent:
+        smtp_breaker.record_success()
+    elif outage:
+        smtp_breaker.record_failure()
+    if sent:
+        OutboundEmail.objects.filter(pk__in=sent).update(
+            sent_at=timezone.now(), attempts=F('attempts') + 1, next_attempt_at=None,
+        )
+    for pk, error in refused.items():
+        OutboundEmail.objects.filter(pk=pk).update(attempts=F('attempts') + 1, last_error=error)
+    if deferred:
+        _defer(deferred, outage, now)
+    logger.info("Outbox batch: %s sent, %s refused, %s deferred", len(sent), len(refused), len(deferred))
+    return len(sent), len(refused) + len(deferred)
+
+
+def send_pending(batch_size=None, max_batches=None):
+    """
+    Send batches until the queue is empty, nothing is delivered, or
+    ``max_batches`` is reached. Returns (sent, failed), or None if another
+    process is already sending.
+    """
+    # Two senders would read the same unsent rows and deliver them twice
+    if not cache.add(SEND_LOCK_KEY, 1, 600):
+        return None
+    total_sent = total_failed = batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            sent, failed = send_batch(batch_size)
+            batches += 1
+            total_sent += sent
+            total_failed += failed
+            if not sent:
+                break
+    finally:
+        cache.delete(SEND_LOCK_KEY)
+    return total_sent, total_failed
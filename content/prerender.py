@@ -0,0 +1,237 @@
+"""
+Pre-rendered static copies of the public pages.
+
+``render_all`` runs each page from ``pages()`` (the home, services and blog
+pages plus one per published post) through the normal Django stack and
+writes the HTML with gzip (and, when the brotli package is installed,
+brotli) variants into PRERENDER_ROOT. Each file is written to a temporary
+name and renamed into place, and the stamp recording which pages were
+rendered from which content version is written last.
+
+PrerenderedPageMiddleware serves those files through WhiteNoise, which
+picks the compressed variant and answers conditional requests, but only
+while the stamp matches the current content version; otherwise the request
+falls through to the view and a re-render is scheduled. Content edits
+re-render the pages in the background a moment after they commit (see
+``schedule``).
+"""
+
+import gzip
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.db import close_old_connections
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from whitenoise.base import WhiteNoise
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .versioning import get_content_version
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# URL name -> file under PRERENDER_ROOT; blog posts are added by pages()
+PAGES = {
+    'index': 'index.html',
+    'services_list': 'services/index.html',
+    'blog_list': 'blog/index.html',
+}
+
+STAMP_FILE = 'stamp.json'
+# Requests carrying this header bypass the pre-rendered files (used when rendering them)
+BYPASS_HEADER = 'HTTP_X_PRERENDER'
+
+
+def _root():
+    return settings.PRERENDER_ROOT
+
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def read_stamp():
+    """The stamp of the current files, or None if nothing has been rendered"""
+    try:
+        return json.loads((_root() / STAMP_FILE).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def pages():
+    """URL -> file under PRERENDER_ROOT for every page to pre-render"""
+    from .models import Blog
+
+    urls = {reverse(name): filename for name, filename in PAGES.items()}
+    for slug in Blog.objects.filter(is_published=True).values_list('slug', flat=True):
+        urls[reverse('blog_detail', args=[slug])] = f'blog/{slug}/index.html'
+    return urls
+
+
+def internal_request(url):
+    """
+    A GET for ``url`` as a visitor would send it: to a real host, over HTTPS
+    (so SECURE_SSL_REDIRECT doesn't answer it) and past the pre-rendered copy
+    """
+    host = settings.PRERENDER_HOST or next((h for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+    return RequestFactory().get(url, secure=True, HTTP_HOST=host.lstrip('.'), **{BYPASS_HEADER: '1'})
+
+
+def render_page(handler, url):
+    response = handler.get_response(internal_request(url))
+    if response.status_code != 200 or response.cookies:
+        raise RuntimeError(f'{url} rendered {response.status_code} (cookies: {list(response.cookies)})')
+    return response.content
+
+
+def render_all():
+    """Render every page from pages() into PRERENDER_ROOT; returns the files written"""
+    version = get_content_version()
+    if version is None:
+        raise RuntimeError('content version unavailable')
+
+    root = _root()
+    root.mkdir(parents=True, exist_ok=True)
+    handler = BaseHandler()
+    handler.load_middleware()
+    previous = read_stamp() or {}
+    urls = pages()
+
+    written = []
+    for url, filename in urls.items():
+        body = render_page(handler, url)
+        path = str(root / filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Variants first, so the page never appears without them
+        _write_atomic(path + '.gz', gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write_atomic(path + '.br', brotli.compress(body, quality=11))
+        elif os.path.exists(path + '.br'):
+            os.unlink(path + '.br')
+        _write_atomic(path, body)
+        written.append(path)
+
+    stamp = {'etag': version['etag'], 'rendered_at': timezone.now().isoformat(), 'pages': urls}
+    _write_atomic(str(root / STAMP_FILE), json.dumps(stamp).encode())
+
+    # Unpublished or renamed posts: the new stamp no longer serves them
+    for url, filename in previous.get('pages', {}).items():
+        if url not in urls:
+            for suffix in ('', '.gz', '.br'):
+                if os.path.exists(str(root / filename) + suffix):
+                    os.unlink(str(root / filename) + suffix)
+    logger.info("Pre-rendered %s pages for content version %s", len(written), version['etag'])
+    return written
+
+
+# ---------------------- publish hook ----------------------
+
+_timer = None
+_timer_lock = threading.Lock()
+
+
+def _render_in_background():
+    global _timer
+    with _timer_lock:
+        _timer = None
+    try:
+        render_all()
+    except Exception:
+        logger.exception("Background pre-render failed")
+    finally:
+        close_old_connections()
+
+
+def schedule():
+    """Re-render shortly, collapsing the burst of signals one admin save produces"""
+    global _timer
+    if not settings.PRERENDER_ENABLED:
+        return
+    with _timer_lock:
+        if _timer is not None:
+            return
+        _timer = threading.Timer(settings.PRERENDER_DELAY, _render_in_background)
+        _timer.daemon = True
+        _timer.start()
+
+
+# ---------------------- serving ----------------------
+
+class PrerenderedPageMiddleware:
+    """
+    Serve the pages listed in the stamp from PRERENDER_ROOT via WhiteNoise
+    while they match the current content version. File metadata is reloaded whenever the stamp
+    file changes, so a request normally costs one stat and one cache read.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.whitenoise = WhiteNoise(None, max_age=None)
+        self._loaded_mtime = None
+        self._files = {}
+        self._etag = None
+        self._stale_for = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        stamp_path = _root() / STAMP_FILE
+        try:
+            mtime = stamp_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {}, None
+        if mtime != self._loaded_mtime:
+            with self._lock:
+                if mtime != self._loaded_mtime:
+                    stamp = json.loads(stamp_path.read_text())
+                    files = {}
+                    for url, filename in stamp.get('pages', {}).items():
+                        path = str(_root() / filename)
+                        if os.path.exists(path):
+                            files[url] = self.whitenoise.get_static_file(path, url)
+                    self._files, self._etag, self._loaded_mtime = files, stamp['etag'], mtime
+        return self._files, self._etag
+
+    def __call__(self, request):
+        if not settings.PRERENDER_ENABLED or request.method not in ('GET', 'HEAD') or BYPASS_HEADER in request.META:
+            return self.get_response(request)
+
+        files, etag = self._load()
+        static_file = files.get(request.path_info)
+        if static_file is None:
+            return self.get_response(request)
+        version = get_content_version()
+        if version is None or version['etag'] != etag:
+            # Stale: the view renders it until the background re-render lands.
+            # Also covers a version recomputed after a cache eviction, which no
+            # content edit would otherwise re-render for.
+            if version is not None and self._stale_for != version['etag']:
+                self._stale_for = version['etag']
+                schedule()
+            return self.get_response(request)
+
+        response = WhiteNoiseMiddleware.serve(static_file, request)
+        patch_cache_control(response, public=True, max_age=0, s_maxage=settings.PUBLIC_PAGE_S_MAXAGE)
+        return response
@@ -0,0 +1,108 @@
+"""
+Appointment reminders.
+
+The scheduler (content/scheduler.py) calls ``tick`` every
+SCHEDULER_TICK_SECONDS. A tick finds every booking in REMINDER_STATUSES
+whose appointment falls between now and now + the largest of
+REMINDER_OFFSETS with one range query on the (status, preferred_date,
+preferred_time) index, and works out which offsets have come due.
+
+Each due (booking, offset) is claimed by inserting a BookingReminder row;
+the unique constraint on that pair means a restarted or second scheduler
+can never claim it again. Claims and the queued outbox emails commit in
+the same transaction. When several offsets are due at once (a booking made
+at short notice) only the nearest is sent and the rest are recorded as
+skipped.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import mail, outbox
+from .models import BookingReminder, ServiceBooking
+
+logger = logging.getLogger(__name__)
+
+
+def appointment_at(booking):
+    return timezone.make_aware(datetime.combine(booking.preferred_date, booking.preferred_time))
+
+
+REMINDER_SUBJECT = 'Appointment Reminder - Mwasamwanda Well-being Services'
+
+
+def reminder_message(booking):
+    """(to, subject, text, html) for one reminder"""
+    text, html = mail.render('booking_reminder', {'booking': booking})
+    return booking.email, REMINDER_SUBJECT, text, html
+
+
+def upcoming(now, horizon):
+    """
+    Bookings in REMINDER_STATUSES with an appointment in (now, horizon], as
+    one range scan on booking_schedule_idx.
+    """
+    start, end = timezone.localtime(now), timezone.localtime(horizon)
+    if start.date() == end.date():
+        window = Q(preferred_date=start.date(), preferred_time__gt=start.time(), preferred_time__lte=end.time())
+    else:
+        window = (
+            Q(preferred_date=start.date(), preferred_time__gt=start.time())
+            | Q(preferred_date__gt=start.date(), preferred_date__lt=end.date())
+            | Q(preferred_date=end.date(), preferred_time__lte=end.time())
+        )
+    return ServiceBooking.objects.filter(
+        window,
+        status__in=settings.REMINDER_STATUSES,
+        preferred_date__range=(start.date(), end.date()),
+    )
+
+
+def tick(now=None):
+    """Queue every reminder that has come due; returns the number queued"""
+    offsets = sorted(settings.REMINDER_OFFSETS)
+    if not offsets:
+        return 0
+    now = now or timezone.now()
+    bookings = list(upcoming(now, now + timedelta(minutes=offsets[-1])))
+    if not bookings:
+        return 0
+
+    done = set(
+        BookingReminder.objects.filter(booking__in=bookings, offset_minutes__in=offsets)
+        .values_list('booking_id', 'offset_minutes')
+    )
+    claims = []
+    for booking in bookings:
+        until = appointment_at(booking) - now
+        due = [offset for offset in offsets if timedelta(minutes=offset) >= until]
+        due = [offset for offset in due if (booking.pk, offset) not in done]
+        # Nearest first: that's the one sent
+        claims.extend((booking, offset, i > 0) for i, offset in enumerate(due))
+    if not claims:
+        return 0
+
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        BookingReminder.objects.bulk_create(
+            [
+                BookingReminder(booking=booking, offset_minutes=offset, claimed_by=token, skipped=skipped)
+                for booking, offset, skipped in claims
+            ],
+            ignore_conflicts=True,
+        )
+        # Conflicting rows belong to another scheduler; only ours are sent
+        mine = BookingReminder.objects.filter(claimed_by=token, skipped=False)
+        reminders = list(mine.select_related('booking'))
+        if reminders:
+            outbox.queue([reminder_message(r.booking) for r in reminders])
+            mine.update(sent_at=timezone.now())
+
+    logger.info("Queued %s booking reminders (%s due)", len(reminders), len(claims))
+    return len(reminders)
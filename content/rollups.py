@@ -0,0 +1,179 @@
+"""
+Daily rollups of bookings and contact submissions for the analytics charts.
+
+Each refresh re-aggregates only rows from the day of the stored high-water
+mark (minus a short restatement window that picks up recent status
+changes) and replaces those days' rollup rows. Charts then read a few
+hundred rollup rows instead of grouping the raw tables.
+"""
+
+import logging
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, Min
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from . import archive
+from .models import ContactSubmission, RollupState, ServiceBooking, SubmissionRollup
+
+logger = logging.getLogger(__name__)
+
+# kind -> (source model, dimensions rolled up)
+SOURCES = {
+    'booking': (ServiceBooking, ['service_type', 'session_mode', 'status']),
+    'contact': (ContactSubmission, []),
+}
+
+REFRESH_LOCK_KEY = 'rollups:refresh-lock'
+ANALYTICS_CACHE_KEY = 'rollups:analytics:{days}'
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def rebuild(kind, start_day, end_day=None):
+    """
+    Replace rollups for ``kind`` on [start_day, end_day) with fresh aggregates.
+    Returns the max submitted_at seen, or None if the range was empty.
+    """
+    model, dims = SOURCES[kind]
+    rows = model.objects.filter(submitted_at__gte=_day_start(start_day))
+    existing = SubmissionRollup.objects.filter(kind=kind, day__gte=start_day)
+    if end_day is not None:
+        rows = rows.filter(submitted_at__lt=_day_start(end_day))
+        existing = existing.filter(day__lt=end_day)
+
+    aggregates = (
+        rows.annotate(day=TruncDate('submitted_at'))
+        .values('day', *dims)
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    rollups = [
+        SubmissionRollup(kind=kind, day=row['day'], count=row['n'], **{dim: row[dim] for dim in dims})
+        for row in aggregates
+    ]
+    with transaction.atomic():
+        existing.delete()
+        SubmissionRollup.objects.bulk_create(rollups)
+    return rows.aggregate(hwm=Max('submitted_at'))['hwm']
+
+
+def move_booking_status(groups, new_status):
+    """
+    Shift booking rollups for a set-based status change. ``groups`` maps
+    (day, service_type, session_mode, old_status) to the number of rows
+    moved. Days not rolled up yet are simply recounted by the next refresh.
+    """
+    with transaction.atomic():
+        for (day, service_type, session_mode, old_status), n in groups.items():
+            dims = {'kind': 'booking', 'day': day, 'service_type': service_type, 'session_mode': session_mode}
+            SubmissionRollup.objects.filter(status=old_status, **dims).update(count=Greatest(F('count') - n, 0))
+            rollup, created = SubmissionRollup.objects.get_or_create(status=new_status, **dims, defaults={'count': n})
+            if not created:
+                SubmissionRollup.objects.filter(pk=rollup.pk).update(count=F('count') + n)
+        SubmissionRollup.objects.filter(kind='booking', count=0).delete()
+
+
+def refresh(kind):
+    """Bring ``kind`` rollups up to date from its high-water mark"""
+    state, _ = RollupState.objects.get_or_create(kind=kind)
+    if state.high_water_mark is None:
+        return backfill(kind)
+
+    start_day = timezone.localdate(state.high_water_mark) - timedelta(days=settings.ROLLUP_RESTATE_DAYS)
+    hwm = rebuild(kind, start_day)
+    if hwm is not None and hwm > state.high_water_mark:
+        state.high_water_mark = hwm
+    state.save()
+    return state.high_water_mark
+
+
+def backfill(kind, since=None):
+    """
+    Rebuild ``kind`` rollups month by month, so each transaction stays small.
+    Without ``since`` it starts at the oldest submission still in the table,
+    or at the archive cutoff if rows have been archived.
+    """
+    model, _ = SOURCES[kind]
+    bounds = model.objects.aggregate(first=Min('submitted_at'), last=Max('submitted_at'))
+    if bounds['first'] is None:
+        return None
+
+    day = since or timezone.localdate(bounds['first'])
+    # Days before the archive cutoff are partly archived; keep their rollups
+    archived_before = archive.archived_before(kind)
+    if since is None and archived_before and day < archived_before:
+        day = archived_before
+    last_day = timezone.localdate(bounds['last'])
+    while day <= last_day:
+        next_month = (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+        rebuild(kind, day, next_month)
+        day = next_month
+
+    RollupState.objects.update_or_create(kind=kind, defaults={'high_water_mark': bounds['last']})
+    return bounds['last']
+
+
+def refresh_all():
+    """Refresh every kind unless another worker is already doing it"""
+    if not cache.add(REFRESH_LOCK_KEY, 1, 300):
+        return False
+    try:
+        for kind in SOURCES:
+            refresh(kind)
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+    return True
+
+
+def analytics(days):
+    """Per-day series for the charts, cached for ROLLUP_CACHE_SECONDS"""
+    key = ANALYTICS_CACHE_KEY.format(days=days)
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    try:
+        refresh_all()
+    except Exception as e:
+        # Serve the last complete rollups rather than failing the chart
+        logger.error("Rollup refresh failed: %s", e)
+
+    today = timezone.localdate()
+    day_list = [today - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+    index = {day: i for i, day in enumerate(day_list)}
+
+    def series():
+        return [0] * len(day_list)
+
+    bookings = {dim: {} for dim in SOURCES['booking'][1]}
+    bookings['total'] = series()
+    contacts = series()
+
+    for rollup in SubmissionRollup.objects.filter(day__gte=day_list[0], day__lte=today):
+        i = index[rollup.day]
+        if rollup.kind == 'contact':
+            contacts[i] += rollup.count
+            continue
+        bookings['total'][i] += rollup.count
+        for dim in SOURCES['booking'][1]:
+            bookings[dim].setdefault(getattr(rollup, dim), series())[i] += rollup.count
+
+    data = {
+        'days': [day.isoformat() for day in day_list],
+        'bookings': {
+            'total': bookings['total'],
+            'by_service_type': bookings['service_type'],
+            'by_session_mode': bookings['session_mode'],
+            'by_status': bookings['status'],
+        },
+        'contacts': contacts,
+    }
+    cache.set(key, data, settings.ROLLUP_CACHE_SECONDS)
+    return data
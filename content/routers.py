@@ -0,0 +1,97 @@
+"""
+Primary/replica database routing.
+
+When REPLICA_DATABASE_URL configures a 'replica' alias, views marked with
+@replica_reads run their queries against it; everything else, and every
+write, uses 'default'. Reads fall back to the primary for the rest of a
+request once it has written anything, and for REPLICA_PIN_SECONDS after a
+client's last unsafe request (tracked by ReplicaRoutingMiddleware with a
+cookie), so people always see their own submissions and edits.
+
+Sessions and users are always read from the primary, so a lagging replica
+can never undo a login in a staff view marked @replica_reads.
+"""
+
+import contextlib
+import contextvars
+
+from django.conf import settings
+
+REPLICA = 'replica'
+PRIMARY = 'default'
+
+# Apps whose reads never go to the replica
+PRIMARY_ONLY_APPS = {'auth', 'sessions'}
+
+
+class RoutingState:
+    """Per-request routing decision, kept in a context variable"""
+
+    def __init__(self, use_replica=False):
+        self.use_replica = use_replica
+        self.pinned = False
+
+
+_state = contextvars.ContextVar('db_routing', default=None)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+def begin_request():
+    """Start a fresh routing state; returns the token for end_request()"""
+    return _state.set(RoutingState())
+
+
+def end_request(token):
+    _state.reset(token)
+
+
+def current_state():
+    return _state.get()
+
+
+@contextlib.contextmanager
+def replica_reads_enabled():
+    """Route reads in this block to the replica (used outside requests, e.g. reports)"""
+    token = _state.set(RoutingState(use_replica=True))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+@contextlib.contextmanager
+def primary_reads():
+    """Force reads in this block onto the primary, e.g. for cache fills that must be fresh"""
+    token = _state.set(RoutingState())
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return PRIMARY
+        state = _state.get()
+        if state is not None and state.use_replica and not state.pinned and replica_configured():
+            return REPLICA
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            # Read-your-writes for the rest of this request
+            state.pinned = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary
+        return db == PRIMARY
@@ -0,0 +1,99 @@
+"""
+Periodic background work: appointment reminders, outbox delivery, the
+admin digest and dashboard counter reconciliation.
+
+``tick`` does one pass of each; ``manage.py run_scheduler`` calls it every
+SCHEDULER_TICK_SECONDS. Every job is safe to run from more than one
+process (reminder claims are unique rows, the outbox and digest senders
+take a cache lock), so a stray second scheduler costs only a few queries.
+The counter recount runs at most once per COUNTERS_RECONCILE_SECONDS across
+all of them.
+
+With SCHEDULER_IN_WEB on, gunicorn's master starts the scheduler through
+``Supervisor`` (see gunicorn.conf.py) and restarts it if it exits, so a
+plain web deploy delivers mail without a separate process or cron entry.
+Deploys that run ``run_scheduler`` as its own service turn it off.
+"""
+
+import logging
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import counters, digest, outbox, reminders
+
+logger = logging.getLogger(__name__)
+
+MANAGE_PY = Path(settings.BASE_DIR) / 'manage.py'
+RECONCILE_KEY = 'scheduler:counters-reconciled'
+
+
+def tick(deliver=True):
+    """One pass of every job; returns {'reminders', 'sent', 'failed', 'digested', 'repaired'}"""
+    result = {'reminders': reminders.tick(), 'sent': 0, 'failed': 0, 'digested': 0, 'repaired': 0}
+    if deliver:
+        # None: another process is sending right now
+        sent = outbox.send_pending()
+        if sent is not None:
+            result['sent'], result['failed'] = sent
+    if settings.ADMIN_NOTIFY_MODE == 'digest':
+        result['digested'] = digest.send_digest()
+    # Held until the interval ends, so only one scheduler recounts per interval
+    if cache.add(RECONCILE_KEY, 1, settings.COUNTERS_RECONCILE_SECONDS):
+        drift = counters.reconcile()
+        if drift:
+            logger.warning("Repaired drifted dashboard counters: %s", drift)
+        result['repaired'] = len(drift)
+    return result
+
+
+class Supervisor:
+    """Keeps one ``manage.py run_scheduler`` child running, restarting it with backoff"""
+
+    MAX_BACKOFF = 300
+
+    def __init__(self, log=logger):
+        self.log = log
+        self._process = None
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name='scheduler-supervisor', daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        backoff = 1
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            try:
+                self._process = subprocess.Popen([sys.executable, str(MANAGE_PY), 'run_scheduler'])
+                code = self._process.wait()
+            except OSError as e:
+                code = e
+            if self._stopping.is_set():
+                return
+            # A scheduler that ran a while gets a fresh backoff
+            if time.monotonic() - started > self.MAX_BACKOFF:
+                backoff = 1
+            self.log.error("Scheduler exited (%s); restarting in %ss", code, backoff)
+            self._stopping.wait(backoff)
+            backoff = min(backoff * 2, self.MAX_BACKOFF)
+
+    def stop(self, timeout=10):
+        self._stopping.set()
+        process = self._process
+        if process is None or process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
@@ -0,0 +1,335 @@
+"""
+Declarative schemas for the JSON submission APIs.
+
+Each endpoint declares its fields once, keyed by the model attribute they
+fill. When a Schema is created, every field compiles to a single converter
+function (regexes and choice sets are built then, not per request), so
+validating a request is one pass over a tuple of converters.
+
+``Schema.parse`` refuses bodies over the size limit before reading them,
+decodes with orjson when it is installed, and reports every invalid field
+at once rather than stopping at the first.
+"""
+
+import functools
+import json
+import re
+from abc import ABC, abstractmethod
+from datetime import date, time
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from .models import ServiceBooking
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+loads = orjson.loads if orjson is not None else json.loads
+
+REQUIRED = 'This field is required.'
+
+
+class FieldError(ValueError):
+    pass
+
+
+class ValidationError(Exception):
+    """A request that failed validation; ``errors`` maps JSON keys to messages"""
+
+    def __init__(self, message, errors=None, status=400):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors or {}
+        self.status = status
+
+    def response(self):
+        payload = {'success': False, 'message': self.message}
+        if self.errors:
+            payload['errors'] = self.errors
+        return JsonResponse(payload, status=self.status)
+
+
+# ---------------------- fields ----------------------
+
+class Field(ABC):
+    """
+    A JSON key and how to clean it. ``compile`` returns a function taking
+    the raw value and returning the cleaned one or raising FieldError.
+    """
+
+    def __init__(self, key, required=True, default='', message=None):
+        self.key = key
+        self.required = required
+        self.default = default
+        self.message = message
+
+    @abstractmethod
+    def compile(self):
+        pass
+
+
+class String(Field):
+    def __init__(self, key, max_length=None, lower=False, **kwargs):
+        super().__init__(key, **kwargs)
+        self.max_length = max_length
+        self.lower = lower
+
+    def compile(self):
+        max_length, lower, key = self.max_length, self.lower, self.key
+        message = self.message or f'{key} must be text.'
+
+        def convert(value):
+            if isinstance(value, str):
+                value = value.strip()
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                value = str(value)
+            else:
+                raise FieldError(message)
+            if lower:
+                value = value.lower()
+            if max_length is not None and len(value) > max_length:
+                raise FieldError(f'{key} must be at most {max_length} characters.')
+            return value
+        return convert
+
+
+class Email(String):
+    pattern = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s.]+$')
+
+    def __init__(self, key, max_length=254, **kwargs):
+        kwargs.setdefault('message', 'Please enter a valid email address.')
+        super().__init__(key, max_length=max_length, lower=True, **kwargs)
+
+    def compile(self):
+        clean, match, message = super().compile(), self.pattern.match, self.message
+
+        def convert(value):
+            value = clean(value)
+            if value and not match(value):
+                raise FieldError(message)
+            return value
+        return convert
+
+
+class Choice(String):
+    def __init__(self, key, choices, **kwargs):
+        super().__init__(key, **kwargs)
+        self.choices = [choice[0] if isinstance(choice, (tuple, list)) else choice for choice in choices]
+
+    def compile(self):
+        clean, allowed = super().compile(), frozenset(self.choices)
+        message = self.message or f'{self.key} must be one of: {", ".join(self.choices)}.'
+
+        def convert(value):
+            value = clean(value)
+            if value and value not in allowed:
+                raise FieldError(message)
+            return value
+        return convert
+
+
+class Date(Field):
+    """YYYY-MM-DD"""
+    pattern = re.compile(r'^(\d{4})-(\d{2})-(\d{2})$')
+
+    def compile(self):
+        match = self.pattern.match
+        message = self.message or 'Invalid date format. Please use YYYY-MM-DD.'
+
+        def convert(value):
+            m = match(value.strip()) if isinstance(value, str) else None
+            if m is None:
+                raise FieldError(message)
+            try:
+                return date(int(m[1]), int(m[2]), int(m[3]))
+            except ValueError:
+                raise FieldError(message)
+        return convert
+
+
+class Time(Field):
+    """HH:MM (optionally :SS) in 24-hour time, or HH:MM AM/PM"""
+    pattern = re.compile(r'^(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([AaPp][Mm])?$')
+
+    def compile(self):
+        match = self.pattern.match
+        message = self.message or 'Invalid time format. Please use HH:MM or HH:MM AM/PM.'
+
+        def convert(value):
+            m = match(value.strip()) if isinstance(value, str) else None
+            if m is None:
+                raise FieldError(message)
+            hour, minute, second = int(m[1]), int(m[2]), int(m[3] or 0)
+            if m[4]:
+                if not 1 <= hour <= 12:
+                    raise FieldError(message)
+                hour = hour % 12 + (12 if m[4].lower() == 'pm' else 0)
+            try:
+                return time(hour, minute, second)
+            except ValueError:
+                raise FieldError(message)
+        return convert
+
+
+class List(Field):
+    """
+    A JSON array of objects, checked for type and length only; the caller
+    validates each item (e.g. with another Schema) to report per-row results.
+    """
+
+    def __init__(self, key, max_items, **kwargs):
+        super().__init__(key, **kwargs)
+        self.max_items = max_items
+
+    def compile(self):
+        key, max_items = self.key, self.max_items
+
+        def convert(value):
+            if not isinstance(value, list) or not all(isinstance(item, dict) for item in value):
+                raise FieldError(f'{key} must be a list of objects.')
+            if not value:
+                raise FieldError(f'{key} must not be empty.')
+            if len(value) > max_items:
+                raise FieldError(f'{key} may list at most {max_items} entries.')
+            return value
+        return convert
+
+
+# ---------------------- schemas ----------------------
+
+class Schema:
+    """
+    ``fields`` maps model attribute names to Fields. ``missing_message`` is
+    a format string given the comma-separated missing keys.
+    """
+
+    def __init__(self, name, fields, missing_message='Missing required fields: {}', max_body=None):
+        self.name = name
+        self.fields = fields
+        self.missing_message = missing_message
+        self.max_body = max_body
+        self._plan = tuple(
+            (attr, field.key, field.required, field.default, field.compile())
+            for attr, field in fields.items()
+        )
+
+    def validate(self, data):
+        """Cleaned {attr: value} for a decoded body; raises ValidationError listing every problem"""
+        if not isinstance(data, dict):
+            raise ValidationError('Invalid form data. Please try again.')
+        cleaned, errors = {}, {}
+        for attr, key, required, default, convert in self._plan:
+            value = data.get(key)
+            if value is not None and value != '':
+                try:
+                    value = convert(value)
+                except FieldError as e:
+                    errors[key] = str(e)
+                    continue
+            if value is None or value == '':
+                if required:
+                    errors[key] = REQUIRED
+                    continue
+                value = default
+            cleaned[attr] = value
+        if errors:
+            raise ValidationError(self.error_message(errors), errors)
+        return cleaned
+
+    def error_message(self, errors):
+        missing = [key for key, error in errors.items() if error == REQUIRED]
+        parts = [self.missing_message.format(', '.join(missing)).rstrip('.') + '.'] if missing else []
+        parts.extend(error for error in errors.values() if error != REQUIRED)
+        return ' '.join(parts)
+
+    def parse(self, request):
+        """Size-check, decode and validate a request body"""
+        limit = self.max_body or settings.SUBMISSION_MAX_BODY_BYTES
+        try:
+            declared = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            declared = 0
+        # Refuse before Django reads the body into memory
+        if declared > limit:
+            raise ValidationError('Submission is too large.', status=413)
+        body = request.body
+        if len(body) > limit:
+            raise ValidationError('Submission is too large.', status=413)
+        try:
+            data = loads(body)
+        except ValueError:
+            raise ValidationError('Invalid form data. Please try again.')
+        return self.validate(data)
+
+
+def validate_json(schema):
+    """
+    View decorator: parse the request body with ``schema`` and call the view
+    as ``view(request, data)``; invalid requests get the error response.
+    """
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            try:
+                data = schema.parse(request)
+            except ValidationError as e:
+                return e.response()
+            return view_func(request, data, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+BOOKING = Schema('booking', {
+    'full_name': String('fullName', max_length=200),
+    'email': Email('email'),
+    'phone': String('phone', max_length=20),
+    'service_type': Choice('serviceType', ServiceBooking.SERVICE_CHOICES),
+    'session_mode': Choice('sessionMode', ServiceBooking.SESSION_MODE_CHOICES),
+    'preferred_date': Date('preferredDate'),
+    'preferred_time': Time('preferredTime'),
+    'description': String('description', required=False),
+})
+
+CONTACT = Schema('contact', {
+    'name': String('name', max_length=200),
+    'email': Email('email'),
+    'subject': String('subject', max_length=300),
+    'message': String('message'),
+    # Spam prefilter signals, removed again by spam.spam_prefilter
+    'honeypot': String(settings.SPAM_HONEYPOT_FIELD, required=False),
+    'form_token': String('formToken', required=False, max_length=200),
+}, missing_message='Please fill in all required fields: {}')
+
+FOOTER_CONTACT = Schema('footer contact', {
+    'name': String('name', max_length=200),
+    'email': Email('email'),
+    'message': String('message'),
+    'honeypot': String(settings.SPAM_HONEYPOT_FIELD, required=False),
+    'form_token': String('formToken', required=False, max_length=200),
+}, missing_message='Please fill in all required fields: {}')
+
+NEWSLETTER = Schema('newsletter', {
+    'email': Email('email'),
+}, missing_message='Please enter your email address.')
+
+# Training booked for a whole roster; each attendee row is checked with ATTENDEE
+GROUP_REGISTRATION = Schema('group registration', {
+    'organization': String('organization', max_length=200),
+    'organizer_name': String('organizerName', max_length=200),
+    'organizer_email': Email('organizerEmail'),
+    'organizer_phone': String('organizerPhone', max_length=20),
+    'session_mode': Choice('sessionMode', ServiceBooking.SESSION_MODE_CHOICES),
+    'preferred_date': Date('preferredDate'),
+    'preferred_time': Time('preferredTime'),
+    'notes': String('notes', required=False),
+    'attendees': List('attendees', max_items=settings.GROUP_REGISTRATION_MAX_ATTENDEES),
+}, max_body=settings.GROUP_REGISTRATION_MAX_BODY_BYTES)
+
+ATTENDEE = Schema('attendee', {
+    'full_name': String('fullName', max_length=200),
+    'email': Email('email'),
+    'phone': String('phone', max_length=20),
+})
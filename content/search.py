@@ -0,0 +1,181 @@
+"""
+Full-text search over blog posts.
+
+SQLite uses an FTS5 table (content_blog_fts) keyed by blog id; PostgreSQL
+uses a weighted tsvector column on content_blog with a GIN index. Both are
+created by migration 0011 and kept in sync from Blog's save/delete signals.
+Other databases fall back to icontains. Searches run on the database the
+router picks for Blog reads, so @replica_reads views search the replica.
+"""
+
+import hashlib
+import logging
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+from django.db.models import Q
+
+from .models import Blog
+from .versioning import get_content_version
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'content_blog_fts'
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+PG_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(excerpt, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'C')"
+)
+
+# Database alias -> whether it has the FTS5 table
+_fts_ready = {}
+
+
+def backend(using=None):
+    """'fts5', 'postgres' or 'basic' for ``using`` (default: where Blog reads go)"""
+    using = using or router.db_for_read(Blog)
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        return 'postgres'
+    if connection.vendor == 'sqlite':
+        if using not in _fts_ready:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+                _fts_ready[using] = cursor.fetchone() is not None
+        return 'fts5' if _fts_ready[using] else 'basic'
+    return 'basic'
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query.lower())[:10]
+
+
+def _fts5_match(tokens):
+    # Quote every token so user input can't use FTS5 syntax; the last one
+    # is a prefix match for search-as-you-type
+    quoted = ['"%s"' % token.replace('"', '""') for token in tokens]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+# ---------------------- index maintenance ----------------------
+
+def index_blog(blog):
+    using = router.db_for_write(Blog)
+    kind = backend(using)
+    with connections[using].cursor() as cursor:
+        if kind == 'fts5':
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [blog.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, excerpt, content) VALUES (%s, %s, %s, %s)",
+                [blog.pk, blog.title, blog.excerpt, blog.content],
+            )
+        elif kind == 'postgres':
+            cursor.execute(f"UPDATE content_blog SET search_vector = {PG_VECTOR_SQL} WHERE id = %s", [blog.pk])
+
+
+def remove_blog(blog_id):
+    using = router.db_for_write(Blog)
+    if backend(using) == 'fts5':
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [blog_id])
+
+
+# ---------------------- queries ----------------------
+
+def search_ids(query, published_only=True, limit=None, offset=0):
+    """Return (ranked blog ids, total matches) for ``query``"""
+    tokens = tokenize(query)
+    if not tokens:
+        return [], 0
+
+    using = router.db_for_read(Blog)
+    connection = connections[using]
+    kind = backend(using)
+    published = 'AND b.is_published' if published_only else ''
+    page = 'LIMIT %s OFFSET %s' if limit is not None else ''
+    page_params = [limit, offset] if limit is not None else []
+
+    if kind == 'fts5':
+        match = _fts5_match(tokens)
+        base = f"FROM {FTS_TABLE} f JOIN content_blog b ON b.id = f.rowid WHERE {FTS_TABLE} MATCH %s {published}"
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) {base}", [match])
+            total = cursor.fetchone()[0]
+            # Column weights: title, excerpt, content
+            cursor.execute(
+                f"SELECT b.id {base} ORDER BY bm25({FTS_TABLE}, 10.0, 5.0, 1.0), b.created_at DESC {page}",
+                [match] + page_params,
+            )
+            return [row[0] for row in cursor.fetchall()], total
+
+    if kind == 'postgres':
+        base = f"FROM content_blog b WHERE b.search_vector @@ websearch_to_tsquery('english', %s) {published}"
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) {base}", [query])
+            total = cursor.fetchone()[0]
+            cursor.execute(
+                f"SELECT b.id {base} ORDER BY ts_rank(b.search_vector, websearch_to_tsquery('english', %s)) DESC, "
+                f"b.created_at DESC {page}",
+                [query, query] + page_params,
+            )
+            return [row[0] for row in cursor.fetchall()], total
+
+    blogs = Blog.objects.using(using)
+    blogs = blogs.filter(is_published=True) if published_only else blogs.all()
+    for token in tokens:
+        blogs = blogs.filter(Q(title__icontains=token) | Q(excerpt__icontains=token) | Q(content__icontains=token))
+    ids = list(blogs.values_list('id', flat=True))
+    end = offset + limit if limit is not None else None
+    return ids[offset:end], len(ids)
+
+
+def search_page(query, page=1):
+    """
+    One page of published results as plain dicts. Queries seen at least
+    BLOG_SEARCH_CACHE_MIN_HITS times are cached until content changes.
+    """
+    page_size = settings.BLOG_SEARCH_PAGE_SIZE
+    normalized = ' '.join(query.lower().split())
+    version = get_content_version()
+    digest = hashlib.md5(normalized.encode()).hexdigest()
+    key = f"blogsearch:{version['etag'] if version else ''}:{digest}:{page}"
+
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    ids, total = search_ids(query, limit=page_size, offset=(page - 1) * page_size)
+    blogs = Blog.objects.in_bulk(ids)
+    result = {
+        'query': query,
+        'page': page,
+        'num_pages': max((total + page_size - 1) // page_size, 1),
+        'total': total,
+        'results': [
+            {
+                'id': blog.id,
+                'slug': blog.slug,
+                'url': blog.get_absolute_url(),
+                'title': blog.title,
+                'excerpt': blog.excerpt,
+                'image': blog.get_image_url(),
+                'created_at': blog.created_at.isoformat(),
+            }
+            for blog in (blogs[i] for i in ids if i in blogs)
+        ],
+    }
+
+    hits_key = f'blogsearch:hits:{digest}'
+    cache.add(hits_key, 0, 3600)
+    try:
+        hits = cache.incr(hits_key)
+    except ValueError:
+        hits = 1
+    if hits >= settings.BLOG_SEARCH_CACHE_MIN_HITS:
+        cache.set(key, result, settings.BLOG_SEARCH_CACHE_SECONDS)
+    return result
@@ -0,0 +1,93 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import archive, counters, identity, prerender, search
+from .content_store import invalidate_website_content
+from .models import Blog, Feature, Service, WebsiteContent
+from .versioning import bump_content_version
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_delete, sender=Blog)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=Feature)
+@receiver(post_delete, sender=Feature)
+def public_content_changed(sender, **kwargs):
+    """Bump the content version once the change is committed, then re-render"""
+    transaction.on_commit(bump_content_version)
+    transaction.on_commit(prerender.schedule)
+
+
+@receiver(post_save, sender=WebsiteContent)
+@receiver(post_delete, sender=WebsiteContent)
+def website_content_changed(sender, **kwargs):
+    """Drop the cached content snapshot and bump the content version"""
+    transaction.on_commit(invalidate_website_content)
+    transaction.on_commit(bump_content_version)
+    transaction.on_commit(prerender.schedule)
+
+
+# ---------------------- dashboard counters ----------------------
+
+def remember_counted_state(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields don't trigger a query
+    instance._counted_state = instance.__dict__.get(counters.TRACKED_FIELDS[sender])
+
+
+def update_counters_on_save(sender, instance, created, **kwargs):
+    field = counters.TRACKED_FIELDS[sender]
+    new_state = instance.__dict__.get(field)
+    if created:
+        counters.adjust(Counter(counters.counter_names(sender, new_state)))
+    elif instance._counted_state is not None and instance._counted_state != new_state:
+        counters.adjust(counters.transition_deltas(sender, instance._counted_state, new_state))
+    instance._counted_state = new_state
+
+
+def update_counters_on_delete(sender, instance, **kwargs):
+    state = instance._counted_state
+    if state is None:
+        state = getattr(instance, counters.TRACKED_FIELDS[sender])
+    counters.adjust({name: -1 for name in counters.counter_names(sender, state)})
+
+
+for model in counters.TRACKED_FIELDS:
+    post_init.connect(remember_counted_state, sender=model)
+    post_save.connect(update_counters_on_save, sender=model)
+    post_delete.connect(update_counters_on_delete, sender=model)
+
+
+# ---------------------- blog search index ----------------------
+
+@receiver(post_save, sender=Blog)
+def index_blog(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {'title', 'excerpt', 'content'} & set(update_fields):
+        return
+    search.index_blog(instance)
+
+
+@receiver(post_delete, sender=Blog)
+def unindex_blog(sender, instance, **kwargs):
+    search.remove_blog(instance.pk)
+
+
+# ---------------------- client identity index ----------------------
+
+def index_client_interaction(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= identity.NOTIFICATION_FIELDS:
+        return
+    identity.index_many([instance])
+
+
+def unindex_client_interaction(sender, instance, **kwargs):
+    # Archived rows stay on the client's timeline
+    identity.remove(instance, keep_history=archive.ARCHIVING.get())
+
+
+for model in identity.KINDS:
+    post_save.connect(index_client_interaction, sender=model)
+    post_delete.connect(unindex_client_interaction, sender=model)
@@ -0,0 +1,257 @@
+"""
+Spam prefilter for the contact endpoints.
+
+Runs after schema validation and before any database write or email, with
+the cheapest checks first:
+
+1. honeypot: a field real visitors never see (SPAM_HONEYPOT_FIELD) is filled
+2. timing: the signed form token from /api/csrf/ is forged, or the form
+   was sent less than SPAM_MIN_FILL_SECONDS after it was issued. Forms
+   that don't send a token (the site's pages don't yet) skip this check.
+3. known spam: the normalized message's fingerprint is in a per-process
+   Bloom filter of confirmed spam, rebuilt when the spam list changes
+4. burst: one sender address submitting more than SPAM_BURST_LIMIT times in
+   SPAM_BURST_WINDOW seconds, counted in the shared cache
+
+The burst and stats counters are only as atomic as the cache backend's
+add/incr. The default FileBasedCache increments by read-modify-write, so
+concurrent workers can lose updates and the burst limit is approximate.
+With Redis or Memcached as the cache the counts are exact.
+
+Anything caught is stored as a QuarantinedSubmission (one INSERT, no
+counters, index rows or emails) and the client gets the normal success
+reply. Staff can release it from the admin. Honeypot and forged-token hits
+are confident enough to mark their fingerprint as spam straight away.
+"""
+
+import functools
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.http import JsonResponse
+
+from .journal import DB_UNAVAILABLE
+from .models import ContactSubmission, QuarantinedSubmission
+
+logger = logging.getLogger(__name__)
+
+# Schema attributes carrying prefilter signals rather than submission data
+SIGNAL_FIELDS = ('honeypot', 'form_token')
+
+TOKEN_SALT = 'content.spam.form-token'
+BLOOM_VERSION_KEY = 'spam:bloom-version'
+BURST_KEY = 'spam:burst:{}:{}'
+STATS_PREFIX = 'spam:stats:'
+STATS = ('checked', 'quarantined', 'writes_avoided', 'emails_avoided')
+
+# Per contact submission let through: the row, its dashboard counters, its
+# identity index row and the email_sent update; plus the admin email
+WRITES_PER_SUBMISSION = 4
+EMAILS_PER_SUBMISSION = 1
+
+# Quarantine kind -> (model it becomes when released, fields the view adds)
+RELEASE_TO = {
+    'contact': (ContactSubmission, {}),
+    'footer_contact': (ContactSubmission, {'subject': 'Footer Quick Inquiry'}),
+}
+
+# Reasons certain enough to add the body to the known-spam filter at once
+CONFIDENT_REASONS = {'honeypot', 'bad_token'}
+
+NORMALIZE_RE = re.compile(r'[\W_]+')
+
+
+def form_token():
+    """Signed issue time, handed out with the CSRF token and sent back with forms"""
+    return signing.dumps(int(time.time()), salt=TOKEN_SALT)
+
+
+def fingerprint(text):
+    """Hex digest of ``text`` ignoring case, punctuation and spacing"""
+    normalized = NORMALIZE_RE.sub(' ', text.lower()).strip()
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+# ---------------------- Bloom filter ----------------------
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class KnownSpam:
+    """Process-local Bloom filter of confirmed spam fingerprints"""
+
+    def __init__(self):
+        self._filter = None
+        self._version = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _current(self):
+        now = time.monotonic()
+        if self._filter is not None and now - self._checked < settings.SPAM_BLOOM_REFRESH:
+            return self._filter
+        with self._lock:
+            version = cache.get(BLOOM_VERSION_KEY, 0)
+            if self._filter is None or version != self._version:
+                bloom = BloomFilter(settings.SPAM_BLOOM_CAPACITY)
+                fingerprints = (
+                    QuarantinedSubmission.objects.filter(status='spam')
+                    .values_list('fingerprint', flat=True).distinct().iterator()
+                )
+                for value in fingerprints:
+                    bloom.add(bytes.fromhex(value))
+                self._filter, self._version = bloom, version
+            self._checked = now
+        return self._filter
+
+    def __contains__(self, fingerprint):
+        return bytes.fromhex(fingerprint) in self._current()
+
+    def changed(self):
+        """Make every worker rebuild its filter on its next refresh"""
+        _incr(BLOOM_VERSION_KEY)
+        self._checked = 0.0
+
+
+known_spam = KnownSpam()
+
+
+# ---------------------- checks ----------------------
+
+def _incr(key, delta=1, timeout=None):
+    # Atomic only where the backend's add/incr are (see the module docstring)
+    if cache.add(key, delta, timeout):
+        return delta
+    try:
+        value = cache.incr(key, delta)
+    except ValueError:
+        cache.set(key, delta, timeout)
+        return delta
+    # incr() re-saves with the default timeout on most backends
+    cache.touch(key, timeout)
+    return value
+
+
+def check(data, honeypot='', form_token=''):
+    """The reason to quarantine a cleaned submission, or None to let it through"""
+    if honeypot:
+        return 'honeypot'
+
+    # No token only loses the timing check: clients that don't fetch one are legitimate
+    if form_token:
+        try:
+            issued = signing.loads(form_token, salt=TOKEN_SALT, max_age=settings.SPAM_FORM_TOKEN_MAX_AGE)
+        except signing.SignatureExpired:
+            # A form left open for a long time; only the timing check is lost
+            issued = None
+        except signing.BadSignature:
+            return 'bad_token'
+        if issued is not None and time.time() - issued < settings.SPAM_MIN_FILL_SECONDS:
+            return 'too_fast'
+
+    if data.get('message') and fingerprint(data['message']) in known_spam:
+        return 'known_spam'
+
+    email = data.get('email')
+    if email:
+        window = settings.SPAM_BURST_WINDOW
+        key = BURST_KEY.format(hashlib.sha1(email.encode()).hexdigest(), int(time.time() // window))
+        if _incr(key, timeout=window) > settings.SPAM_BURST_LIMIT:
+            return 'burst'
+    return None
+
+
+def quarantine(kind, data, reason):
+    status = 'spam' if reason in CONFIDENT_REASONS else 'held'
+    QuarantinedSubmission.objects.create(
+        kind=kind,
+        email=data.get('email', ''),
+        payload=data,
+        reason=reason,
+        fingerprint=fingerprint(data.get('message', '')),
+        status=status,
+    )
+    if status == 'spam':
+        known_spam.changed()
+    _incr(STATS_PREFIX + 'quarantined')
+    _incr(STATS_PREFIX + 'writes_avoided', WRITES_PER_SUBMISSION)
+    _incr(STATS_PREFIX + 'emails_avoided', EMAILS_PER_SUBMISSION)
+    logger.warning("Quarantined %s submission from %s: %s", kind, data.get('email'), reason)
+
+
+def release(queryset):
+    """Turn held submissions into real ones (notifications included); returns how many"""
+    released = 0
+    for item in queryset.exclude(status='released'):
+        model, extra = RELEASE_TO[item.kind]
+        model(**{**extra, **item.payload}).save()
+        was_spam = item.status == 'spam'
+        item.status = 'released'
+        item.save(update_fields=['status'])
+        if was_spam:
+            known_spam.changed()
+        released += 1
+    return released
+
+
+def mark_spam(queryset):
+    count = queryset.exclude(status='spam').update(status='spam')
+    if count:
+        known_spam.changed()
+    return count
+
+
+def stats():
+    values = cache.get_many([STATS_PREFIX + name for name in STATS])
+    return {name: values.get(STATS_PREFIX + name, 0) for name in STATS}
+
+
+def spam_prefilter(kind, message):
+    """
+    Decorator for views taking (request, data) from validate_json: strips
+    the signal fields and quarantines spam, answering with the view's usual
+    success ``message`` so bots learn nothing. If the database is down the
+    submission goes on to the view, which journals it like any other.
+    """
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, data, *args, **kwargs):
+            signals = {name: data.pop(name, '') for name in SIGNAL_FIELDS}
+            if settings.SPAM_FILTER_ENABLED:
+                _incr(STATS_PREFIX + 'checked')
+                try:
+                    reason = check(data, **signals)
+                    if reason is not None:
+                        quarantine(kind, data, reason)
+                        return JsonResponse({'success': True, 'message': message})
+                except DB_UNAVAILABLE as e:
+                    # Better journaled unchecked than answered with a 500
+                    logger.warning("Spam prefilter skipped for %s submission, database unavailable: %s", kind, e)
+            return view_func(request, data, *args, **kwargs)
+        return wrapper
+    return decorator
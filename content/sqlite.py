@@ -0,0 +1,73 @@
+"""
+SQLite performance profile for the fallback database.
+
+When settings fall back to SQLite, every new connection gets SQLITE_PRAGMAS
+(WAL, synchronous=NORMAL, a busy timeout and larger page/mmap caches) and,
+with SQLITE_IMMEDIATE_TRANSACTIONS, opens its transactions with BEGIN
+IMMEDIATE. Taking the write lock up front means concurrent writers queue on
+busy_timeout instead of deadlocking on a read-to-write lock upgrade, which
+SQLite reports as "database is locked" without waiting.
+
+``save_with_retry`` is what the submit views use to insert: the model's
+short save transaction is retried a few times if the lock still can't be
+had.
+"""
+
+import logging
+import random
+import time
+import types
+
+from django.conf import settings
+from django.db import OperationalError
+
+logger = logging.getLogger(__name__)
+
+
+def _begin_immediate(self):
+    # Same as the backend's own method but takes the write lock immediately;
+    # what Django 5.1 offers as OPTIONS['transaction_mode'] = 'IMMEDIATE'
+    self.cursor().execute('BEGIN IMMEDIATE')
+
+
+def configure_connection(sender, connection, **kwargs):
+    """connection_created receiver applying the SQLite profile"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    if settings.SQLITE_IMMEDIATE_TRANSACTIONS:
+        connection._start_transaction_under_autocommit = types.MethodType(_begin_immediate, connection)
+
+
+def is_locked_error(error):
+    return isinstance(error, OperationalError) and 'locked' in str(error)
+
+
+def save_with_retry(instance, retries=None):
+    """
+    Save a new model instance, retrying while the database is locked.
+    Returns the saved instance.
+    """
+    retries = settings.DB_WRITE_RETRIES if retries is None else retries
+    model = type(instance)
+    for attempt in range(retries + 1):
+        try:
+            instance.save()
+            return instance
+        except OperationalError as e:
+            if not is_locked_error(e):
+                raise
+            # The insert may have committed before a later write (e.g. the
+            # notification bookkeeping) failed; don't insert it twice
+            if instance.pk is not None and model._default_manager.filter(pk=instance.pk).exists():
+                logger.warning("%s %s saved, but a follow-up write failed: %s", model.__name__, instance.pk, e)
+                return instance
+            if attempt == retries:
+                raise
+            instance.pk = None
+            instance._state.adding = True
+            delay = 0.05 * (2 ** attempt) * (1 + random.random())
+            logger.warning("Database locked saving %s, retry %s in %.2fs", model.__name__, attempt + 1, delay)
+            time.sleep(delay)
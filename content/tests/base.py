@@ -0,0 +1,61 @@
+import shutil
+import tempfile
+from datetime import date, time
+from pathlib import Path
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from content.models import ServiceBooking
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def make_booking(**fields):
+    """Save a ServiceBooking with valid defaults for anything not given"""
+    fields = {
+        'full_name': 'Ann Wanjiru',
+        'email': 'ann@example.com',
+        'phone': '0712345678',
+        'service_type': 'counselling',
+        'session_mode': 'online',
+        'preferred_date': date(2030, 1, 15),
+        'preferred_time': time(10, 0),
+        'description': 'First session',
+        **fields,
+    }
+    return ServiceBooking.objects.create(**fields)
+
+
+class ContentTestCase(TestCase):
+    """
+    TestCase with a private cache and temporary directories for everything
+    the app writes to disk (archive, pre-rendered pages, journal, media).
+    Pre-rendering after content edits is off unless a test turns it on.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = Path(tempfile.mkdtemp())
+        cls._tmp_settings = override_settings(
+            CACHES=LOCMEM_CACHE,
+            ARCHIVE_ROOT=cls.tmp / 'archive',
+            PRERENDER_ROOT=cls.tmp / 'prerendered',
+            PRERENDER_ENABLED=False,
+            JOURNAL_ROOT=cls.tmp / 'journal',
+            MEDIA_ROOT=cls.tmp / 'media',
+        )
+        cls._tmp_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._tmp_settings.disable()
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        # Files don't roll back with the test transaction
+        for path in self.tmp.iterdir():
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from django.utils import timezone
+
+from content import archive
+from content.models import ClientInteraction, ContactSubmission, ServiceBooking
+
+from .base import ContentTestCase, make_booking
+
+OLD = timezone.make_aware(datetime(2023, 3, 10, 9, 0))
+CUTOFF = timezone.make_aware(datetime(2024, 1, 1))
+
+
+def _backdate(instance, when=OLD):
+    type(instance).objects.filter(pk=instance.pk).update(submitted_at=when)
+
+
+class ArchiveTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.done = make_booking(full_name='Old Client', status='completed')
+        self.open = make_booking(status='pending')
+        self.recent = make_booking(status='completed')
+        _backdate(self.done)
+        _backdate(self.open)
+
+    def test_only_finished_old_bookings_move(self):
+        self.assertEqual(archive.archive('booking', CUTOFF, dry_run=True), 1)
+        self.assertEqual(archive.archive('booking', CUTOFF), 1)
+        self.assertEqual(set(ServiceBooking.objects.values_list('pk', flat=True)), {self.open.pk, self.recent.pk})
+        self.assertTrue(archive.partition_path('booking', OLD).exists())
+        self.assertEqual(archive.archived_before('booking'), CUTOFF.date())
+
+    def test_timeline_keeps_archived_history(self):
+        archive.archive('booking', CUTOFF)
+        row = ClientInteraction.objects.get(kind='booking', object_id=self.done.pk)
+        self.assertTrue(row.archived)
+
+    def test_search_by_term_and_month(self):
+        archive.archive('booking', CUTOFF)
+        self.assertEqual([row['id'] for row in archive.search('booking', 'old client')], [self.done.pk])
+        self.assertEqual(archive.search('booking', start_month='2023-04'), [])
+
+    def test_archiving_twice_is_harmless(self):
+        archive.archive('booking', CUTOFF)
+        # A crash between the append and the delete leaves a second copy
+        archive._append(archive.partition_path('booking', OLD), [{'id': self.done.pk, 'full_name': 'Old Client',
+                                                                  'submitted_at': OLD.isoformat()}])
+        self.assertEqual(len(archive.search('booking')), 1)
+
+    def test_restore_keeps_id_and_submission_time(self):
+        archive.archive('booking', CUTOFF)
+        self.assertEqual(archive.restore('booking', [self.done.pk]), 1)
+        restored = ServiceBooking.objects.get(pk=self.done.pk)
+        self.assertEqual((restored.full_name, restored.submitted_at), ('Old Client', OLD))
+        self.assertFalse(ClientInteraction.objects.get(kind='booking', object_id=self.done.pk).archived)
+        self.assertEqual(archive.restore('booking', [self.done.pk]), 0)
+
+    def test_contacts_archive_regardless_of_state(self):
+        contact = ContactSubmission.objects.create(name='Ann', email='ann@example.com', subject='Hi', message='Hi')
+        _backdate(contact)
+        self.assertEqual(archive.archive('contact', CUTOFF), 1)
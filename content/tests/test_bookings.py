@@ -0,0 +1,110 @@
+import smtplib
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail as djmail
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+
+from content import bookings, counters, outbox
+from content.delivery import smtp_breaker
+from content.models import ClientInteraction, OutboundEmail, ServiceBooking
+
+from .base import ContentTestCase, make_booking
+
+LOCMEM_SEND = 'django.core.mail.backends.locmem.EmailBackend.send_messages'
+
+
+class TransitionTests(ContentTestCase):
+    def test_moves_selection_in_bulk(self):
+        make_booking()
+        make_booking(email='bob@example.com')
+        make_booking(status='confirmed')
+        self.assertEqual(bookings.transition(ServiceBooking.objects.all(), 'confirmed'), 2)
+        self.assertEqual(ServiceBooking.objects.filter(status='confirmed').count(), 3)
+        values = counters.get_counters()
+        self.assertEqual((values['bookings_pending'], values['bookings_confirmed']), (0, 3))
+        self.assertTrue(all('Confirmed' in summary for summary in
+                            ClientInteraction.objects.filter(kind='booking').values_list('summary', flat=True)))
+
+    def test_notifications_are_queued_not_sent(self):
+        make_booking(full_name='Ann Wanjiru')
+        djmail.outbox = []
+        bookings.transition(ServiceBooking.objects.all(), 'cancelled')
+        self.assertEqual(djmail.outbox, [])
+        queued = OutboundEmail.objects.get()
+        self.assertEqual(queued.subject, bookings.NOTIFY_SUBJECTS['cancelled'])
+        self.assertIn('Dear Ann Wanjiru', queued.body)
+        self.assertIn('has been cancelled', queued.html_body)
+
+    def test_no_notifications_when_asked(self):
+        make_booking()
+        bookings.transition(ServiceBooking.objects.all(), 'completed', notify=False)
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_pending_needs_no_email(self):
+        make_booking(status='confirmed')
+        bookings.transition(ServiceBooking.objects.all(), 'pending')
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_unknown_status(self):
+        with self.assertRaises(ValueError):
+            bookings.transition(ServiceBooking.objects.all(), 'lost')
+
+
+@override_settings(OUTBOX_BATCH_SIZE=2, OUTBOX_MAX_ATTEMPTS=2)
+class OutboxTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        outbox.queue([(f'client{n}@example.com', f'Subject {n}', 'Body') for n in range(3)])
+        djmail.outbox = []
+
+    def test_delivers_everything_in_batches(self):
+        self.assertEqual(outbox.send_pending(), (3, 0))
+        self.assertEqual(len(djmail.outbox), 3)
+        self.assertFalse(outbox.pending().exists())
+
+    def test_refused_messages_are_retried_then_given_up(self):
+        refused = smtplib.SMTPRecipientsRefused({'client0@example.com': (550, b'No such user')})
+        with mock.patch(LOCMEM_SEND, side_effect=refused):
+            self.assertEqual(outbox.send_batch(), (0, 2))
+        self.assertEqual(sorted(OutboundEmail.objects.values_list('attempts', flat=True)), [0, 1, 1])
+        with mock.patch(LOCMEM_SEND, side_effect=refused):
+            outbox.send_batch(batch_size=10)
+        self.assertEqual(outbox.pending().count(), 1)
+
+    def test_outage_defers_without_using_attempts(self):
+        for _ in range(3):
+            with mock.patch(LOCMEM_SEND, side_effect=OSError('smtp down')):
+                outbox.send_batch(batch_size=10)
+            OutboundEmail.objects.update(next_attempt_at=None)
+        self.assertEqual(set(OutboundEmail.objects.values_list('attempts', 'deferrals', 'last_error')),
+                         {(0, 3, 'smtp down')})
+        self.assertEqual(outbox.pending().count(), 3)
+        smtp_breaker.record_success()
+        self.assertEqual(outbox.send_pending(), (3, 0))
+
+    @override_settings(OUTBOX_RETRY_DELAY=60, OUTBOX_RETRY_MAX_DELAY=100)
+    def test_deferred_messages_wait_longer_each_time(self):
+        now = timezone.now()
+        delays = []
+        for _ in range(3):
+            with mock.patch.object(outbox.timezone, 'now', return_value=now), \
+                    mock.patch(LOCMEM_SEND, side_effect=smtplib.SMTPServerDisconnected('gone')):
+                self.assertEqual(outbox.send_batch(batch_size=10), (0, 3))
+            next_attempt = OutboundEmail.objects.first().next_attempt_at
+            delays.append((next_attempt - now).total_seconds())
+            self.assertFalse(outbox.due(now).exists())
+            self.assertEqual(outbox.due(next_attempt).count(), 3)
+            now = next_attempt
+        self.assertEqual(delays, [60, 100, 100])
+    def test_skipped_while_breaker_open(self):
+        with mock.patch.object(smtp_breaker, 'allow', return_value=False):
+            self.assertEqual(outbox.send_pending(), (0, 0))
+        self.assertEqual(outbox.pending().count(), 3)
+
+    def test_one_sender_at_a_time(self):
+        cache.add(outbox.SEND_LOCK_KEY, 1)
+        self.assertIsNone(outbox.send_pending())
+        self.assertEqual(djmail.outbox, [])
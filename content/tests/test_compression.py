@@ -0,0 +1,107 @@
+import gzip
+import unittest
+from unittest import mock
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from content import compression
+from content.middleware import CompressionMiddleware
+
+BODY = ('<p>Empowerment, Enhanced Productivity, Happy Life</p>' * 60).encode()
+
+
+def _codec(name):
+    return next(codec for codec in compression.CODECS if codec.name == name)
+
+
+class NegotiateTests(SimpleTestCase):
+    def test_gzip_only(self):
+        self.assertEqual(compression.negotiate('gzip, deflate').name, 'gzip')
+
+    def test_refused_and_unknown(self):
+        self.assertIsNone(compression.negotiate('gzip;q=0, identity'))
+        self.assertIsNone(compression.negotiate(''))
+
+    def test_quality_beats_preference(self):
+        self.assertEqual(compression.negotiate('br;q=0.5, gzip;q=0.9').name, 'gzip')
+
+    @unittest.skipIf(compression.brotli is None, 'brotli not installed')
+    def test_brotli_preferred_on_a_tie(self):
+        self.assertEqual(compression.negotiate('gzip, deflate, br, zstd').name, 'br')
+        self.assertEqual(compression.negotiate('*').name, 'br')
+
+    def test_compressible_types(self):
+        self.assertTrue(compression.is_compressible('text/html; charset=utf-8'))
+        self.assertTrue(compression.is_compressible('application/json'))
+        self.assertFalse(compression.is_compressible('image/png'))
+
+
+class CompressTests(SimpleTestCase):
+    def setUp(self):
+        compression.compressed_cache.clear()
+
+    def test_identical_bodies_are_compressed_once(self):
+        codec = _codec('gzip')
+        with mock.patch.object(codec, 'compress', wraps=codec.compress) as spy:
+            first = compression.compress(BODY, codec)
+            second = compression.compress(BODY, codec)
+        self.assertIs(first, second)
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(gzip.decompress(first), BODY)
+
+    def test_overloaded_only_reuses_cached_bytes(self):
+        codec = _codec('gzip')
+        self.assertIsNone(compression.compress(BODY, codec, allow_new=False))
+        compression.compress(BODY, codec, cheap=True)
+        self.assertIsNotNone(compression.compress(BODY, codec, allow_new=False))
+
+    def test_pressure_levels(self):
+        with override_settings(COMPRESSION_HIGH_LOAD=0.75, COMPRESSION_MAX_LOAD=1.5):
+            for load, state in ((0.2, 'normal'), (1.0, 'high'), (2.0, 'overloaded')):
+                with mock.patch.object(compression, 'load_per_cpu', return_value=load):
+                    self.assertEqual(compression.pressure(), state)
+
+
+@override_settings(COMPRESSION_ENABLED=True, COMPRESSION_MIN_SIZE=200)
+@mock.patch.object(compression, 'pressure', return_value='normal')
+class CompressionMiddlewareTests(SimpleTestCase):
+    factory = RequestFactory()
+
+    def setUp(self):
+        compression.compressed_cache.clear()
+
+    def run_middleware(self, response, accept='gzip', **meta):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING=accept, **meta)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_compresses_html(self, pressure):
+        page = HttpResponse(BODY)
+        page['ETag'] = '"v1"'
+        response = self.run_middleware(page)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['ETag'], 'W/"v1"')
+
+    def test_leaves_small_binary_and_encoded_responses(self, pressure):
+        small = self.run_middleware(HttpResponse(b'ok'))
+        image = self.run_middleware(HttpResponse(BODY, content_type='image/png'))
+        encoded = HttpResponse(BODY)
+        encoded['Content-Encoding'] = 'br'
+        streaming = self.run_middleware(StreamingHttpResponse([BODY]))
+        for response in (small, image, self.run_middleware(encoded), streaming):
+            self.assertNotEqual(response.get('Content-Encoding'), 'gzip')
+
+    def test_csrf_pages_get_padded_gzip_only(self, pressure):
+        response = self.run_middleware(HttpResponse(BODY), accept='br, zstd, gzip', CSRF_COOKIE_USED=True)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(len(compression.compressed_cache._entries), 0)
+
+    @unittest.skipIf(compression.zstandard is None, 'zstandard not installed')
+    def test_zstd_when_preferred(self, pressure):
+        response = self.run_middleware(HttpResponse(BODY), accept='zstd, gzip;q=0.5')
+        self.assertEqual(response['Content-Encoding'], 'zstd')
+        self.assertEqual(compression.zstandard.ZstdDecompressor().decompress(response.content), BODY)
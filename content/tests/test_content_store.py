@@ -0,0 +1,42 @@
+from content.content_store import get_website_content
+from content.models import WebsiteContent
+
+from .base import ContentTestCase
+
+
+class WebsiteContentStoreTests(ContentTestCase):
+    def test_snapshot_is_one_query_then_cached(self):
+        WebsiteContent.objects.create(key='hero_title', value='Welcome', content_type='hero')
+        with self.assertNumQueries(1):
+            self.assertEqual(get_website_content(), {'hero_title': 'Welcome'})
+        with self.assertNumQueries(0):
+            get_website_content()
+
+    def test_save_drops_the_snapshot(self):
+        item = WebsiteContent.objects.create(key='hero_title', value='Welcome', content_type='hero')
+        get_website_content()
+        item.value = 'Karibu'
+        with self.captureOnCommitCallbacks(execute=True):
+            item.save()
+        self.assertEqual(get_website_content()['hero_title'], 'Karibu')
+
+    def test_bulk_upsert_creates_and_updates(self):
+        WebsiteContent.objects.create(key='phone', value='old', content_type='contact')
+        get_website_content()
+        with self.captureOnCommitCallbacks(execute=True):
+            result = WebsiteContent.bulk_upsert([
+                ('phone', '0758283613', 'contact', ''),
+                ('email', 'hello@example.com', 'contact', ''),
+            ])
+        self.assertEqual(result, (1, 1))
+        self.assertEqual(get_website_content(), {'phone': '0758283613', 'email': 'hello@example.com'})
+
+    def test_bulk_upsert_without_overwrite_keeps_existing(self):
+        WebsiteContent.objects.create(key='phone', value='edited', content_type='contact')
+        result = WebsiteContent.bulk_upsert([('phone', 'default', 'contact', '')], overwrite=False)
+        self.assertEqual(result, (0, 0))
+        self.assertEqual(WebsiteContent.objects.get(key='phone').value, 'edited')
+
+    def test_bulk_upsert_keeps_the_last_duplicate_key(self):
+        WebsiteContent.bulk_upsert([('phone', 'a', 'contact', ''), ('phone', 'b', 'contact', '')])
+        self.assertEqual(WebsiteContent.objects.get(key='phone').value, 'b')
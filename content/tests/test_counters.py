@@ -0,0 +1,79 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from content import counters, scheduler
+from content.models import Blog, ContactSubmission, DashboardCounter, NewsletterSubscriber, Service, ServiceBooking
+
+from .base import ContentTestCase, make_booking
+
+
+class DashboardCounterTests(ContentTestCase):
+    def assertCounters(self, **expected):
+        values = counters.get_counters()
+        self.assertEqual({name: values[name] for name in expected}, expected)
+
+    def test_new_rows_are_counted(self):
+        make_booking()
+        ContactSubmission.objects.create(name='Ann', email='ann@example.com', subject='Hi', message='Hello')
+        NewsletterSubscriber.objects.create(email='ann@example.com')
+        self.assertCounters(bookings_total=1, bookings_pending=1, contacts_total=1, contacts_unread=1,
+                            subscribers_total=1, subscribers_active=1)
+
+    def test_status_change_moves_between_counters(self):
+        booking = make_booking()
+        booking.status = 'confirmed'
+        booking.save()
+        self.assertCounters(bookings_total=1, bookings_pending=0, bookings_confirmed=1)
+
+    def test_unchanged_state_leaves_counters_alone(self):
+        booking = make_booking()
+        booking.description = 'Rescheduled'
+        with CaptureQueriesContext(connection) as queries:
+            booking.save()
+        self.assertFalse([q for q in queries if 'content_dashboardcounter' in q['sql']])
+        self.assertCounters(bookings_pending=1)
+
+    def test_marking_read_and_unsubscribing(self):
+        contact = ContactSubmission.objects.create(name='Ann', email='ann@example.com', subject='Hi', message='Hello')
+        subscriber = NewsletterSubscriber.objects.create(email='ann@example.com')
+        contact.is_read = True
+        contact.save()
+        subscriber.is_active = False
+        subscriber.save()
+        self.assertCounters(contacts_total=1, contacts_unread=0, subscribers_total=1, subscribers_active=0)
+
+    def test_delete_decrements(self):
+        booking = make_booking()
+        ServiceBooking.objects.get(pk=booking.pk).delete()
+        self.assertCounters(bookings_total=0, bookings_pending=0)
+
+    def test_reconcile_repairs_drift(self):
+        make_booking()
+        DashboardCounter.objects.filter(name='bookings_total').update(value=40)
+        drift = counters.reconcile()
+        self.assertEqual(drift, {'bookings_total': (40, 1)})
+        self.assertCounters(bookings_total=1)
+        self.assertEqual(counters.reconcile(), {})
+
+    def test_blogs_and_services_are_counted(self):
+        blog = Blog.objects.create(title='Stress', excerpt='Short', content='Text')
+        Blog.objects.create(title='Draft', excerpt='Short', content='Text', is_published=False)
+        service = Service.objects.create(name='Counselling', category='counselling', description='Talk')
+        self.assertCounters(blogs_total=2, blogs_published=1, services_total=1, services_active=1)
+        blog.is_published = False
+        blog.save()
+        service.delete()
+        self.assertCounters(blogs_total=2, blogs_published=0, services_total=0, services_active=0)
+
+    def test_bulk_updates_are_repaired_by_the_scheduler(self):
+        ContactSubmission.objects.create(name='Ann', email='ann@example.com', subject='Hi', message='Hello')
+        # No signals: the counters drift until the next reconcile
+        ContactSubmission.objects.update(is_read=True)
+        self.assertCounters(contacts_unread=1)
+        with override_settings(COUNTERS_RECONCILE_SECONDS=3600):
+            self.assertEqual(scheduler.tick(deliver=False)['repaired'], 1)
+            self.assertCounters(contacts_unread=0)
+            ContactSubmission.objects.update(is_read=False)
+            # Once per interval
+            self.assertEqual(scheduler.tick(deliver=False)['repaired'], 0)
@@ -0,0 +1,111 @@
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core import mail as djmail
+from django.core.management import call_command
+from django.test import override_settings
+
+from content import delivery, models
+from content.delivery import CircuitBreaker, MailUnavailable, smtp_breaker
+
+from .base import ContentTestCase, make_booking
+
+
+class CircuitBreakerTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.breaker = CircuitBreaker('test', threshold=2, cooldown=60)
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), 'closed')
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), 'open')
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.stats()['short_circuited'], 1)
+
+    def test_success_resets_the_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), 'closed')
+
+    def test_one_probe_after_cooldown(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        later = time.time() + 61
+        with mock.patch('content.delivery.time.time', return_value=later):
+            self.assertEqual(self.breaker.state(), 'half-open')
+            self.assertTrue(self.breaker.allow())
+            self.assertFalse(self.breaker.allow())
+            self.breaker.record_success()
+        self.assertEqual(self.breaker.state(), 'closed')
+
+    def test_failed_probe_reopens(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        with mock.patch('content.delivery.time.time', return_value=time.time() + 61):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+            self.assertEqual(self.breaker.state(), 'open')
+
+
+class SendMailTests(ContentTestCase):
+    def send(self):
+        return delivery.send_mail('Subject', 'Body', 'from@example.com', ['to@example.com'])
+
+    def test_sends_and_records_success(self):
+        self.assertEqual(self.send(), 1)
+        self.assertEqual(len(djmail.outbox), 1)
+        self.assertEqual(smtp_breaker.stats()['succeeded'], 1)
+
+    @override_settings(EMAIL_SEND_DEADLINE=0.05)
+    def test_slow_send_misses_the_deadline(self):
+        with mock.patch('django.core.mail.send_mail', side_effect=lambda *args, **kwargs: time.sleep(0.5)):
+            started = time.monotonic()
+            with self.assertRaises(MailUnavailable):
+                self.send()
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(smtp_breaker.stats()['consecutive_failures'], 1)
+
+    def test_open_breaker_fails_fast(self):
+        with mock.patch.object(smtp_breaker, 'allow', return_value=False):
+            with self.assertRaisesMessage(MailUnavailable, 'circuit breaker is open'):
+                self.send()
+        self.assertEqual(djmail.outbox, [])
+
+    def test_errors_count_as_failures(self):
+        with mock.patch('django.core.mail.send_mail', side_effect=OSError('refused')):
+            with self.assertRaises(OSError):
+                self.send()
+        self.assertEqual(smtp_breaker.stats()['failed'], 1)
+
+
+@override_settings(EMAIL_HOST_USER='site@example.com', EMAIL_HOST_PASSWORD='x', ADMIN_NOTIFY_MODE='immediate')
+class RetryNotificationsTests(ContentTestCase):
+    def test_only_the_failed_email_is_resent(self):
+        real_send = models.safe_send_mail
+
+        def client_send_fails(subject, message, from_email, recipient_list, **kwargs):
+            if recipient_list == ['ann@example.com']:
+                return models.SendResult('timed out')
+            return real_send(subject, message, from_email, recipient_list, **kwargs)
+
+        with mock.patch.object(models, 'safe_send_mail', side_effect=client_send_fails):
+            booking = make_booking()
+        booking.refresh_from_db()
+        self.assertEqual((booking.admin_email_sent, booking.client_email_sent, booking.email_sent),
+                         (True, False, False))
+        self.assertEqual(booking.email_error, 'timed out')
+        self.assertEqual(len(djmail.outbox), 1)
+
+        djmail.outbox = []
+        call_command('retry_notifications', stdout=StringIO())
+        self.assertEqual([message.to for message in djmail.outbox], [['ann@example.com']])
+        booking.refresh_from_db()
+        self.assertEqual((booking.email_sent, booking.email_error), (True, ''))
+
+        djmail.outbox = []
+        call_command('retry_notifications', stdout=StringIO())
+        self.assertEqual(djmail.outbox, [])
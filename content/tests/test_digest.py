@@ -0,0 +1,85 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from content import digest
+from content.models import AdminDigestItem, notify_admin
+
+from .base import ContentTestCase
+
+
+@override_settings(
+    ADMIN_NOTIFY_MODE='digest', ADMIN_DIGEST_WINDOW=600,
+    EMAIL_HOST_USER='site@example.com', EMAIL_HOST_PASSWORD='x',
+)
+class DigestTests(ContentTestCase):
+    def queue(self, kind, subject, minutes_ago):
+        self.assertTrue(notify_admin(kind, subject, f'Body of {subject}'))
+        AdminDigestItem.objects.filter(subject=subject).update(
+            created_at=timezone.now() - timedelta(minutes=minutes_ago),
+        )
+
+    def test_notify_admin_queues_in_digest_mode(self):
+        notify_admin('contact', 'New contact', 'Hello')
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(digest.pending().get().subject, 'New contact')
+
+    def test_immediate_bypasses_the_digest(self):
+        notify_admin('booking', 'New booking', 'Hello', immediate=True)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(AdminDigestItem.objects.exists())
+
+    @override_settings(ADMIN_NOTIFY_MODE='immediate')
+    def test_immediate_mode(self):
+        notify_admin('contact', 'New contact', 'Hello')
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_waits_for_the_window(self):
+        self.queue('contact', 'Fresh', minutes_ago=1)
+        self.assertEqual(digest.send_digest(), 0)
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(digest.send_digest(force=True), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_one_email_for_everything_pending(self):
+        self.queue('contact', 'Contact from Ann', minutes_ago=15)
+        self.queue('subscriber', 'New subscriber', minutes_ago=5)
+        self.queue('contact', 'Contact from Bea', minutes_ago=1)
+        self.assertEqual(digest.send_digest(), 3)
+        [message] = mail.outbox
+        self.assertEqual(message.subject, 'Admin digest: 2 contact messages, 1 newsletter subscribers')
+        self.assertIn('== Contact messages (2) ==', message.body)
+        self.assertIn('Body of Contact from Bea', message.body)
+        self.assertFalse(digest.pending().exists())
+        self.assertEqual(digest.send_digest(force=True), 0)
+
+    def test_failed_send_leaves_items_pending(self):
+        self.queue('contact', 'Contact from Ann', minutes_ago=15)
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('down')):
+            self.assertEqual(digest.send_digest(), 0)
+        self.assertEqual(digest.pending().count(), 1)
+        self.assertFalse(cache.get(digest.SEND_LOCK_KEY))
+
+    def test_locked(self):
+        self.queue('contact', 'Contact from Ann', minutes_ago=15)
+        cache.add(digest.SEND_LOCK_KEY, 1)
+        self.assertEqual(digest.send_digest(), 0)
+        self.assertEqual(mail.outbox, [])
+
+    def test_overdue(self):
+        self.queue('contact', 'Old', minutes_ago=25)
+        self.queue('contact', 'Recent', minutes_ago=15)
+        self.assertEqual([item.subject for item in digest.overdue()], ['Old'])
+
+    @override_settings(ADMIN_NOTIFY_MODE='immediate')
+    def test_command_flushes_leftovers_after_switching_back(self):
+        AdminDigestItem.objects.create(kind='contact', subject='Leftover', body='Hello')
+        out = StringIO()
+        call_command('send_admin_digest', stdout=out)
+        self.assertIn('Sent 1 notifications in a digest, 0 pending', out.getvalue())
@@ -0,0 +1,72 @@
+from django.core import mail as djmail
+from django.test import override_settings
+
+from content import counters
+from content.models import AdminDigestItem, OutboundEmail, ServiceBooking
+
+from .base import ContentTestCase
+
+
+def _roster(*attendees, **fields):
+    return {
+        'organization': 'Acme Ltd',
+        'organizerName': 'Grace Achieng',
+        'organizerEmail': 'grace@acme.example',
+        'organizerPhone': '0711000000',
+        'sessionMode': 'in-person',
+        'preferredDate': '2030-03-01',
+        'preferredTime': '09:00',
+        'attendees': list(attendees),
+        **fields,
+    }
+
+
+def _attendee(n, **fields):
+    return {'fullName': f'Attendee {n}', 'email': f'a{n}@acme.example', 'phone': f'07000000{n:02d}', **fields}
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, ADMIN_NOTIFY_MODE='immediate')
+class GroupRegistrationTests(ContentTestCase):
+    def post(self, payload):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/group-registration/', payload, content_type='application/json')
+
+    def test_books_every_valid_attendee(self):
+        response = self.post(_roster(_attendee(1), _attendee(2), _attendee(3, email='bad'), _attendee(1)))
+        data = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['status'] for r in data['results']], ['created', 'created', 'invalid', 'duplicate'])
+        self.assertEqual(data['results'][2]['errors'], {'email': 'Please enter a valid email address.'})
+        self.assertEqual(ServiceBooking.objects.filter(service_type='training', status='pending').count(), 2)
+        self.assertEqual(counters.get_counters()['bookings_pending'], 2)
+
+    def test_emails_are_queued_and_admin_notified_once(self):
+        djmail.outbox = []
+        self.post(_roster(_attendee(1), _attendee(2)))
+        recipients = sorted(OutboundEmail.objects.values_list('to', flat=True))
+        self.assertEqual(recipients, ['a1@acme.example', 'a2@acme.example', 'grace@acme.example'])
+        # Only the admin copy is sent straight away
+        self.assertEqual([m.subject for m in djmail.outbox], ['New Group Registration - Acme Ltd (2 attendees)'])
+
+    @override_settings(ADMIN_NOTIFY_MODE='digest', ADMIN_DIGEST_BOOKINGS_IMMEDIATE=False)
+    def test_admin_copy_follows_digest_mode(self):
+        djmail.outbox = []
+        self.post(_roster(_attendee(1)))
+        self.assertEqual(djmail.outbox, [])
+        self.assertEqual(AdminDigestItem.objects.get().subject, 'New Group Registration - Acme Ltd (1 attendees)')
+
+    def test_resubmitting_is_safe(self):
+        self.post(_roster(_attendee(1)))
+        data = self.post(_roster(_attendee(1), _attendee(2))).json()
+        self.assertEqual([r['status'] for r in data['results']], ['duplicate', 'created'])
+        self.assertEqual(ServiceBooking.objects.count(), 2)
+
+    def test_all_invalid_is_a_400(self):
+        response = self.post(_roster(_attendee(1, fullName='')))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ServiceBooking.objects.exists())
+
+    def test_empty_roster_is_rejected(self):
+        response = self.post(_roster())
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('attendees', response.json()['errors'])
@@ -0,0 +1,84 @@
+import os
+import time
+from unittest import mock
+
+from django.test import override_settings
+
+from content import health
+
+from .base import ContentTestCase
+
+
+def _failing():
+    raise RuntimeError('down')
+
+
+def _monitor(max_staleness=60):
+    monitor = health.HealthMonitor(interval=15, max_staleness=max_staleness)
+    # Mark it started so the tests drive run_checks themselves
+    monitor._pid = os.getpid()
+    return monitor
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class HealthMonitorTests(ContentTestCase):
+    def test_starting_until_the_first_run(self):
+        self.assertEqual(_monitor().snapshot(), ({'status': 'starting'}, 503))
+
+    def test_worker_start_runs_the_first_check(self):
+        monitor = health.HealthMonitor(interval=15, max_staleness=60)
+        with mock.patch.object(health.threading, 'Thread') as thread:
+            monitor.ensure_started(check_first=True)
+        self.assertEqual(monitor.snapshot()[1], 200)
+        thread.assert_called_once()
+        self.assertEqual(thread.call_args.kwargs['args'], (True,))
+
+    def test_ready_when_every_check_passes(self):
+        monitor = _monitor()
+        monitor.run_checks()
+        payload, status = monitor.snapshot()
+        self.assertEqual((payload['status'], status), ('ready', 200))
+        self.assertEqual(set(payload['checks']), {name for name, _, _ in health.CHECKS})
+
+    def test_non_critical_failure_degrades(self):
+        monitor = _monitor()
+        with mock.patch.object(health, 'CHECKS', [('ok', lambda: 'ok', True), ('extra', _failing, False)]):
+            monitor.run_checks()
+        payload, status = monitor.snapshot()
+        self.assertEqual((payload['status'], status), ('degraded', 200))
+        self.assertEqual(payload['checks']['extra']['detail'], 'down')
+
+    def test_critical_failure_is_unavailable(self):
+        monitor = _monitor()
+        with mock.patch.object(health, 'CHECKS', [('database', _failing, True), ('extra', _failing, False)]):
+            monitor.run_checks()
+        payload, status = monitor.snapshot()
+        self.assertEqual((payload['status'], status), ('unavailable', 503))
+
+    def test_stale_result_is_not_ready(self):
+        monitor = _monitor(max_staleness=60)
+        monitor.run_checks()
+        result, _ = monitor.state
+        monitor.state = (result, time.monotonic() - 61)
+        payload, status = monitor.snapshot()
+        self.assertEqual((payload['status'], status), ('stale', 503))
+
+    def test_journal_backlog_degrades(self):
+        with mock.patch('content.journal.depth', return_value=3):
+            with self.assertRaisesMessage(RuntimeError, '3 journaled submissions'):
+                health.check_journal()
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ProbeViewTests(ContentTestCase):
+    def test_live_needs_nothing(self):
+        response = self.client.get('/health/live')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'alive'})
+
+    def test_ready_serves_the_snapshot_uncached(self):
+        with mock.patch.object(health.monitor, 'snapshot', return_value=({'status': 'stale'}, 503)) as snapshot:
+            response = self.client.get('/health/ready')
+        snapshot.assert_called_once_with()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Cache-Control'], 'no-store')
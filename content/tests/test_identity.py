@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase, override_settings
+
+from content import identity
+from content.models import ClientInteraction, ContactSubmission, NewsletterSubscriber
+
+from .base import ContentTestCase, make_booking
+
+
+@override_settings(CLIENT_DEFAULT_COUNTRY_CODE='254')
+class NormalizePhoneTests(SimpleTestCase):
+    def test_local_and_international_forms_agree(self):
+        for raw in ('0712 345 678', '+254 712-345-678', '254712345678', '00254712345678', '712345678'):
+            with self.subTest(raw=raw):
+                self.assertEqual(identity.normalize_phone(raw), '+254712345678')
+
+    def test_empty(self):
+        self.assertEqual(identity.normalize_phone(' - '), '')
+
+
+class TimelineTests(ContentTestCase):
+    def test_rows_are_mirrored_on_save(self):
+        booking = make_booking(email='Ann@Example.com ')
+        row = ClientInteraction.objects.get(kind='booking', object_id=booking.pk)
+        self.assertEqual((row.email, row.phone), ('ann@example.com', '+254712345678'))
+        booking.status = 'confirmed'
+        booking.save()
+        self.assertIn('Confirmed', ClientInteraction.objects.get(pk=row.pk).summary)
+
+    def test_phone_lookup_widens_to_the_clients_emails(self):
+        make_booking(email='ann@example.com', phone='0712345678')
+        ContactSubmission.objects.create(name='Ann', email='ANN@example.com', subject='Question', message='Hi')
+        NewsletterSubscriber.objects.create(email='ann@example.com')
+        make_booking(email='bob@example.com', phone='0799000000')
+
+        kinds = sorted(row.kind for row in identity.timeline('+254 712 345 678'))
+        self.assertEqual(kinds, ['booking', 'contact', 'subscription'])
+
+    def test_email_lookup(self):
+        make_booking(email='ann@example.com')
+        self.assertEqual(len(identity.timeline(' Ann@example.com')), 1)
+        self.assertEqual(identity.timeline('nobody@example.com'), [])
+
+    def test_delete_removes_the_row(self):
+        contact = ContactSubmission.objects.create(name='Ann', email='ann@example.com', subject='Hi', message='Hi')
+        contact.delete()
+        self.assertFalse(ClientInteraction.objects.filter(kind='contact').exists())
@@ -0,0 +1,158 @@
+import json
+from datetime import date, time
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import OperationalError
+from django.test import override_settings
+
+from content import journal
+from content.models import ContactSubmission, JournalReplay, NewsletterSubscriber, ServiceBooking
+
+from .base import ContentTestCase
+from .test_schemas import BOOKING
+
+BOOKING_DATA = {
+    'full_name': 'Ann Wanjiru', 'email': 'ann@example.com', 'phone': '0712345678',
+    'service_type': 'counselling', 'session_mode': 'online',
+    'preferred_date': date(2030, 1, 15), 'preferred_time': time(14, 30), 'description': '',
+}
+CONTACT_DATA = {'name': 'Bea', 'email': 'bea@example.com', 'message': 'Hello'}
+
+
+class JournalTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(journal.replayer, 'ensure_started')
+        self.ensure_started = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def lines(self, name=journal.JOURNAL_FILE):
+        return (self.tmp / 'journal' / name).read_bytes().splitlines()
+
+    def test_append(self):
+        first = journal.append('booking', BOOKING_DATA)
+        journal.append('newsletter', {'email': 'ann@example.com'})
+        self.assertEqual(journal.depth(), 2)
+        entry = json.loads(self.lines()[0])
+        self.assertEqual(entry['id'], first)
+        self.assertEqual(entry['data']['preferred_date'], '2030-01-15')
+        with self.assertRaises(ValueError):
+            journal.append('order', {})
+
+    def test_fallback_encoder_matches_orjson(self):
+        entry = {'id': 'x', 'at': journal.timezone.now(), 'data': dict(BOOKING_DATA, full_name='Wanjirũ')}
+        with mock.patch.object(journal, 'orjson', None):
+            fallback = journal._dumps(entry)
+            self.assertEqual(journal._loads(fallback)['data']['preferred_time'], '14:30:00')
+        self.assertEqual(fallback, journal._dumps(entry))
+
+    def test_replay_in_order(self):
+        journal.append('footer_contact', CONTACT_DATA)
+        journal.append('booking', BOOKING_DATA)
+        journal.append('contact', dict(CONTACT_DATA, name='Cy', subject='Hi'))
+        self.assertEqual(journal.replay(), {'applied': 3, 'duplicate': 0, 'rejected': 0})
+        self.assertEqual(
+            list(ContactSubmission.objects.order_by('pk').values_list('name', 'subject')),
+            [('Bea', 'Footer Quick Inquiry'), ('Cy', 'Hi')],
+        )
+        self.assertEqual(ServiceBooking.objects.get().preferred_time, time(14, 30))
+        self.assertEqual(journal.depth(), 0)
+        self.assertFalse((self.tmp / 'journal' / journal.REPLAYING_FILE).exists())
+        self.assertEqual(journal.replay(), {'applied': 0, 'duplicate': 0, 'rejected': 0})
+
+    def test_interrupted_replay_resumes_without_duplicates(self):
+        journal.append('contact', dict(CONTACT_DATA, subject='One'))
+        journal.append('contact', dict(CONTACT_DATA, subject='Two'))
+        instance = journal._instance
+        calls = []
+
+        def outage_on_second(entry):
+            calls.append(entry)
+            if len(calls) == 2:
+                raise OperationalError('database is down')
+            return instance(entry)
+
+        with mock.patch.object(journal, '_instance', side_effect=outage_on_second):
+            with self.assertRaises(OperationalError):
+                journal.replay()
+        self.assertEqual(journal.depth(), 2)
+        journal.append('contact', dict(CONTACT_DATA, subject='Three'))
+
+        self.assertEqual(journal.replay(), {'applied': 2, 'duplicate': 1, 'rejected': 0})
+        self.assertEqual(
+            list(ContactSubmission.objects.order_by('pk').values_list('subject', flat=True)),
+            ['One', 'Two', 'Three'],
+        )
+
+    def test_rejected_entry_is_kept_not_retried(self):
+        journal.append('booking', dict(BOOKING_DATA, preferred_date='not a date'))
+        with self.assertLogs('content.journal', 'ERROR'):
+            self.assertEqual(journal.replay()['rejected'], 1)
+        rejected = JournalReplay.objects.get()
+        self.assertTrue(rejected.rejected)
+        self.assertEqual(rejected.payload['preferred_date'], 'not a date')
+        self.assertFalse(ServiceBooking.objects.exists())
+        self.assertEqual(journal.depth(), 0)
+
+    def test_newsletter_signup_since_is_not_duplicated(self):
+        journal.append('newsletter', {'email': 'ann@example.com'})
+        NewsletterSubscriber.objects.create(email='ann@example.com')
+        self.assertEqual(journal.replay()['applied'], 1)
+        self.assertEqual(NewsletterSubscriber.objects.count(), 1)
+
+    def test_torn_line_is_skipped(self):
+        journal.append('newsletter', {'email': 'ann@example.com'})
+        with open(self.tmp / 'journal' / journal.JOURNAL_FILE, 'ab') as f:
+            f.write(b'{"id": "torn')
+        with self.assertLogs('content.journal', 'ERROR'):
+            self.assertEqual(journal.replay()['applied'], 1)
+
+    def test_one_replayer_at_a_time(self):
+        journal.append('newsletter', {'email': 'ann@example.com'})
+        # flock locks belong to the open file, so this holds it against replay()'s own open
+        with journal._flock(journal.REPLAY_LOCK_FILE):
+            self.assertIsNone(journal.replay())
+        self.assertEqual(journal.depth(), 1)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('replay_journal', stdout=out)
+        self.assertIn('Journal is empty', out.getvalue())
+        journal.append('newsletter', {'email': 'ann@example.com'})
+        call_command('replay_journal', stdout=out)
+        self.assertIn('1 applied', out.getvalue())
+
+    def test_command_keeps_entries_while_the_database_is_down(self):
+        journal.append('newsletter', {'email': 'ann@example.com'})
+        with mock.patch.object(journal, 'apply', side_effect=OperationalError('down')), \
+                self.assertRaisesMessage(CommandError, '1 entries kept'):
+            call_command('replay_journal', stdout=StringIO())
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class JournaledViewTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(journal.replayer, 'ensure_started')
+        self.ensure_started = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_outage_is_acknowledged_with_202(self):
+        with mock.patch('content.views.save_with_retry', side_effect=OperationalError('database is locked')):
+            response = self.client.post('/api/submit-booking/', BOOKING, content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['queued'], True)
+        self.assertFalse(ServiceBooking.objects.exists())
+        self.assertEqual(journal.depth(), 1)
+        self.ensure_started.assert_called_once_with()
+
+        self.assertEqual(journal.replay()['applied'], 1)
+        self.assertEqual(ServiceBooking.objects.get().full_name, 'Ann Wanjiru')
+
+    def test_journal_failure_is_a_500(self):
+        with mock.patch('content.views.save_with_retry', side_effect=OperationalError('down')), \
+                mock.patch.object(journal, 'append', side_effect=OSError('read-only')):
+            response = self.client.post('/api/submit-booking/', BOOKING, content_type='application/json')
+        self.assertEqual(response.status_code, 500)
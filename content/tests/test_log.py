@@ -0,0 +1,128 @@
+import io
+import json
+import logging
+import os
+import time
+import unittest
+
+from django.test import SimpleTestCase
+
+from mwasa.log import JsonFormatter, QueuedJsonHandler, SamplingFilter, redact
+
+
+def _record(msg, *args, level=logging.INFO, name='content.test', lineno=1):
+    return logging.LogRecord(name, level, __file__, lineno, msg, args, None)
+
+
+def _drain(handler):
+    handler.listener.stop()
+    handler.listener = None
+    return [json.loads(line) for line in handler.target.stream.getvalue().splitlines()]
+
+
+class RedactTests(SimpleTestCase):
+    def test_masks_email_local_part(self):
+        self.assertEqual(redact('from jane.doe@example.co.ke'), 'from ***@example.co.ke')
+
+    def test_masks_phone_keeps_last_digits(self):
+        self.assertEqual(redact('call +254 758 283 613'), 'call ***613')
+
+    def test_leaves_dates_and_short_numbers(self):
+        line = 'booking 42 on 2024-05-01 at 10:30'
+        self.assertEqual(redact(line), line)
+
+
+class JsonFormatterTests(SimpleTestCase):
+    def test_one_json_object_with_redacted_message(self):
+        payload = json.loads(JsonFormatter().format(_record('Booking from %s', 'ann@example.com')))
+        self.assertEqual(payload['level'], 'INFO')
+        self.assertEqual(payload['logger'], 'content.test')
+        self.assertEqual(payload['message'], 'Booking from ***@example.com')
+
+    def test_redaction_can_be_turned_off(self):
+        payload = json.loads(JsonFormatter(redact_pii=False).format(_record('ann@example.com')))
+        self.assertEqual(payload['message'], 'ann@example.com')
+
+
+class SamplingFilterTests(SimpleTestCase):
+    def test_one_in_rate_info_records_per_call_site(self):
+        sampler = SamplingFilter(rate=3)
+        passed = [sampler.filter(_record('tick %s', i)) for i in range(6)]
+        self.assertEqual(passed, [True, False, False, True, False, False])
+
+    def test_call_sites_are_counted_separately(self):
+        sampler = SamplingFilter(rate=2)
+        self.assertTrue(sampler.filter(_record('a', lineno=1)))
+        self.assertTrue(sampler.filter(_record('a', lineno=2)))
+
+    def test_preformatted_messages_share_their_call_site(self):
+        sampler = SamplingFilter(rate=2)
+        passed = [sampler.filter(_record(f'tick {i}')) for i in range(4)]
+        self.assertEqual(passed, [True, False, True, False])
+        self.assertEqual(len(sampler._counters), 1)
+
+    def test_warnings_always_pass(self):
+        sampler = SamplingFilter(rate=100)
+        self.assertTrue(all(sampler.filter(_record('w', level=logging.WARNING)) for _ in range(5)))
+
+
+class QueuedJsonHandlerTests(SimpleTestCase):
+    def setUp(self):
+        self.handler = QueuedJsonHandler(stream=io.StringIO(), maxsize=100)
+        self.addCleanup(self.handler.close)
+
+    def test_records_are_written_by_the_listener(self):
+        self.handler.handle(_record('Booking %s from %s', 7, 'ann@example.com'))
+        [payload] = _drain(self.handler)
+        self.assertEqual(payload['message'], 'Booking 7 from ***@example.com')
+
+    def test_arguments_are_resolved_at_call_time(self):
+        data = {'status': 'pending'}
+        self.handler.handle(_record('state %s', data))
+        data['status'] = 'confirmed'
+        [payload] = _drain(self.handler)
+        self.assertEqual(payload['message'], "state {'status': 'pending'}")
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = QueuedJsonHandler(stream=io.StringIO(), maxsize=1)
+        self.addCleanup(handler.close)
+        handler.listener.stop()
+        handler.listener = None
+        handler.enqueue(_record('kept'))
+        started = time.monotonic()
+        handler.enqueue(_record('dropped'))
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(handler.dropped, 1)
+
+    def test_close_with_full_queue_does_not_hang(self):
+        handler = QueuedJsonHandler(stream=io.StringIO(), maxsize=1)
+        handler.listener.stop()
+        handler.listener.start()
+        # Block the listener's target so the queue stays full
+        handler.target.acquire()
+        try:
+            handler.enqueue(_record('one'))
+            handler.enqueue(_record('two'))
+            started = time.monotonic()
+            handler.close()
+        finally:
+            handler.target.release()
+        self.assertLess(time.monotonic() - started, 10)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'needs fork')
+    def test_forked_child_starts_its_own_listener(self):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                self.handler.handle(_record('from child'))
+                ok = self.handler._pid == os.getpid() and self.handler.listener._thread.is_alive()
+                os.write(write_fd, b'1' if ok else b'0')
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_fd, 'rb') as pipe:
+            self.assertEqual(pipe.read(), b'1')
+        # The parent's listener is untouched
+        self.assertTrue(self.handler.listener._thread.is_alive())
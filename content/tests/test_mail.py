@@ -0,0 +1,59 @@
+from django.test import SimpleTestCase
+
+from content import mail
+
+from .base import ContentTestCase, make_booking
+
+
+class InlineCssTests(SimpleTestCase):
+    def test_class_and_tag_rules_are_inlined(self):
+        rules = mail.parse_stylesheet('p { margin: 0 } .note { color: red; } .a .b { color: blue }')
+        self.assertEqual(rules, {'p': [('margin', '0')], '.note': [('color', 'red')]})
+        html = mail.inline_css('<body><p class="note">Hi</p></body>', rules)
+        self.assertEqual(html, '<body><p class="note" style="margin: 0; color: red">Hi</p></body>')
+
+    def test_existing_inline_style_wins(self):
+        rules = mail.parse_stylesheet('.note { color: red; font-weight: bold }')
+        html = mail.inline_css('<body><span class="note" style="color: blue">Hi</span></body>', rules)
+        self.assertIn('style="font-weight: bold; color: blue"', html)
+
+    def test_media_queries_are_left_out(self):
+        rules = mail.parse_stylesheet('@media (max-width: 600px) { .note { color: red } } .x { top: 0 }')
+        self.assertEqual(rules, {'.x': [('top', '0')]})
+
+    def test_text_twin_keeps_links_and_list_items(self):
+        text = mail.html_to_text_template(
+            '<head><title>x</title></head><p>Hello {{ name }}</p><ul><li>One</li></ul>'
+            '<a href="https://example.com">Site</a>'
+        )
+        self.assertNotIn('<', text)
+        self.assertIn('Hello {{ name }}', text)
+        self.assertIn('• One', text)
+        self.assertIn('Site (https://example.com)', text)
+
+
+class CompiledEmailTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        mail.clear_cache()
+        self.addCleanup(mail.clear_cache)
+
+    def test_every_email_compiles(self):
+        for key in mail.EMAILS:
+            with self.subTest(key=key):
+                self.assertIsInstance(mail.get_email(key), mail.CompiledEmail)
+
+    def test_render_text_and_html(self):
+        booking = make_booking(full_name='Ann <Wanjiru>')
+        text, html = mail.render('booking_confirmation', {'booking': booking})
+        self.assertIn('Ann <Wanjiru>', text)
+        self.assertIn('Ann &lt;Wanjiru&gt;', html)
+        # The stylesheet's class rules are copied onto the elements
+        self.assertRegex(html, r'<div class="highlight-box" style="[^"]*border-left: 4px solid #2c5aa0')
+
+    def test_render_many_layers_shared_context(self):
+        booking = make_booking()
+        results = mail.render_many('booking_status', [{'subject': 'A'}, {'subject': 'B'}], {'booking': booking})
+        self.assertEqual(len(results), 2)
+        self.assertIn('<title>A</title>', results[0][1])
+        self.assertIn('<title>B</title>', results[1][1])
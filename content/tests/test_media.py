@@ -0,0 +1,100 @@
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, override_settings
+
+from content import media
+
+from .base import ContentTestCase
+
+PNG = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 8
+
+
+class HashedMediaStorageTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.storage = media.HashedMediaStorage(location=self.tmp / 'media')
+
+    def test_name_comes_from_content(self):
+        name = self.storage.save('blogs/My Photo.PNG', ContentFile(PNG))
+        self.assertRegex(name, r'^blogs/[0-9a-f]{32}\.png$')
+        self.assertTrue(media.is_hashed_name(name))
+        self.assertEqual(self.storage.open(name).read(), PNG)
+
+    def test_same_upload_is_stored_once(self):
+        first = self.storage.save('blogs/a.png', ContentFile(PNG))
+        second = self.storage.save('blogs/b.png', ContentFile(PNG))
+        self.assertEqual(first, second)
+        self.assertEqual(len(list((self.tmp / 'media/blogs').iterdir())), 1)
+
+    def test_racing_identical_uploads_reuse_the_file(self):
+        name = self.storage.save('blogs/a.png', ContentFile(PNG))
+        # The other upload lands between our exists() check and the link
+        with mock.patch.object(self.storage, 'exists', return_value=False):
+            self.assertEqual(self.storage.save('blogs/b.png', ContentFile(PNG)), name)
+        self.assertEqual([p.name for p in (self.tmp / 'media/blogs').iterdir()], [name.split('/')[1]])
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        self.assertEqual(media.parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(media.parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(media.parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(media.parse_range('bytes=990-2000', 1000), (990, 999))
+
+    def test_unsatisfiable_and_unsupported(self):
+        self.assertEqual(media.parse_range('bytes=1000-', 1000), 'invalid')
+        self.assertEqual(media.parse_range('bytes=50-10', 1000), 'invalid')
+        self.assertIsNone(media.parse_range('bytes=0-1,5-6', 1000))
+        self.assertIsNone(media.parse_range('items=0-1', 1000))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, MEDIA_SENDFILE='', MEDIA_MAX_AGE=3600)
+class ServeMediaTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.name = media.HashedMediaStorage(location=self.tmp / 'media').save('blogs/a.png', ContentFile(PNG))
+        self.url = '/media/' + self.name
+
+    def test_hashed_files_are_immutable(self):
+        response = self.client.get(self.url)
+        self.assertEqual(b''.join(response.streaming_content), PNG)
+        self.assertEqual(response['Cache-Control'], media.IMMUTABLE)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_other_files_get_a_short_max_age(self):
+        (self.tmp / 'media/legacy.png').write_bytes(PNG)
+        self.assertEqual(self.client.get('/media/legacy.png')['Cache-Control'], 'public, max-age=3600')
+
+    def test_conditional_request(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Cache-Control'], media.IMMUTABLE)
+
+    def test_range_request(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=8-15')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), PNG[8:16])
+        self.assertEqual(response['Content-Range'], f'bytes 8-15/{len(PNG)}')
+
+    def test_stale_if_range_gets_the_whole_file(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=8-15', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(PNG)}-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_traversal_and_hidden_files_are_404(self):
+        (self.tmp / 'media/blogs/.tmp-x').write_bytes(b'partial')
+        for url in ('/media/../settings.py', '/media/blogs/.tmp-x', '/media/blogs/missing.png'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    @override_settings(MEDIA_SENDFILE='x-accel-redirect', MEDIA_ACCEL_PREFIX='/protected-media/')
+    def test_nginx_sendfile(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + self.name)
+        self.assertEqual(response.content, b'')
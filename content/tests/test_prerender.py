@@ -0,0 +1,70 @@
+import gzip
+from unittest import mock
+
+from django.test import override_settings
+
+from content import prerender
+from content.models import Blog
+from content.versioning import get_content_version
+
+from .base import ContentTestCase
+
+
+@override_settings(PRERENDER_ENABLED=True, SECURE_SSL_REDIRECT=False, PUBLIC_PAGE_S_MAXAGE=300)
+class PrerenderTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        # Content edits in these tests are rendered explicitly
+        patcher = mock.patch.object(prerender, 'schedule')
+        self.schedule = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.post = Blog.objects.create(title='Coping with exam stress', excerpt='e', content='c')
+
+    def test_renders_every_public_page(self):
+        Blog.objects.create(title='Draft', excerpt='e', content='c', is_published=False)
+        prerender.render_all()
+        root = self.tmp / 'prerendered'
+        for filename in ('index.html', 'services/index.html', 'blog/index.html',
+                         'blog/coping-with-exam-stress/index.html'):
+            with self.subTest(filename=filename):
+                self.assertTrue((root / filename).exists())
+                self.assertEqual(gzip.decompress((root / f'{filename}.gz').read_bytes()),
+                                 (root / filename).read_bytes())
+        self.assertFalse((root / 'blog/draft').exists())
+        self.assertEqual(prerender.read_stamp()['etag'], get_content_version()['etag'])
+
+    def test_serves_the_file_without_queries(self):
+        prerender.render_all()
+        with self.assertNumQueries(0):
+            response = self.client.get('/blog/coping-with-exam-stress/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('s-maxage=300', response['Cache-Control'])
+
+    def test_stale_files_fall_through_and_re_render(self):
+        prerender.render_all()
+        with self.captureOnCommitCallbacks(execute=True):
+            Blog.objects.create(title='New post', excerpt='e', content='c')
+        self.schedule.reset_mock()
+        response = self.client.get('/blog/')
+        self.assertFalse(response.streaming)
+        self.assertContains(response, 'New post')
+        self.schedule.assert_called_once_with()
+        # Once per stale version, not once per request
+        self.client.get('/blog/')
+        self.schedule.assert_called_once_with()
+
+    def test_unpublished_post_is_removed(self):
+        prerender.render_all()
+        self.post.is_published = False
+        self.post.save()
+        prerender.render_all()
+        self.assertFalse((self.tmp / 'prerendered/blog/coping-with-exam-stress/index.html').exists())
+        self.assertEqual(self.client.get('/blog/coping-with-exam-stress/').status_code, 404)
+
+    def test_rendering_bypasses_the_files(self):
+        prerender.render_all()
+        request = prerender.internal_request('/')
+        self.assertTrue(request.is_secure())
+        self.assertIn(prerender.BYPASS_HEADER, request.META)
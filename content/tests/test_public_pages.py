@@ -0,0 +1,34 @@
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.test import override_settings
+
+from content.versioning import get_content_version
+
+from .base import ContentTestCase
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, PUBLIC_PAGE_S_MAXAGE=300)
+class PublicPageSessionTests(ContentTestCase):
+    def test_anonymous_page_is_shared_cacheable(self):
+        response = self.client.get('/services/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response['Cache-Control'].split(', ')), {'public', 'max-age=0', 's-maxage=300'})
+        self.assertFalse(response.cookies)
+
+    def test_signed_in_visitor_never_loads_the_session(self):
+        staff = User.objects.create_user('staff', password='pw', is_staff=True)
+        self.client.force_login(staff)
+        get_content_version()
+        # The only query is the page's own; no session or user lookup
+        with self.assertNumQueries(1):
+            response = self.client.get('/services/')
+        self.assertNotIn('sessionid', response.cookies)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertEqual(Session.objects.count(), 1)
+
+    def test_other_pages_keep_the_session(self):
+        staff = User.objects.create_user('staff', password='pw', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get('/admin/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('public', response.get('Cache-Control', ''))
@@ -0,0 +1,74 @@
+from datetime import date, datetime, time, timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+
+from content import reminders
+from content.models import BookingReminder, OutboundEmail
+
+from .base import ContentTestCase, make_booking
+
+
+def minutes_before(booking, minutes):
+    return reminders.appointment_at(booking) - timedelta(minutes=minutes)
+
+
+def queued():
+    return OutboundEmail.objects.filter(subject=reminders.REMINDER_SUBJECT)
+
+
+@override_settings(REMINDER_OFFSETS=[1440, 120], REMINDER_STATUSES=['pending', 'confirmed'])
+class TickTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.booking = make_booking()
+
+    def test_not_due_yet(self):
+        self.assertEqual(reminders.tick(minutes_before(self.booking, 1500)), 0)
+        self.assertFalse(BookingReminder.objects.exists())
+
+    def test_each_offset_is_sent_once(self):
+        self.assertEqual(reminders.tick(minutes_before(self.booking, 1430)), 1)
+        self.assertEqual(reminders.tick(minutes_before(self.booking, 1420)), 0)
+        self.assertEqual(reminders.tick(minutes_before(self.booking, 100)), 1)
+        self.assertEqual(
+            list(self.booking.reminders.order_by('offset_minutes').values_list('offset_minutes', 'skipped')),
+            [(120, False), (1440, False)],
+        )
+        self.assertEqual(list(queued().values_list('to', flat=True)), ['ann@example.com'] * 2)
+
+    def test_short_notice_sends_only_the_nearest(self):
+        self.assertEqual(reminders.tick(minutes_before(self.booking, 60)), 1)
+        self.assertEqual(
+            dict(self.booking.reminders.values_list('offset_minutes', 'skipped')),
+            {120: False, 1440: True},
+        )
+        self.assertEqual(queued().count(), 1)
+
+    def test_claimed_elsewhere(self):
+        BookingReminder.objects.create(booking=self.booking, offset_minutes=1440, claimed_by='other')
+        self.assertEqual(reminders.tick(minutes_before(self.booking, 1430)), 0)
+        self.assertFalse(queued().exists())
+
+    def test_cancelled_and_past_bookings_are_ignored(self):
+        self.booking.status = 'cancelled'
+        self.booking.save()
+        make_booking(preferred_date=date(2030, 1, 14), preferred_time=time(9, 0))
+        self.assertEqual(reminders.tick(minutes_before(self.booking, 60)), 0)
+
+    @override_settings(REMINDER_OFFSETS=[120])
+    def test_window_crosses_midnight(self):
+        late = make_booking(preferred_date=date(2030, 1, 16), preferred_time=time(0, 30))
+        now = timezone.make_aware(datetime(2030, 1, 15, 23, 0))
+        self.assertEqual(reminders.tick(now), 1)
+        self.assertEqual(BookingReminder.objects.get().booking, late)
+
+    @override_settings(REMINDER_OFFSETS=[])
+    def test_no_offsets(self):
+        self.assertEqual(reminders.tick(minutes_before(self.booking, 60)), 0)
+
+    def test_message(self):
+        to, subject, text, html = reminders.reminder_message(self.booking)
+        self.assertEqual((to, subject), ('ann@example.com', reminders.REMINDER_SUBJECT))
+        self.assertIn('Ann Wanjiru', text)
+        self.assertIn('Ann Wanjiru', html)
@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from content import bookings, rollups
+from content.models import ContactSubmission, RollupState, ServiceBooking, SubmissionRollup
+
+from .base import ContentTestCase, make_booking
+
+
+class RollupTests(ContentTestCase):
+    def test_analytics_series_by_day_and_dimension(self):
+        make_booking(session_mode='online')
+        make_booking(session_mode='in-person', service_type='training')
+        old = make_booking()
+        ServiceBooking.objects.filter(pk=old.pk).update(submitted_at=timezone.now() - timedelta(days=2))
+        ContactSubmission.objects.create(name='Ann', email='ann@example.com', subject='Hi', message='Hello')
+
+        data = rollups.analytics(7)
+        self.assertEqual(len(data['days']), 7)
+        self.assertEqual(data['bookings']['total'][-3:], [1, 0, 2])
+        self.assertEqual(data['bookings']['by_session_mode']['in-person'][-1], 1)
+        self.assertEqual(data['bookings']['by_service_type']['training'][-1], 1)
+        self.assertEqual(data['contacts'][-1], 1)
+
+    def test_analytics_is_cached(self):
+        rollups.analytics(7)
+        with self.assertNumQueries(0):
+            rollups.analytics(7)
+
+    def test_refresh_only_adds_new_rows(self):
+        make_booking()
+        rollups.refresh_all()
+        make_booking()
+        rollups.refresh('booking')
+        self.assertEqual(sum(SubmissionRollup.objects.filter(kind='booking').values_list('count', flat=True)), 2)
+        self.assertEqual(RollupState.objects.get(kind='booking').high_water_mark,
+                         ServiceBooking.objects.latest('submitted_at').submitted_at)
+
+    def test_status_transition_shifts_rollups(self):
+        first = make_booking()
+        make_booking()
+        rollups.refresh_all()
+        bookings.transition(ServiceBooking.objects.filter(pk=first.pk), 'confirmed', notify=False)
+        by_status = dict(SubmissionRollup.objects.filter(kind='booking').values_list('status', 'count'))
+        self.assertEqual(by_status, {'pending': 1, 'confirmed': 1})
+
+    def test_refresh_skipped_while_another_worker_refreshes(self):
+        cache.add(rollups.REFRESH_LOCK_KEY, 1)
+        self.assertFalse(rollups.refresh_all())
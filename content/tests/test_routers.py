@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from content import routers
+from content.decorators import replica_reads
+from content.middleware import ReplicaRoutingMiddleware
+from content.models import Blog, ServiceBooking
+
+
+@mock.patch.object(routers, 'replica_configured', return_value=True)
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    router = routers.PrimaryReplicaRouter()
+
+    def test_reads_use_the_replica_when_enabled(self, configured):
+        self.assertEqual(self.router.db_for_read(Blog), routers.PRIMARY)
+        with routers.replica_reads_enabled():
+            self.assertEqual(self.router.db_for_read(Blog), routers.REPLICA)
+
+    def test_sessions_and_users_stay_on_the_primary(self, configured):
+        with routers.replica_reads_enabled():
+            self.assertEqual(self.router.db_for_read(Session), routers.PRIMARY)
+            self.assertEqual(self.router.db_for_read(User), routers.PRIMARY)
+
+    def test_a_write_pins_reads_to_the_primary(self, configured):
+        with routers.replica_reads_enabled():
+            self.assertEqual(self.router.db_for_write(ServiceBooking), routers.PRIMARY)
+            self.assertEqual(self.router.db_for_read(ServiceBooking), routers.PRIMARY)
+
+    def test_primary_reads_block(self, configured):
+        with routers.replica_reads_enabled(), routers.primary_reads():
+            self.assertEqual(self.router.db_for_read(Blog), routers.PRIMARY)
+
+    def test_no_replica_configured(self, configured):
+        configured.return_value = False
+        with routers.replica_reads_enabled():
+            self.assertEqual(self.router.db_for_read(Blog), routers.PRIMARY)
+
+    def test_only_the_primary_is_migrated(self, configured):
+        self.assertTrue(self.router.allow_migrate(routers.PRIMARY, 'content'))
+        self.assertFalse(self.router.allow_migrate(routers.REPLICA, 'content'))
+
+
+@override_settings(REPLICA_PIN_COOKIE='db_pin', REPLICA_PIN_SECONDS=15)
+@mock.patch.object(routers, 'replica_configured', return_value=True)
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+    factory = RequestFactory()
+
+    def run_view(self, request, view):
+        seen = {}
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            seen['use_replica'] = routers.current_state().use_replica
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = middleware(request)
+        self.assertIsNone(routers.current_state())
+        return response, seen['use_replica']
+
+    def test_marked_views_read_from_the_replica(self, configured):
+        _, use_replica = self.run_view(self.factory.get('/'), replica_reads(lambda request: None))
+        self.assertTrue(use_replica)
+
+    def test_unmarked_views_do_not(self, configured):
+        _, use_replica = self.run_view(self.factory.get('/'), lambda request: None)
+        self.assertFalse(use_replica)
+
+    def test_unsafe_request_sets_the_pin_cookie(self, configured):
+        response, _ = self.run_view(self.factory.post('/api/contact/'), lambda request: None)
+        self.assertEqual(response.cookies['db_pin']['max-age'], 15)
+
+    def test_pinned_client_reads_from_the_primary(self, configured):
+        request = self.factory.get('/')
+        request.COOKIES['db_pin'] = '1'
+        _, use_replica = self.run_view(request, replica_reads(lambda request: None))
+        self.assertFalse(use_replica)
@@ -0,0 +1,84 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail as djmail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from content import digest, outbox, scheduler
+from content.models import AdminDigestItem, OutboundEmail
+
+from .base import ContentTestCase, make_booking
+
+
+@override_settings(ADMIN_NOTIFY_MODE='immediate')
+class SchedulerTickTests(ContentTestCase):
+    def test_queues_reminders_and_delivers_the_outbox(self):
+        soon = timezone.localtime() + timedelta(minutes=60)
+        make_booking(preferred_date=soon.date(), preferred_time=soon.time().replace(microsecond=0))
+        outbox.queue([('bob@example.com', 'Appointment Confirmed', 'Body')])
+        djmail.outbox = []
+
+        result = scheduler.tick()
+        self.assertEqual(result, {'reminders': 1, 'sent': 2, 'failed': 0, 'digested': 0, 'repaired': 0})
+        self.assertEqual(sorted(m.to[0] for m in djmail.outbox), ['ann@example.com', 'bob@example.com'])
+        self.assertFalse(outbox.pending().exists())
+
+    def test_no_deliver_only_queues(self):
+        outbox.queue([('bob@example.com', 'Subject', 'Body')])
+        self.assertEqual(scheduler.tick(deliver=False)['sent'], 0)
+        self.assertTrue(outbox.pending().exists())
+
+    def test_another_sender_is_left_alone(self):
+        outbox.queue([('bob@example.com', 'Subject', 'Body')])
+        cache.add(outbox.SEND_LOCK_KEY, 1)
+        self.assertEqual(scheduler.tick()['sent'], 0)
+        self.assertEqual(OutboundEmail.objects.get().attempts, 0)
+
+    @override_settings(ADMIN_NOTIFY_MODE='digest', ADMIN_DIGEST_WINDOW=60)
+    def test_sends_the_digest_once_the_window_passes(self):
+        item = AdminDigestItem.objects.create(kind='contact', subject='New message', body='Hi')
+        self.assertEqual(scheduler.tick()['digested'], 0)
+        AdminDigestItem.objects.filter(pk=item.pk).update(created_at=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(scheduler.tick()['digested'], 1)
+        self.assertFalse(digest.pending().exists())
+
+    def test_command_runs_one_tick(self):
+        outbox.queue([('bob@example.com', 'Subject', 'Body')])
+        with mock.patch('sys.stdout'):
+            call_command('run_scheduler', '--once')
+        self.assertFalse(outbox.pending().exists())
+
+
+class SupervisorTests(ContentTestCase):
+    def test_restarts_the_scheduler_until_stopped(self):
+        supervisor = scheduler.Supervisor()
+        finished = mock.Mock()
+        finished.wait.return_value = 1
+        finished.poll.return_value = 1
+        waits = []
+
+        def wait(seconds):
+            waits.append(seconds)
+            if len(waits) == 3:
+                supervisor._stopping.set()
+            return supervisor._stopping.is_set()
+
+        with mock.patch('content.scheduler.subprocess.Popen', return_value=finished) as popen, \
+                mock.patch.object(supervisor._stopping, 'wait', side_effect=wait), \
+                self.assertLogs('content.scheduler', 'ERROR'):
+            supervisor._loop()
+        self.assertEqual(popen.call_count, 3)
+        self.assertEqual(popen.call_args[0][0][-1], 'run_scheduler')
+        # Backs off while the scheduler keeps failing straight away
+        self.assertEqual(waits, [1, 2, 4])
+
+    def test_stop_terminates_the_child(self):
+        supervisor = scheduler.Supervisor()
+        supervisor._process = mock.Mock()
+        supervisor._process.poll.return_value = None
+        supervisor.stop()
+        supervisor._process.terminate.assert_called_once_with()
+        self.assertTrue(supervisor._stopping.is_set())
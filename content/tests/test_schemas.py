@@ -0,0 +1,115 @@
+import json
+from datetime import date, time
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from content import schemas
+from content.models import ServiceBooking
+
+from .base import ContentTestCase
+
+BOOKING = {
+    'fullName': ' Ann Wanjiru ',
+    'email': 'Ann@Example.com',
+    'phone': 712345678,
+    'serviceType': 'counselling',
+    'sessionMode': 'online',
+    'preferredDate': '2030-01-15',
+    'preferredTime': '2:30 PM',
+}
+
+
+class FieldTests(SimpleTestCase):
+    def convert(self, field, value):
+        return field.compile()(value)
+
+    def test_string_strips_and_limits(self):
+        self.assertEqual(self.convert(schemas.String('name', max_length=5), ' Ann '), 'Ann')
+        with self.assertRaisesMessage(schemas.FieldError, 'at most 5 characters'):
+            self.convert(schemas.String('name', max_length=5), 'Annabel')
+        with self.assertRaises(schemas.FieldError):
+            self.convert(schemas.String('name'), {'first': 'Ann'})
+
+    def test_email(self):
+        self.assertEqual(self.convert(schemas.Email('email'), ' ANN@example.com'), 'ann@example.com')
+        with self.assertRaisesMessage(schemas.FieldError, 'valid email'):
+            self.convert(schemas.Email('email'), 'ann@example')
+
+    def test_choice(self):
+        field = schemas.Choice('mode', ServiceBooking.SESSION_MODE_CHOICES)
+        self.assertEqual(self.convert(field, 'online'), 'online')
+        with self.assertRaisesMessage(schemas.FieldError, 'in-person, online, telephone'):
+            self.convert(field, 'carrier pigeon')
+
+    def test_date(self):
+        self.assertEqual(self.convert(schemas.Date('d'), '2030-01-15'), date(2030, 1, 15))
+        for value in ('2030-02-30', '15/01/2030', 20300115):
+            with self.subTest(value=value), self.assertRaises(schemas.FieldError):
+                self.convert(schemas.Date('d'), value)
+
+    def test_time(self):
+        for value, expected in (('14:30', time(14, 30)), ('2:30 pm', time(14, 30)),
+                                ('12:05 AM', time(0, 5)), ('09:15:20', time(9, 15, 20))):
+            with self.subTest(value=value):
+                self.assertEqual(self.convert(schemas.Time('t'), value), expected)
+        for value in ('25:00', '13:00 PM', 'noon'):
+            with self.subTest(value=value), self.assertRaises(schemas.FieldError):
+                self.convert(schemas.Time('t'), value)
+
+    def test_list(self):
+        field = schemas.List('attendees', max_items=2)
+        self.assertEqual(self.convert(field, [{}, {}]), [{}, {}])
+        for value in ([], [{}, {}, {}], ['Ann']):
+            with self.subTest(value=value), self.assertRaises(schemas.FieldError):
+                self.convert(field, value)
+
+    def test_field_needs_compile(self):
+        with self.assertRaises(TypeError):
+            schemas.Field('x')
+
+
+class SchemaTests(SimpleTestCase):
+    factory = RequestFactory()
+
+    def test_valid_booking_is_cleaned(self):
+        cleaned = schemas.BOOKING.validate(BOOKING)
+        self.assertEqual(cleaned['full_name'], 'Ann Wanjiru')
+        self.assertEqual(cleaned['email'], 'ann@example.com')
+        self.assertEqual(cleaned['phone'], '712345678')
+        self.assertEqual(cleaned['preferred_time'], time(14, 30))
+        self.assertEqual(cleaned['description'], '')
+
+    def test_every_problem_is_reported(self):
+        data = dict(BOOKING, email='nope', preferredDate='tomorrow', fullName='  ')
+        del data['phone']
+        with self.assertRaises(schemas.ValidationError) as caught:
+            schemas.BOOKING.validate(data)
+        self.assertEqual(set(caught.exception.errors), {'fullName', 'phone', 'email', 'preferredDate'})
+        self.assertTrue(caught.exception.message.startswith('Missing required fields: fullName, phone.'))
+
+    @override_settings(SUBMISSION_MAX_BODY_BYTES=100)
+    def test_oversized_body_is_refused(self):
+        request = self.factory.post('/', data=json.dumps({'email': 'a' * 200}), content_type='application/json')
+        with self.assertRaises(schemas.ValidationError) as caught:
+            schemas.NEWSLETTER.parse(request)
+        self.assertEqual(caught.exception.status, 413)
+
+    def test_invalid_json(self):
+        request = self.factory.post('/', data='{"email": ', content_type='application/json')
+        with self.assertRaisesMessage(schemas.ValidationError, 'Invalid form data'):
+            schemas.NEWSLETTER.parse(request)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class SubmitBookingTests(ContentTestCase):
+    def test_invalid_submission_never_reaches_the_database(self):
+        response = self.client.post('/api/submit-booking/', dict(BOOKING, serviceType='astrology'),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('serviceType', response.json()['errors'])
+        self.assertFalse(ServiceBooking.objects.exists())
+
+    def test_valid_submission_is_saved(self):
+        response = self.client.post('/api/submit-booking/', BOOKING, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ServiceBooking.objects.get().preferred_time, time(14, 30))
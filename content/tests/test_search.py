@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from content import search
+from content.models import Blog
+
+from .base import ContentTestCase
+
+
+def _blog(title, content='Plain text', excerpt='Short', **fields):
+    return Blog.objects.create(title=title, excerpt=excerpt, content=content, **fields)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, BLOG_SEARCH_PAGE_SIZE=2)
+class BlogSearchTests(ContentTestCase):
+    def test_title_matches_rank_first(self):
+        body = _blog('Healthy routines', content='Managing stress at work')
+        title = _blog('Stress and sleep')
+        ids, total = search.search_ids('stress')
+        self.assertEqual((ids, total), ([title.pk, body.pk], 2))
+
+    def test_last_word_is_a_prefix(self):
+        blog = _blog('Anxiety in teenagers')
+        self.assertEqual(search.search_ids('anxi')[0], [blog.pk])
+
+    def test_unpublished_posts_only_found_by_admin(self):
+        draft = _blog('Grief support', is_published=False)
+        self.assertEqual(search.search_ids('grief')[0], [])
+        self.assertEqual(search.search_ids('grief', published_only=False)[0], [draft.pk])
+
+    def test_index_follows_edits_and_deletes(self):
+        blog = _blog('Burnout')
+        blog.title = 'Resilience'
+        blog.save()
+        self.assertEqual(search.search_ids('burnout')[0], [])
+        self.assertEqual(search.search_ids('resilience')[0], [blog.pk])
+        blog.delete()
+        self.assertEqual(search.search_ids('resilience')[0], [])
+
+    def test_query_syntax_is_treated_as_words(self):
+        _blog('Parenting')
+        self.assertEqual(search.search_ids('parenting OR "NEAR( *')[1], 0)
+        self.assertEqual(search.search_ids('" * ^')[1], 0)
+
+    def test_api_pages_results(self):
+        for n in range(3):
+            _blog(f'Mindfulness {n}')
+        response = self.client.get('/api/blogs/search/', {'q': 'mindfulness', 'page': 2})
+        data = response.json()
+        self.assertEqual((data['total'], data['num_pages'], data['page']), (3, 2, 2))
+        self.assertEqual(len(data['results']), 1)
+
+    def test_api_results_link_to_the_post(self):
+        blog = _blog('Coping with loss')
+        [result] = self.client.get('/api/blogs/search/', {'q': 'loss'}).json()['results']
+        self.assertEqual((result['slug'], result['url']), (blog.slug, f'/blog/{blog.slug}/'))
+
+    def test_searches_the_database_the_router_reads_from(self):
+        blog = _blog('Stress')
+        with mock.patch.object(search.router, 'db_for_read', return_value='default') as db_for_read:
+            self.assertEqual(search.search_ids('stress')[0], [blog.pk])
+        db_for_read.assert_called_with(Blog)
+
+    def test_api_empty_query(self):
+        response = self.client.get('/api/blogs/search/', {'q': '  '})
+        self.assertEqual(response.json()['total'], 0)
@@ -0,0 +1,153 @@
+import time
+from unittest import mock
+
+from django.core import mail, signing
+from django.db import OperationalError
+from django.test import SimpleTestCase, override_settings
+
+from content import journal, spam
+from content.models import ContactSubmission, QuarantinedSubmission
+
+from .base import ContentTestCase
+
+
+def issued(seconds_ago):
+    return signing.dumps(int(time.time()) - seconds_ago, salt=spam.TOKEN_SALT)
+
+
+CONTACT = {'name': 'Ann', 'email': 'ann@example.com', 'subject': 'Hello', 'message': 'I would like a session.'}
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_membership(self):
+        bloom = spam.BloomFilter(100)
+        keys = [bytes.fromhex(spam.fingerprint(f'message {i}')) for i in range(100)]
+        for key in keys[:50]:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys[:50]))
+        self.assertLess(sum(key in bloom for key in keys[50:]), 5)
+
+    def test_fingerprint_ignores_case_and_punctuation(self):
+        self.assertEqual(spam.fingerprint('Buy NOW!!  cheap'), spam.fingerprint('buy now, cheap'))
+
+
+@override_settings(SPAM_MIN_FILL_SECONDS=3, SPAM_BURST_LIMIT=2)
+class CheckTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(spam, 'known_spam', spam.KnownSpam())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_honeypot(self):
+        self.assertEqual(spam.check(CONTACT, honeypot='http://spam', form_token=issued(60)), 'honeypot')
+
+    def test_token(self):
+        self.assertIsNone(spam.check(CONTACT))
+        self.assertEqual(spam.check(CONTACT, form_token='forged'), 'bad_token')
+        self.assertEqual(spam.check(CONTACT, form_token=issued(1)), 'too_fast')
+        self.assertIsNone(spam.check(CONTACT, form_token=issued(60)))
+
+    @override_settings(SPAM_FORM_TOKEN_MAX_AGE=30)
+    def test_expired_token_skips_only_the_timing_check(self):
+        self.assertIsNone(spam.check(CONTACT, form_token=issued(60)))
+
+    def test_known_spam(self):
+        QuarantinedSubmission.objects.create(
+            kind='contact', payload={}, reason='honeypot', status='spam',
+            fingerprint=spam.fingerprint('i would like a SESSION'),
+        )
+        self.assertEqual(spam.check(CONTACT, form_token=issued(60)), 'known_spam')
+
+    def test_missing_token_still_gets_the_burst_check(self):
+        for _ in range(2):
+            self.assertIsNone(spam.check(CONTACT))
+        self.assertEqual(spam.check(CONTACT), 'burst')
+
+    def test_burst(self):
+        token = issued(60)
+        self.assertIsNone(spam.check(CONTACT, form_token=token))
+        self.assertIsNone(spam.check(CONTACT, form_token=token))
+        self.assertEqual(spam.check(CONTACT, form_token=token), 'burst')
+        self.assertIsNone(spam.check(dict(CONTACT, email='bea@example.com'), form_token=token))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, SPAM_MIN_FILL_SECONDS=3)
+class PrefilterTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(spam, 'known_spam', spam.KnownSpam())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, url='/api/submit-contact/', **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, dict(CONTACT, **fields), content_type='application/json')
+
+    def test_clean_submission_is_saved(self):
+        response = self.post(formToken=issued(60))
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(ContactSubmission.objects.count(), 1)
+        self.assertFalse(QuarantinedSubmission.objects.exists())
+
+    def test_spam_gets_the_same_reply_and_no_writes(self):
+        clean = self.post(formToken=issued(60), email='bea@example.com').json()
+        mail.outbox.clear()
+        response = self.post(website='http://spam.example', formToken=issued(60))
+        self.assertEqual(response.json(), clean)
+        self.assertEqual(ContactSubmission.objects.count(), 1)
+        self.assertEqual(mail.outbox, [])
+        held = QuarantinedSubmission.objects.get()
+        self.assertEqual((held.reason, held.status, held.kind), ('honeypot', 'spam', 'contact'))
+        self.assertNotIn('honeypot', held.payload)
+        self.assertEqual(spam.stats()['quarantined'], 1)
+        self.assertEqual(spam.stats()['writes_avoided'], spam.WRITES_PER_SUBMISSION)
+
+    @override_settings(EMAIL_HOST_USER='site@example.com', EMAIL_HOST_PASSWORD='x', ADMIN_NOTIFY_MODE='immediate')
+    def test_body_the_site_sends_is_let_through(self):
+        # No formToken and no honeypot field, as the site's own pages post
+        for url, body in [
+            ('/api/submit-contact/', CONTACT),
+            ('/api/footer-contact/', {'name': 'Bea', 'email': 'bea@example.com', 'message': 'Call me'}),
+        ]:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(url, body, content_type='application/json',
+                                            HTTP_X_CSRFTOKEN='token')
+            self.assertTrue(response.json()['success'])
+        self.assertEqual(ContactSubmission.objects.count(), 2)
+        self.assertFalse(QuarantinedSubmission.objects.exists())
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_too_fast_is_held_not_spam(self):
+        self.post(url='/api/footer-contact/', formToken=issued(0))
+        held = QuarantinedSubmission.objects.get()
+        self.assertEqual((held.reason, held.status, held.kind), ('too_fast', 'held', 'footer_contact'))
+
+    def test_database_outage_is_journaled(self):
+        with mock.patch.object(journal.replayer, 'ensure_started'), \
+                mock.patch.object(QuarantinedSubmission.objects, 'create', side_effect=OperationalError('down')), \
+                mock.patch('content.views.save_with_retry', side_effect=OperationalError('down')):
+            response = self.post(website='http://spam.example')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(journal.depth(), 1)
+
+    @override_settings(SPAM_FILTER_ENABLED=False)
+    def test_disabled(self):
+        self.post(website='http://spam.example')
+        self.assertEqual(ContactSubmission.objects.count(), 1)
+
+    def test_release(self):
+        self.post(url='/api/footer-contact/', formToken=issued(0))
+        self.post(website='x', formToken=issued(60))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(spam.release(QuarantinedSubmission.objects.all()), 2)
+        self.assertEqual(
+            sorted(ContactSubmission.objects.values_list('subject', flat=True)),
+            ['Footer Quick Inquiry', 'Hello'],
+        )
+        self.assertEqual(spam.release(QuarantinedSubmission.objects.all()), 0)
+
+    def test_mark_spam_feeds_the_filter(self):
+        self.post(formToken=issued(0))
+        self.assertEqual(spam.mark_spam(QuarantinedSubmission.objects.all()), 1)
+        self.assertEqual(spam.check(CONTACT, form_token=issued(60)), 'known_spam')
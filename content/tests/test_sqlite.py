@@ -0,0 +1,67 @@
+import unittest
+from unittest import mock
+
+from django.db import OperationalError, connection
+from django.test import override_settings
+
+from content import sqlite
+from content.models import ContactSubmission
+
+from .base import ContentTestCase
+
+LOCKED = OperationalError('database is locked')
+
+
+def _contact():
+    return ContactSubmission(name='Ann', email='ann@example.com', subject='Hi', message='Hello')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite profile')
+class SqliteProfileTests(ContentTestCase):
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 4321, 'cache_size': -1000})
+    def test_pragmas_applied_to_new_connections(self):
+        sqlite.configure_connection(None, connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 4321)
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -1000)
+
+    @override_settings(SQLITE_PRAGMAS={}, SQLITE_IMMEDIATE_TRANSACTIONS=True)
+    def test_transactions_begin_immediate(self):
+        sqlite.configure_connection(None, connection)
+        self.assertEqual(connection._start_transaction_under_autocommit.__func__, sqlite._begin_immediate)
+
+
+@mock.patch('content.sqlite.time.sleep')
+class SaveWithRetryTests(ContentTestCase):
+    def test_retries_while_locked(self, sleep):
+        instance = _contact()
+        with mock.patch.object(instance, 'save', side_effect=[LOCKED, LOCKED, None]) as save:
+            sqlite.save_with_retry(instance, retries=3)
+        self.assertEqual(save.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_gives_up_after_retries(self, sleep):
+        instance = _contact()
+        with mock.patch.object(instance, 'save', side_effect=LOCKED):
+            with self.assertRaises(OperationalError):
+                sqlite.save_with_retry(instance, retries=2)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_other_errors_are_not_retried(self, sleep):
+        instance = _contact()
+        with mock.patch.object(instance, 'save', side_effect=OperationalError('no such table')):
+            with self.assertRaises(OperationalError):
+                sqlite.save_with_retry(instance)
+        sleep.assert_not_called()
+
+    def test_committed_insert_is_not_repeated(self, sleep):
+        instance = _contact()
+        instance.save()
+
+        # The insert committed but a later write in save() hit the lock
+        with mock.patch.object(instance, 'save', side_effect=LOCKED):
+            self.assertIs(sqlite.save_with_retry(instance), instance)
+        self.assertEqual(ContactSubmission.objects.count(), 1)
+        sleep.assert_not_called()
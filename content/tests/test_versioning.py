@@ -0,0 +1,45 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from content import versioning
+from content.models import Blog
+
+from .base import ContentTestCase
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ConditionalGetTests(ContentTestCase):
+    def test_page_carries_validators(self):
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        version = versioning.get_content_version()
+        self.assertEqual(response['ETag'], version['etag'])
+        self.assertIn('Last-Modified', response)
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.client.get('/services/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/services/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_content_edit_changes_the_etag(self):
+        etag = self.client.get('/blog/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Blog.objects.create(title='Sleep and stress', excerpt='e', content='c')
+        response = self.client.get('/blog/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, 'Sleep and stress')
+
+    def test_version_is_cached(self):
+        versioning.get_content_version()
+        with self.assertNumQueries(0):
+            versioning.get_content_version()
+
+    def test_unavailable_version_serves_the_page_without_validators(self):
+        with mock.patch.object(versioning, '_compute_version', side_effect=RuntimeError('db down')):
+            self.assertIsNone(versioning.get_content_version())
+            response = self.client.get('/services/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
@@ -0,0 +1,60 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+from content import journal, prerender, warmup
+
+from .base import ContentTestCase
+
+
+@override_settings(WARMUP_URLS=['/', '/services/'])
+class WarmupTests(ContentTestCase):
+    @override_settings(PRERENDER_ENABLED=True)
+    def test_prepare_renders_only_stale_pages(self):
+        steps = [step for step, _ in warmup.prepare()]
+        self.assertEqual(steps, ['shared cache', 'pre-render'])
+        self.assertIsNotNone(prerender.read_stamp())
+        with mock.patch.object(prerender, 'render_all') as render_all:
+            warmup.prepare()
+        render_all.assert_not_called()
+
+    @override_settings(PRERENDER_ENABLED=True)
+    def test_prepare_survives_a_failed_render(self):
+        with mock.patch.object(prerender, 'render_all', side_effect=RuntimeError('disk full')), \
+                self.assertLogs('content.warmup', 'ERROR'):
+            warmup.prepare()
+
+    def test_compile_templates(self):
+        self.assertGreater(warmup.compile_templates(), 0)
+
+    def test_request_urls_run_the_views(self):
+        results = warmup.request_urls()
+        self.assertEqual([(url, status) for url, status, _ in results], [('/', 200), ('/services/', 200)])
+
+    def test_warm_worker(self):
+        steps = [step for step, _ in warmup.warm_worker()]
+        self.assertEqual(steps, ['database connections', 'templates', 'GET /', 'GET /services/'])
+
+    def test_warm_worker_resumes_the_journal_replay(self):
+        journal.append('newsletter', {'email': 'ann@example.com'})
+        with mock.patch.object(journal.replayer, 'ensure_started') as ensure_started:
+            warmup.warm_worker()
+        ensure_started.assert_called_once_with()
+
+    @override_settings(WARMUP_URLS=['/', '/no-such-page/'])
+    def test_any_other_status_fails(self):
+        with self.assertRaisesMessage(warmup.WarmupError, '/no-such-page/ returned 404'):
+            warmup.warm_worker()
+
+    def test_command(self):
+        out = StringIO()
+        call_command('warm_up', '--no-prepare', stdout=out)
+        self.assertIn('GET /services/', out.getvalue())
+        self.assertIn('Worker warm-up took', out.getvalue())
+
+    @override_settings(WARMUP_URLS=['/no-such-page/'])
+    def test_command_fails(self):
+        with self.assertRaisesMessage(CommandError, 'Warm-up failed'):
+            call_command('warm_up', '--no-prepare', stdout=StringIO())
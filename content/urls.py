@@ -4,10 +4,24 @@ from . import views
 urlpatterns = [
     # Homepage
     path('', views.index, name='index'),
+    path('services/', views.services_list, name='services_list'),
+    path('blog/', views.blog_list, name='blog_list'),
+    path('blog/<slug:slug>/', views.blog_detail, name='blog_detail'),
+
+    # Staff dashboard
+    path('dashboard/', views.admin_dashboard, name='admin_dashboard'),
+    path('api/analytics/bookings/', views.booking_analytics, name='booking_analytics'),
 
     # API endpoints
     path('api/submit-booking/', views.submit_booking, name='submit_booking'),
+    path('api/group-registration/', views.submit_group_registration, name='submit_group_registration'),
     path('api/submit-contact/', views.submit_contact, name='submit_contact'),
     path('api/subscribe-newsletter/', views.subscribe_newsletter, name='subscribe_newsletter'),
     path('api/footer-contact/', views.footer_contact, name='footer_contact'),  # ✅ new route
+    path('api/csrf/', views.csrf_token, name='csrf_token'),
+    path('api/blogs/search/', views.blog_search, name='blog_search'),
+
+    # Health probes
+    path('health/live', views.health_live, name='health_live'),
+    path('health/ready', views.health_ready, name='health_ready'),
 ]
@@ -0,0 +1,72 @@
+"""
+Cheap content version for conditional GET on the public pages.
+
+The version is kept in the cache and replaced by signals whenever public
+content changes, so answering If-None-Match/If-Modified-Since costs one
+cache read and no queries or rendering.
+"""
+
+import hashlib
+import logging
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CONTENT_VERSION_KEY = 'content:version'
+
+
+def _make_version(last_modified, salt=''):
+    digest = hashlib.md5(f'{last_modified.isoformat()}:{salt}'.encode()).hexdigest()[:16]
+    return {'last_modified': last_modified, 'etag': f'"{digest}"'}
+
+
+def _compute_version():
+    from .models import Blog, Service
+    from .routers import primary_reads
+
+    # Read from the primary so a lagging replica can't cache an old version
+    with primary_reads():
+        blogs = Blog.objects.aggregate(ts=Max('updated_at'), n=Count('id'))
+        services = Service.objects.aggregate(ts=Max('updated_at'), n=Count('id'))
+    stamps = [ts for ts in (blogs['ts'], services['ts']) if ts is not None]
+    last_modified = max(stamps) if stamps else timezone.now()
+    # Row counts catch deletions that leave the max timestamp unchanged
+    return _make_version(last_modified, f"{blogs['n']}:{services['n']}")
+
+
+def get_content_version():
+    """Return {'last_modified', 'etag'} for public content, or None if unavailable"""
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        try:
+            version = _compute_version()
+        except Exception as e:
+            logger.warning("Could not compute content version: %s", e)
+            return None
+        cache.add(CONTENT_VERSION_KEY, version, None)
+    return version
+
+
+def bump_content_version():
+    """Mark public content as changed; called from signals"""
+    cache.set(CONTENT_VERSION_KEY, _make_version(timezone.now()), None)
+
+
+def _request_version(request):
+    # condition() asks for the ETag and Last-Modified separately
+    if not hasattr(request, '_content_version'):
+        request._content_version = get_content_version()
+    return request._content_version
+
+
+def content_etag(request, *args, **kwargs):
+    version = _request_version(request)
+    return version['etag'] if version else None
+
+
+def content_last_modified(request, *args, **kwargs):
+    version = _request_version(request)
+    return version['last_modified'] if version else None
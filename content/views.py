@@ -1,21 +1,34 @@
 from django.shortcuts import render, get_object_or_404
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_POST, require_GET
-from django.contrib import messages
-import json
+from django.views.decorators.http import require_POST, require_GET, condition
+from django.views.decorators.cache import cache_control
+from django.middleware.csrf import get_token
+from django.contrib.admin.views.decorators import staff_member_required
 from django.core.mail import send_mail
 from django.conf import settings
 from .models import ServiceBooking, ContactSubmission, NewsletterSubscriber, Blog, Service
+from . import bookings, counters, delivery, health, journal, rollups, schemas, search, spam
+from .versioning import content_etag, content_last_modified
+from .decorators import public_page, replica_reads
+from .schemas import validate_json
+from .spam import spam_prefilter
+from .sqlite import save_with_retry
+from collections import Counter
 from datetime import datetime
 import logging
-import traceback
 
 logger = logging.getLogger(__name__)
 
 # ======================
 # PAGE VIEWS
 # ======================
+# Public pages answer conditional GETs from the cached content version
+# (see versioning.py) before any query or template rendering, and never
+# touch the session so they can be cached at a CDN.
+@replica_reads
+@public_page
+@condition(etag_func=content_etag, last_modified_func=content_last_modified)
 def index(request):
     """Home page view"""
     try:
@@ -28,158 +41,193 @@ def index(request):
         }
         return render(request, 'index.html', context)
     except Exception as e:
-        logger.error(f"Error loading index page: {str(e)}")
+        logger.error("Error loading index page: %s", e)
         return render(request, 'index.html', {'services': [], 'blogs': []})
 
+@replica_reads
+@public_page
+@condition(etag_func=content_etag, last_modified_func=content_last_modified)
 def blog_list(request):
     """Blog listing page"""
     try:
         blogs = Blog.objects.filter(is_published=True).order_by('-created_at')
         return render(request, 'blog_list.html', {'blogs': blogs})
     except Exception as e:
-        logger.error(f"Error loading blog list: {str(e)}")
+        logger.error("Error loading blog list: %s", e)
         return render(request, 'blog_list.html', {'blogs': []})
 
+@replica_reads
+@public_page
+@condition(etag_func=content_etag, last_modified_func=content_last_modified)
 def blog_detail(request, slug):
     """Blog detail page"""
-    try:
-        blog = get_object_or_404(Blog, slug=slug, is_published=True)
-        return render(request, 'blog_detail.html', {'blog': blog})
-    except Exception as e:
-        logger.error(f"Error loading blog detail {slug}: {str(e)}")
-        messages.error(request, "Blog post not found.")
-        return render(request, 'blog_detail.html', {'blog': None})
+    # Unknown slugs are a plain 404: a flash message would set a cookie on a public page
+    blog = get_object_or_404(Blog, slug=slug, is_published=True)
+    return render(request, 'blog_detail.html', {'blog': blog})
 
+@replica_reads
+@public_page
+@condition(etag_func=content_etag, last_modified_func=content_last_modified)
 def services_list(request):
     """Services listing page"""
     try:
         services = Service.objects.filter(is_active=True)
         return render(request, 'services_list.html', {'services': services})
     except Exception as e:
-        logger.error(f"Error loading services list: {str(e)}")
+        logger.error("Error loading services list: %s", e)
         return render(request, 'services_list.html', {'services': []})
 
+# ======================
+# ADMIN DASHBOARD
+# ======================
+@replica_reads
+@staff_member_required
+def admin_dashboard(request):
+    """Staff dashboard; all headline numbers come from one counters query"""
+    totals = counters.get_counters()
+    context = {
+        'total_contacts': totals['contacts_total'],
+        'total_bookings': totals['bookings_total'],
+        'total_subscribers': totals['subscribers_total'],
+        'total_blogs': totals['blogs_total'],
+        'total_services': totals['services_total'],
+        'counters': totals,
+        'service_bookings': ServiceBooking.objects.order_by('-submitted_at')[:50],
+        'contact_submissions': ContactSubmission.objects.order_by('-submitted_at')[:50],
+        'mail_breaker': delivery.smtp_breaker.stats(),
+        'spam': spam.stats(),
+        'journal_depth': journal.depth(),
+    }
+    return render(request, 'admin_dashboard.html', context)
+
+@replica_reads
+@staff_member_required
+@require_GET
+def booking_analytics(request):
+    """Per-day booking and contact series from the rollup table"""
+    try:
+        days = min(max(int(request.GET.get('days', 30)), 1), 366)
+    except ValueError:
+        days = 30
+    return JsonResponse(rollups.analytics(days))
+
+# ======================
+# BLOG SEARCH
+# ======================
+@replica_reads
+@public_page
+@require_GET
+def blog_search(request):
+    """Ranked, paginated full-text search over published blog posts"""
+    query = request.GET.get('q', '').strip()[:200]
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+
+    if not query:
+        return JsonResponse({'query': '', 'page': 1, 'num_pages': 1, 'total': 0, 'results': []})
+    try:
+        return JsonResponse(search.search_page(query, page))
+    except Exception as e:
+        logger.exception("Blog search failed for %r: %s", query, e)
+        return JsonResponse({'success': False, 'message': 'Search is temporarily unavailable.'}, status=500)
+
 # ======================
 # SERVICE BOOKING
 # ======================
+# Request bodies are size-checked, decoded and validated by the schemas in
+# schemas.py; invalid submissions never reach these functions.
+# Writes that hit an unavailable database are journaled (journal.py) and
+# acknowledged with 202 and the usual message instead of failing.
+BOOKING_SENT = 'Booking submitted successfully! We will contact you soon to confirm your appointment.'
+NEWSLETTER_SENT = 'Thank you for subscribing! Welcome to our newsletter community.'
+
 @csrf_exempt
 @require_POST
-def submit_booking(request):
+@validate_json(schemas.BOOKING)
+def submit_booking(request, data):
     """Handle service booking form submissions"""
+    logger.info("Booking submission received: %s", data['email'])
     try:
-        # Parse JSON data
-        data = json.loads(request.body.decode('utf-8'))
-        logger.info(f"Booking submission received: {data.get('email', 'No email')}")
-        
-        # Validate required fields
-        required_fields = ['fullName', 'email', 'phone', 'serviceType', 'sessionMode', 'preferredDate', 'preferredTime']
-        missing_fields = [field for field in required_fields if not data.get(field)]
-        
-        if missing_fields:
-            logger.warning(f"Missing fields in booking: {missing_fields}")
-            return JsonResponse({
-                'success': False, 
-                'message': f'Missing required fields: {", ".join(missing_fields)}'
-            }, status=400)
-
-        # Validate and convert date
-        try:
-            date_obj = datetime.strptime(data.get('preferredDate'), '%Y-%m-%d').date()
-        except ValueError as e:
-            logger.warning(f"Invalid date format in booking: {data.get('preferredDate')}")
-            return JsonResponse({
-                'success': False, 
-                'message': 'Invalid date format. Please use YYYY-MM-DD.'
-            }, status=400)
-
-        # Validate and convert time
-        try:
-            time_str = data.get('preferredTime')
-            if 'AM' in time_str.upper() or 'PM' in time_str.upper():
-                time_obj = datetime.strptime(time_str, '%I:%M %p').time()
-            else:
-                time_obj = datetime.strptime(time_str, '%H:%M').time()
-        except ValueError as e:
-            logger.warning(f"Invalid time format in booking: {time_str}")
-            return JsonResponse({
-                'success': False, 
-                'message': 'Invalid time format. Please use HH:MM or HH:MM AM/PM.'
-            }, status=400)
-
-        # Create booking record
-        booking = ServiceBooking.objects.create(
-            full_name=data.get('fullName').strip(),
-            email=data.get('email').strip().lower(),
-            phone=data.get('phone').strip(),
-            service_type=data.get('serviceType'),
-            session_mode=data.get('sessionMode'),
-            preferred_date=date_obj,
-            preferred_time=time_obj,
-            description=data.get('description', '').strip()
-        )
+        booking = save_with_retry(ServiceBooking(**data))
 
-        logger.info(f"Booking created successfully for: {booking.email}")
+        logger.info("Booking created successfully for: %s", booking.email)
         return JsonResponse({
             'success': True, 
-            'message': 'Booking submitted successfully! We will contact you soon to confirm your appointment.'
+            'message': BOOKING_SENT
         })
 
-    except json.JSONDecodeError as e:
-        logger.error(f"JSON decode error in booking: {str(e)}")
+    except journal.DB_UNAVAILABLE:
+        return journal.accept('booking', data, BOOKING_SENT)
+    except Exception as e:
+        logger.exception("Unexpected error in booking submission: %s", e)
         return JsonResponse({
             'success': False, 
-            'message': 'Invalid form data. Please try again.'
-        }, status=400)
+            'message': 'An unexpected error occurred. Please try again or contact us directly.'
+        }, status=500)
+
+# ======================
+# GROUP REGISTRATION
+# ======================
+@csrf_exempt
+@require_POST
+@validate_json(schemas.GROUP_REGISTRATION)
+def submit_group_registration(request, data):
+    """Book training for an organization's whole roster in one request"""
+    logger.info("Group registration received: %s, %s attendees", data['organization'], len(data['attendees']))
+    try:
+        results = bookings.register_group(data)
     except Exception as e:
-        logger.error(f"Unexpected error in booking submission: {str(e)}\n{traceback.format_exc()}")
+        logger.exception("Unexpected error in group registration: %s", e)
         return JsonResponse({
-            'success': False, 
+            'success': False,
             'message': 'An unexpected error occurred. Please try again or contact us directly.'
         }, status=500)
 
+    tally = Counter(result['status'] for result in results)
+    message = f"{tally['created']} attendee{'s' if tally['created'] != 1 else ''} registered."
+    if tally['duplicate']:
+        message += f" {tally['duplicate']} duplicate{'s' if tally['duplicate'] != 1 else ''} skipped."
+    if tally['invalid']:
+        message += f" {tally['invalid']} row{'s need' if tally['invalid'] != 1 else ' needs'} correcting."
+    return JsonResponse({
+        'success': not tally['invalid'],
+        'message': message,
+        'created': tally['created'],
+        'duplicates': tally['duplicate'],
+        'invalid': tally['invalid'],
+        'results': results,
+    }, status=200 if tally['created'] or not tally['invalid'] else 400)
+
 # ======================
 # CONTACT FORM
 # ======================
+# Both contact endpoints pass through the spam prefilter (spam.py), which
+# answers quarantined submissions with the same success message.
+CONTACT_SENT = 'Message sent successfully! We will get back to you within 24 hours.'
+FOOTER_CONTACT_SENT = 'Thank you for reaching out! We\'ll get back to you within 24 hours.'
+
 @csrf_exempt
 @require_POST
-def submit_contact(request):
+@validate_json(schemas.CONTACT)
+@spam_prefilter('contact', CONTACT_SENT)
+def submit_contact(request, data):
     """Handle main contact form submissions"""
+    logger.info("Contact form submission from: %s", data['email'])
     try:
-        data = json.loads(request.body.decode('utf-8'))
-        logger.info(f"Contact form submission from: {data.get('email', 'No email')}")
-        
-        required_fields = ['name', 'email', 'subject', 'message']
-        missing_fields = [field for field in required_fields if not data.get(field)]
-        
-        if missing_fields:
-            logger.warning(f"Missing fields in contact form: {missing_fields}")
-            return JsonResponse({
-                'success': False, 
-                'message': f'Please fill in all required fields: {", ".join(missing_fields)}'
-            }, status=400)
+        contact = save_with_retry(ContactSubmission(**data))
 
-        # Create contact submission
-        contact = ContactSubmission.objects.create(
-            name=data.get('name').strip(),
-            email=data.get('email').strip().lower(),
-            subject=data.get('subject').strip(),
-            message=data.get('message').strip()
-        )
-
-        logger.info(f"Contact form submitted successfully by: {contact.email}")
+        logger.info("Contact form submitted successfully by: %s", contact.email)
         return JsonResponse({
             'success': True, 
-            'message': 'Message sent successfully! We will get back to you within 24 hours.'
+            'message': CONTACT_SENT
         })
 
-    except json.JSONDecodeError as e:
-        logger.error(f"JSON decode error in contact form: {str(e)}")
-        return JsonResponse({
-            'success': False, 
-            'message': 'Invalid form data. Please try again.'
-        }, status=400)
+    except journal.DB_UNAVAILABLE:
+        return journal.accept('contact', data, CONTACT_SENT)
     except Exception as e:
-        logger.error(f"Unexpected error in contact form: {str(e)}\n{traceback.format_exc()}")
+        logger.exception("Unexpected error in contact form: %s", e)
         return JsonResponse({
             'success': False, 
             'message': 'An error occurred while sending your message. Please try again.'
@@ -190,45 +238,24 @@ def submit_contact(request):
 # ======================
 @csrf_exempt
 @require_POST
-def footer_contact(request):
+@validate_json(schemas.FOOTER_CONTACT)
+@spam_prefilter('footer_contact', FOOTER_CONTACT_SENT)
+def footer_contact(request, data):
     """Handle quick contact form in footer"""
+    logger.info("Footer contact submission from: %s", data['email'])
     try:
-        data = json.loads(request.body.decode('utf-8'))
-        logger.info(f"Footer contact submission from: {data.get('email', 'No email')}")
-
-        name = data.get('name', '').strip()
-        email = data.get('email', '').strip().lower()
-        message = data.get('message', '').strip()
-
-        if not name or not email or not message:
-            logger.warning("Missing fields in footer contact form")
-            return JsonResponse({
-                'success': False,
-                'message': 'Please fill in all required fields: name, email, and message.'
-            }, status=400)
+        contact = save_with_retry(ContactSubmission(subject="Footer Quick Inquiry", **data))
 
-        # Save to database
-        contact = ContactSubmission.objects.create(
-            name=name,
-            email=email,
-            subject="Footer Quick Inquiry",
-            message=message
-        )
-
-        logger.info(f"Footer contact submitted successfully by: {contact.email}")
+        logger.info("Footer contact submitted successfully by: %s", contact.email)
         return JsonResponse({
             'success': True,
-            'message': 'Thank you for reaching out! We\'ll get back to you within 24 hours.'
+            'message': FOOTER_CONTACT_SENT
         })
 
-    except json.JSONDecodeError as e:
-        logger.error(f"JSON decode error in footer contact: {str(e)}")
-        return JsonResponse({
-            'success': False,
-            'message': 'Invalid form data. Please try again.'
-        }, status=400)
+    except journal.DB_UNAVAILABLE:
+        return journal.accept('footer_contact', data, FOOTER_CONTACT_SENT)
     except Exception as e:
-        logger.error(f"Unexpected error in footer contact: {str(e)}\n{traceback.format_exc()}")
+        logger.exception("Unexpected error in footer contact: %s", e)
         return JsonResponse({
             'success': False,
             'message': 'An error occurred while submitting your message. Please try again.'
@@ -239,25 +266,11 @@ def footer_contact(request):
 # ======================
 @csrf_exempt
 @require_POST
-def subscribe_newsletter(request):
+@validate_json(schemas.NEWSLETTER)
+def subscribe_newsletter(request, data):
     """Handle newsletter subscriptions"""
+    email = data['email']
     try:
-        data = json.loads(request.body.decode('utf-8'))
-        email = data.get('email', '').strip().lower()
-        
-        if not email:
-            return JsonResponse({
-                'success': False, 
-                'message': 'Please enter your email address.'
-            }, status=400)
-
-        # Validate email format
-        if '@' not in email or '.' not in email:
-            return JsonResponse({
-                'success': False, 
-                'message': 'Please enter a valid email address.'
-            }, status=400)
-
         # Check if already subscribed
         if NewsletterSubscriber.objects.filter(email=email).exists():
             return JsonResponse({
@@ -266,27 +279,32 @@ def subscribe_newsletter(request):
             }, status=400)
 
         # Create subscription - this will automatically send welcome emails via save method
-        subscriber = NewsletterSubscriber.objects.create(email=email)
+        subscriber = save_with_retry(NewsletterSubscriber(email=email))
 
-        logger.info(f"New newsletter subscriber: {email}")
+        logger.info("New newsletter subscriber: %s", email)
         return JsonResponse({
             'success': True, 
-            'message': 'Thank you for subscribing! Welcome to our newsletter community.'
+            'message': NEWSLETTER_SENT
         })
 
-    except json.JSONDecodeError as e:
-        logger.error(f"JSON decode error in newsletter: {str(e)}")
-        return JsonResponse({
-            'success': False, 
-            'message': 'Invalid data. Please try again.'
-        }, status=400)
+    except journal.DB_UNAVAILABLE:
+        return journal.accept('newsletter', data, NEWSLETTER_SENT)
     except Exception as e:
-        logger.error(f"Unexpected error in newsletter subscription: {str(e)}\n{traceback.format_exc()}")
+        logger.exception("Unexpected error in newsletter subscription: %s", e)
         return JsonResponse({
             'success': False, 
             'message': 'An error occurred. Please try again.'
         }, status=500)
 
+# ======================
+# CSRF TOKEN
+# ======================
+@require_GET
+@cache_control(private=True, max_age=3600)
+def csrf_token(request):
+    """Hand out a CSRF token (and cookie) so public pages don't have to, plus the spam form token"""
+    return JsonResponse({'csrfToken': get_token(request), 'formToken': spam.form_token()})
+
 # ======================
 # HEALTH CHECK & UTILITY
 # ======================
@@ -299,6 +317,19 @@ def health_check(request):
         'timestamp': datetime.now().isoformat()
     })
 
+@require_GET
+def health_live(request):
+    """Liveness probe: the process is up and serving requests"""
+    return JsonResponse({'status': 'alive'})
+
+@require_GET
+def health_ready(request):
+    """Readiness probe served from the background monitor's last result"""
+    payload, status = health.monitor.snapshot()
+    response = JsonResponse(payload, status=status)
+    response['Cache-Control'] = 'no-store'
+    return response
+
 @csrf_exempt
 @require_GET
 def test_email(request):
@@ -328,7 +359,7 @@ def test_email(request):
             'message': 'Test emails sent successfully! Check your inbox.'
         })
     except Exception as e:
-        logger.error(f"Test email failed: {str(e)}")
+        logger.error("Test email failed: %s", e)
         return JsonResponse({
             'success': False, 
             'message': f'Test email failed: {str(e)}'
@@ -0,0 +1,132 @@
+"""
+Deploy-time warm-up, so the first visitors after a deploy don't pay for
+cold workers.
+
+``prepare`` runs once per deploy (gunicorn's ``on_starting`` hook, see
+gunicorn.conf.py): it fills the shared cache with the content version and
+website content, and pre-renders the public pages if they are stale.
+
+``warm_worker`` runs in every worker before it accepts connections
+(``post_worker_init``): it opens a connection to each database, compiles
+every project template and the email templates, and sends WARMUP_URLS
+through the full middleware stack, timing each one. If submissions were
+journaled during an outage it starts the background replay.
+
+Both return ``[(step, seconds)]`` so callers can report where the time went.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.db import connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+from django.template.loader import get_template
+
+from . import journal, mail, prerender
+from .content_store import get_website_content
+from .versioning import get_content_version
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def _timed(timings, step):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.append((step, time.perf_counter() - started))
+
+
+def _prerender_stale():
+    version = get_content_version()
+    stamp = prerender.read_stamp()
+    return version is not None and (stamp is None or stamp['etag'] != version['etag'])
+
+
+def prepare():
+    """Once per deploy: prime the shared cache and pre-render stale pages"""
+    timings = []
+    with _timed(timings, 'shared cache'):
+        get_content_version()
+        get_website_content()
+    if settings.PRERENDER_ENABLED:
+        with _timed(timings, 'pre-render'):
+            try:
+                if _prerender_stale():
+                    prerender.render_all()
+            except Exception as e:
+                # The views render the pages until the next content edit re-renders them
+                logger.error("Warm-up pre-render failed: %s", e)
+    return timings
+
+
+def open_connections():
+    for alias in settings.DATABASES:
+        # Kept open: CONN_MAX_AGE lets the first request reuse it
+        connections[alias].ensure_connection()
+
+
+def compile_templates():
+    """Load every template under TEMPLATES DIRS into the cached loader; returns how many"""
+    compiled = 0
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for path in sorted(directory.rglob('*.html')):
+            name = path.relative_to(directory).as_posix()
+            try:
+                get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError) as e:
+                logger.warning("Warm-up could not compile %s: %s", name, e)
+                continue
+            compiled += 1
+    mail.get_email(next(iter(mail.EMAILS)))
+    return compiled
+
+
+def request_urls(handler=None):
+    """Send WARMUP_URLS through the middleware stack; returns [(url, status, seconds)]"""
+    if handler is None:
+        handler = BaseHandler()
+        handler.load_middleware()
+    results = []
+    for url in settings.WARMUP_URLS:
+        # Over HTTPS and past the pre-rendered copy, so the view, its queries and templates run
+        request = prerender.internal_request(url)
+        started = time.perf_counter()
+        response = handler.get_response(request)
+        results.append((url, response.status_code, time.perf_counter() - started))
+    return results
+
+
+class WarmupError(Exception):
+    pass
+
+
+def warm_worker():
+    """
+    Per process: connections, compiled templates and one pass over
+    WARMUP_URLS. Raises WarmupError if any URL doesn't answer 200, since a
+    redirect or error page warms nothing.
+    """
+    timings = []
+    with _timed(timings, 'database connections'):
+        open_connections()
+    with _timed(timings, 'templates'):
+        compile_templates()
+    if journal.depth():
+        journal.replayer.ensure_started()
+    failed = []
+    for url, status, seconds in request_urls():
+        timings.append((f'GET {url}', seconds))
+        if status != 200:
+            failed.append(f'{url} returned {status}')
+    if failed:
+        raise WarmupError(f"{', '.join(failed)} ({report(timings)})")
+    return timings
+
+
+def report(timings):
+    return ', '.join(f'{step} {seconds * 1000:.0f}ms' for step, seconds in timings)
@@ -0,0 +1,85 @@
+"""
+Gunicorn settings for the Docker/Railway deploy.
+
+The app is imported once in the master (preload_app), so the settings-time
+database probe runs once per deploy rather than once per worker. Threads
+started by that import don't survive the fork: ``post_fork`` restarts the
+log listener, ``post_worker_init`` starts the health monitor with one check
+run done (so a new worker's readiness probe isn't a 503), and the journal
+replayer restarts itself by pid. Warm-up then runs in two phases
+(content/warmup.py): ``on_starting`` primes the shared cache and
+pre-renders the public pages, and ``post_worker_init`` warms each worker
+before it accepts connections.
+
+With SCHEDULER_IN_WEB on, ``when_ready`` also starts ``manage.py
+run_scheduler`` (content/scheduler.py) as a supervised child of the master,
+so reminders, queued emails and the admin digest go out without a separate
+service; ``on_exit`` stops it. Run one web service with it on, or set it
+off everywhere and deploy ``python manage.py run_scheduler`` on its own.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+preload_app = True
+
+_scheduler = None
+
+
+def on_starting(server):
+    from django.conf import settings
+    from django.db import connections
+
+    if settings.WARMUP_ENABLED:
+        from content import warmup
+
+        try:
+            server.log.info("Warm-up (once per deploy): %s", warmup.report(warmup.prepare()))
+        except Exception:
+            server.log.exception("Deploy warm-up failed")
+    # Workers are forked from here and must not share the master's sockets
+    connections.close_all()
+
+
+def when_ready(server):
+    global _scheduler
+    from django.conf import settings
+
+    if settings.SCHEDULER_IN_WEB:
+        from content.scheduler import Supervisor
+
+        _scheduler = Supervisor(log=server.log)
+        _scheduler.start()
+        server.log.info("Scheduler started (SCHEDULER_IN_WEB)")
+
+
+def on_exit(server):
+    if _scheduler is not None:
+        _scheduler.stop()
+
+
+def post_fork(server, worker):
+    import logging
+
+    # The master's log listener thread doesn't survive the fork (mwasa/log.py)
+    for handler in logging.getLogger().handlers:
+        if hasattr(handler, 'ensure_started'):
+            handler.ensure_started()
+
+
+def post_worker_init(worker):
+    from django.conf import settings
+
+    from content.health import monitor
+
+    monitor.ensure_started(check_first=True)
+    if not settings.WARMUP_ENABLED:
+        return
+    from content import warmup
+
+    try:
+        worker.log.info("Worker %s warm-up: %s", worker.pid, warmup.report(warmup.warm_worker()))
+    except Exception:
+        # A cold worker is better than one that never boots
+        worker.log.exception("Worker warm-up failed")
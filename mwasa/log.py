@@ -0,0 +1,180 @@
+"""
+Structured, non-blocking logging for the mwasa project.
+
+Request threads only enqueue log records. A single listener thread formats
+them as JSON, redacts client contact details and writes them out, so slow
+stdout/stderr never holds up a request.
+"""
+
+import atexit
+import copy
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+from datetime import datetime, timezone
+
+EMAIL_RE = re.compile(r'([\w.+-]+)@([\w-]+(?:\.[\w-]+)+)')
+PHONE_RE = re.compile(r'(?<![\w:])\+?\d[\d\s().-]{7,}\d(?![\w:])')
+DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+def _mask_phone(match):
+    text = match.group(0)
+    digits = [c for c in text if c.isdigit()]
+    # Dates, timestamps and short numbers are not phone numbers
+    if len(digits) < 9 or DATE_RE.search(text):
+        return text
+    return '***' + ''.join(digits[-3:])
+
+
+def redact(text):
+    """Mask email addresses and phone numbers in a log line"""
+    if not text:
+        return text
+    text = EMAIL_RE.sub(r'***@\2', text)
+    return PHONE_RE.sub(_mask_phone, text)
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def __init__(self, redact_pii=True, **kwargs):
+        super().__init__(**kwargs)
+        self.redact_pii = redact_pii
+
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'sample_rate', 1) > 1:
+            payload['sample_rate'] = record.sample_rate
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc_info'] = record.exc_text
+        if record.stack_info:
+            payload['stack_info'] = self.formatStack(record.stack_info)
+
+        if self.redact_pii:
+            for key in ('message', 'exc_info', 'stack_info'):
+                if key in payload:
+                    payload[key] = redact(payload[key])
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Let through one in every ``rate`` INFO/DEBUG records per call site.
+    WARNING and above always pass.
+    """
+
+    def __init__(self, rate=1, name=''):
+        super().__init__(name)
+        self.rate = max(int(rate), 1)
+        self._counters = {}
+
+    def filter(self, record):
+        if self.rate == 1 or record.levelno >= logging.WARNING:
+            return True
+        # The call site itself: keying on the message would grow without
+        # bound for messages formatted before logging
+        key = (record.pathname, record.lineno)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters.setdefault(key, itertools.count())
+        if next(counter) % self.rate:
+            return False
+        record.sample_rate = self.rate
+        return True
+
+
+class _StopListener(logging.handlers.QueueListener):
+    SENTINEL_TIMEOUT = 1.0
+
+    def enqueue_sentinel(self):
+        # Wait briefly for room when the queue is full at shutdown, but never
+        # hang exit: stop() then gives up on the backlog
+        try:
+            self.queue.put(self._sentinel, timeout=self.SENTINEL_TIMEOUT)
+        except queue.Full:
+            pass
+
+    def stop(self):
+        self.enqueue_sentinel()
+        if self._thread is not None:
+            self._thread.join(self.SENTINEL_TIMEOUT * 5)
+            self._thread = None
+
+
+class QueuedJsonHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that owns its listener thread and the JSON stream handler
+    behind it. Records are dropped (and counted) rather than blocking the
+    caller when the queue is full.
+
+    A forked child (a gunicorn worker of a preloaded app) inherits the queue
+    but not the thread, so the first record in a new process starts a fresh
+    queue and listener there; ``ensure_started`` does the same up front.
+    """
+
+    def __init__(self, stream=None, maxsize=10000, redact_pii=True):
+        super().__init__(queue.Queue(maxsize))
+        self.maxsize = maxsize
+        self.dropped = 0
+
+        target = logging.StreamHandler(stream or sys.stderr)
+        target.setFormatter(JsonFormatter(redact_pii=redact_pii))
+        self.target = target
+
+        self.listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self.ensure_started()
+        atexit.register(self.close)
+
+    def ensure_started(self):
+        """Start the listener unless it is already running in this process"""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Anything the parent left in its queue is the parent's to write
+                self.queue = queue.Queue(self.maxsize)
+            self.listener = _StopListener(self.queue, self.target)
+            self.listener.start()
+            self._pid = os.getpid()
+
+    def enqueue(self, record):
+        self.ensure_started()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # Resolve the arguments now, as callers may mutate them after the
+        # call returns, but leave formatting and traceback rendering to the
+        # listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def close(self):
+        listener, self.listener = self.listener, None
+        # A listener started by another process has no thread here to stop
+        if listener is not None and self._pid == os.getpid():
+            listener.stop()
+            self.target.close()
+        super().close()
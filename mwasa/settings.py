@@ -5,7 +5,7 @@ Django settings for mwasa project - Smart Database Configuration
 from pathlib import Path
 import os
 import sys
-from decouple import config
+from decouple import Csv, config
 import dj_database_url
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -38,6 +38,9 @@ CSRF_TRUSTED_ORIGINS = config('CSRF_TRUSTED_ORIGINS', cast=lambda v: [s.strip()
 
 # ==================== SMART DATABASE CONFIGURATION ====================
 DATABASE_URL = config('DATABASE_URL', default=None)
+# Switch to a local SQLite file when PostgreSQL is unreachable at boot. Off by
+# default: data written there is split from the main database.
+DATABASE_SQLITE_FALLBACK = config('DATABASE_SQLITE_FALLBACK', default=False, cast=bool)
 
 def test_postgres_connection(db_url):
     """Test if PostgreSQL connection is actually working"""
@@ -73,8 +76,11 @@ if IS_RAILWAY and DATABASE_URL:
     print(f"📡 Railway DATABASE_URL detected: {DATABASE_URL[:50]}...")
     
     # Test if PostgreSQL is actually accessible
-    if test_postgres_connection(DATABASE_URL):
-        # PostgreSQL is working - use it!
+    postgres_ok = test_postgres_connection(DATABASE_URL)
+    if postgres_ok or not DATABASE_SQLITE_FALLBACK:
+        # Stay on PostgreSQL even if it's down right now: submissions are
+        # journaled (content/journal.py) and replayed when it recovers,
+        # instead of landing in a separate SQLite file
         DATABASES = {
             'default': dj_database_url.config(
                 default=DATABASE_URL,
@@ -82,7 +88,10 @@ if IS_RAILWAY and DATABASE_URL:
                 conn_health_checks=True,
             )
         }
-        print("✅ PostgreSQL: Connected successfully")
+        if postgres_ok:
+            print("✅ PostgreSQL: Connected successfully")
+        else:
+            print("⚠️ PostgreSQL connection failed - submissions will be journaled until it recovers")
     else:
         # PostgreSQL failed - use SQLite fallback
         print("⚠️ PostgreSQL connection failed - using SQLite fallback")
@@ -112,6 +121,30 @@ else:
     }
     print("💻 Local SQLite database")
 
+# Optional read replica. Views marked @replica_reads (public pages, reports)
+# read from it; writes and everything else use 'default'. Locally, point it
+# at a second SQLite file and refresh it with `manage.py sync_replica`.
+REPLICA_DATABASE_URL = config('REPLICA_DATABASE_URL', default=None)
+if REPLICA_DATABASE_URL:
+    DATABASES['replica'] = dj_database_url.parse(REPLICA_DATABASE_URL, conn_max_age=600)
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    print(f"📖 Read replica: {DATABASES['replica']['ENGINE']}")
+DATABASE_ROUTERS = ['content.routers.PrimaryReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=15, cast=int)
+REPLICA_PIN_COOKIE = 'db_pin'
+
+# SQLite profile applied to every connection by content/sqlite.py (no-op on PostgreSQL)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': config('SQLITE_BUSY_TIMEOUT_MS', default=5000, cast=int),
+    'mmap_size': config('SQLITE_MMAP_SIZE', default=128 * 1024 * 1024, cast=int),
+    'cache_size': -config('SQLITE_CACHE_KB', default=20000, cast=int),  # negative = KiB
+    'temp_store': 'MEMORY',
+}
+SQLITE_IMMEDIATE_TRANSACTIONS = config('SQLITE_IMMEDIATE_TRANSACTIONS', default=True, cast=bool)
+DB_WRITE_RETRIES = config('DB_WRITE_RETRIES', default=3, cast=int)
+
 # Print database info (keeping your format)
 print(f"🔗 Database: {DATABASES['default']['ENGINE']}")
 print(f"📁 Database Name: {DATABASES['default'].get('NAME', 'N/A')}")
@@ -148,8 +181,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'content.middleware.CompressionMiddleware',  # br/zstd/gzip for dynamic responses
     'whitenoise.middleware.WhiteNoiseMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'content.prerender.PrerenderedPageMiddleware',  # pre-rendered public pages
+    'content.middleware.ReplicaRoutingMiddleware',  # replica reads + read-your-writes pin
+    'content.middleware.PublicPageSessionMiddleware',  # session-free public pages
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -171,6 +207,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'django.template.context_processors.media',
+                'content.context_processors.website_content',
             ],
             'debug': DEBUG,
         },
@@ -214,6 +251,16 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are stored under content-hashed names and served as immutable by
+# content.media.serve_media; files saved before that are cached this long
+DEFAULT_FILE_STORAGE = 'content.media.HashedMediaStorage'
+MEDIA_MAX_AGE = config('MEDIA_MAX_AGE', default=3600, cast=int)
+# '' (Django streams the file), 'x-sendfile' (Apache/lighttpd) or
+# 'x-accel-redirect' (nginx, with an internal location at MEDIA_ACCEL_PREFIX
+# aliased to MEDIA_ROOT)
+MEDIA_SENDFILE = config('MEDIA_SENDFILE', default='')
+MEDIA_ACCEL_PREFIX = config('MEDIA_ACCEL_PREFIX', default='/protected-media/')
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # ==================== EMAIL CONFIGURATION ====================
@@ -226,13 +273,39 @@ EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='pvmrxbdvvvnchynm')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='mwasawellservices@gmail.com')
 SERVER_EMAIL = config('SERVER_EMAIL', default=DEFAULT_FROM_EMAIL)
 
+# Bounded-latency sending (content/delivery.py): SMTP socket timeout, total
+# wait per message, and the circuit breaker that fails fast while SMTP is down
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=10, cast=int)
+EMAIL_SEND_DEADLINE = config('EMAIL_SEND_DEADLINE', default=15, cast=float)
+MAIL_BREAKER_THRESHOLD = config('MAIL_BREAKER_THRESHOLD', default=3, cast=int)
+MAIL_BREAKER_COOLDOWN = config('MAIL_BREAKER_COOLDOWN', default=60, cast=int)
+
+# Queued client notifications (content/outbox.py), delivered by the scheduler
+# every tick or on demand with `manage.py send_queued_emails`
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=100, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+# While the mail server is unreachable messages wait, doubling from
+# OUTBOX_RETRY_DELAY up to OUTBOX_RETRY_MAX_DELAY seconds between tries
+OUTBOX_RETRY_DELAY = config('OUTBOX_RETRY_DELAY', default=60, cast=int)
+OUTBOX_RETRY_MAX_DELAY = config('OUTBOX_RETRY_MAX_DELAY', default=3600, cast=int)
+
 # ==================== LOGGING CONFIGURATION ====================
+# Records are queued and written as JSON by a listener thread (see mwasa/log.py).
+# High-volume INFO lines are sampled per call site; warnings and errors always pass.
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'filters': {
+        'sample_info': {
+            '()': 'mwasa.log.SamplingFilter',
+            'rate': config('LOG_INFO_SAMPLE_RATE', default=1 if DEBUG else 10, cast=int),
+        },
+    },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
+            'class': 'mwasa.log.QueuedJsonHandler',
+            'filters': ['sample_info'],
+            'redact_pii': config('LOG_REDACT_PII', default=True, cast=bool),
         },
     },
     'root': {
@@ -249,6 +322,12 @@ SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 SESSION_COOKIE_AGE = 1209600
 SESSION_SAVE_EVERY_REQUEST = False
 
+# Messages live in a signed cookie so showing them never needs the session
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# How long a CDN may keep a public page; browsers always revalidate via ETag
+PUBLIC_PAGE_S_MAXAGE = config('PUBLIC_PAGE_S_MAXAGE', default=300, cast=int)
+
 # Cache configuration
 CACHES = {
     'default': {
@@ -257,6 +336,117 @@ CACHES = {
     }
 }
 
+# ==================== HEALTH PROBES ====================
+# /health/ready serves the last background check result; older than
+# HEALTH_MAX_STALENESS seconds counts as not ready.
+HEALTH_CHECK_INTERVAL = config('HEALTH_CHECK_INTERVAL', default=15, cast=int)
+HEALTH_MAX_STALENESS = config('HEALTH_MAX_STALENESS', default=60, cast=int)
+MAIL_BACKLOG_THRESHOLD = config('MAIL_BACKLOG_THRESHOLD', default=20, cast=int)
+
+# ==================== ANALYTICS ROLLUPS ====================
+# Each refresh also re-aggregates this many days before the high-water mark
+# so recent status changes show up; older ones need `manage.py backfill_rollups`.
+ROLLUP_RESTATE_DAYS = config('ROLLUP_RESTATE_DAYS', default=7, cast=int)
+ROLLUP_CACHE_SECONDS = config('ROLLUP_CACHE_SECONDS', default=300, cast=int)
+
+# ==================== BLOG SEARCH ====================
+BLOG_SEARCH_PAGE_SIZE = config('BLOG_SEARCH_PAGE_SIZE', default=10, cast=int)
+# Only queries seen this often within an hour are cached, until content changes
+BLOG_SEARCH_CACHE_MIN_HITS = config('BLOG_SEARCH_CACHE_MIN_HITS', default=2, cast=int)
+BLOG_SEARCH_CACHE_SECONDS = config('BLOG_SEARCH_CACHE_SECONDS', default=600, cast=int)
+
+# ==================== CLIENT IDENTITY INDEX ====================
+# Country code assumed for local phone numbers when normalizing to E.164
+CLIENT_DEFAULT_COUNTRY_CODE = config('CLIENT_DEFAULT_COUNTRY_CODE', default='254')
+
+# ==================== SUBMISSION ARCHIVE ====================
+# `manage.py archive_submissions` moves older contact messages and finished
+# bookings into gzip JSONL partitions under ARCHIVE_ROOT
+ARCHIVE_ROOT = Path(config('ARCHIVE_ROOT', default=str(BASE_DIR / 'archive')))
+ARCHIVE_AFTER_DAYS = config('ARCHIVE_AFTER_DAYS', default=365, cast=int)
+
+# ==================== PRE-RENDERED PAGES ====================
+# `manage.py prerender_site` (and any content edit, PRERENDER_DELAY seconds
+# after it commits) writes the public pages plus .gz/.br variants here
+PRERENDER_ENABLED = config('PRERENDER_ENABLED', default=True, cast=bool)
+PRERENDER_ROOT = Path(config('PRERENDER_ROOT', default=str(BASE_DIR / 'prerendered')))
+PRERENDER_DELAY = config('PRERENDER_DELAY', default=2.0, cast=float)
+PRERENDER_HOST = config('PRERENDER_HOST', default='')
+
+# ==================== DEPLOY WARM-UP ====================
+# gunicorn.conf.py primes caches and pre-renders once per deploy, then each
+# worker opens its database connections, compiles templates and requests
+# WARMUP_URLS before it accepts traffic (`manage.py warm_up` runs the same)
+WARMUP_ENABLED = config('WARMUP_ENABLED', default=True, cast=bool)
+WARMUP_URLS = config('WARMUP_URLS', default='/,/services/,/blog/', cast=Csv())
+
+# ==================== SUBMISSION APIS ====================
+# JSON bodies larger than this are refused with 413 before they are parsed
+SUBMISSION_MAX_BODY_BYTES = config('SUBMISSION_MAX_BODY_BYTES', default=32768, cast=int)
+# /api/group-registration/ takes a whole training roster in one request
+GROUP_REGISTRATION_MAX_ATTENDEES = config('GROUP_REGISTRATION_MAX_ATTENDEES', default=200, cast=int)
+GROUP_REGISTRATION_MAX_BODY_BYTES = config('GROUP_REGISTRATION_MAX_BODY_BYTES', default=262144, cast=int)
+
+# ==================== ADMIN NOTIFICATIONS ====================
+# 'immediate' emails the admin about every booking, contact message and
+# subscriber; 'digest' collects them for the scheduler (or `manage.py
+# send_admin_digest`), which sends at most one summary per window
+ADMIN_NOTIFY_MODE = config('ADMIN_NOTIFY_MODE', default='immediate')
+ADMIN_DIGEST_WINDOW = config('ADMIN_DIGEST_WINDOW', default=3600, cast=int)
+# New bookings still alert the admin straight away in digest mode
+ADMIN_DIGEST_BOOKINGS_IMMEDIATE = config('ADMIN_DIGEST_BOOKINGS_IMMEDIATE', default=True, cast=bool)
+ADMIN_DIGEST_MAX_ITEMS = config('ADMIN_DIGEST_MAX_ITEMS', default=500, cast=int)
+
+# ==================== APPOINTMENT REMINDERS ====================
+# The scheduler queues a reminder this many minutes before each appointment
+# in REMINDER_STATUSES (default: a day and 2 hours)
+REMINDER_OFFSETS = config('REMINDER_OFFSETS', default='1440,120', cast=Csv(int))
+REMINDER_STATUSES = config('REMINDER_STATUSES', default='pending,confirmed', cast=Csv())
+
+# ==================== SCHEDULER ====================
+# `manage.py run_scheduler` (content/scheduler.py) queues reminders, delivers
+# the outbox and sends the admin digest every SCHEDULER_TICK_SECONDS, and
+# recounts the dashboard counters every COUNTERS_RECONCILE_SECONDS. With
+# SCHEDULER_IN_WEB, gunicorn's master keeps one running next to the workers;
+# turn it off when run_scheduler is deployed as its own service.
+SCHEDULER_TICK_SECONDS = config('SCHEDULER_TICK_SECONDS', default=60, cast=int)
+SCHEDULER_IN_WEB = config('SCHEDULER_IN_WEB', default=True, cast=bool)
+COUNTERS_RECONCILE_SECONDS = config('COUNTERS_RECONCILE_SECONDS', default=3600, cast=int)
+
+# ==================== SPAM PREFILTER ====================
+# Checks run on the contact endpoints before any database write or email
+SPAM_FILTER_ENABLED = config('SPAM_FILTER_ENABLED', default=True, cast=bool)
+# Hidden form field that only bots fill in
+SPAM_HONEYPOT_FIELD = config('SPAM_HONEYPOT_FIELD', default='website')
+# Forms sent sooner than this after /api/csrf/ issued their token are held
+SPAM_MIN_FILL_SECONDS = config('SPAM_MIN_FILL_SECONDS', default=3, cast=int)
+SPAM_FORM_TOKEN_MAX_AGE = config('SPAM_FORM_TOKEN_MAX_AGE', default=86400, cast=int)
+# More than SPAM_BURST_LIMIT submissions from one address per window are held
+SPAM_BURST_LIMIT = config('SPAM_BURST_LIMIT', default=3, cast=int)
+SPAM_BURST_WINDOW = config('SPAM_BURST_WINDOW', default=600, cast=int)
+SPAM_BLOOM_CAPACITY = config('SPAM_BLOOM_CAPACITY', default=100000, cast=int)
+SPAM_BLOOM_REFRESH = config('SPAM_BLOOM_REFRESH', default=60, cast=int)
+
+# ==================== RESPONSE COMPRESSION ====================
+# Dynamic responses are compressed with brotli or zstd when those packages are
+# installed, gzip otherwise. Above COMPRESSION_HIGH_LOAD (1-minute load average
+# per CPU) the cheapest levels are used; above COMPRESSION_MAX_LOAD only
+# already-compressed bodies from the in-process cache are served compressed.
+COMPRESSION_ENABLED = config('COMPRESSION_ENABLED', default=True, cast=bool)
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=860, cast=int)
+COMPRESSION_HIGH_LOAD = config('COMPRESSION_HIGH_LOAD', default=0.75, cast=float)
+COMPRESSION_MAX_LOAD = config('COMPRESSION_MAX_LOAD', default=1.5, cast=float)
+COMPRESSION_CACHE_ENTRIES = config('COMPRESSION_CACHE_ENTRIES', default=256, cast=int)
+COMPRESSION_CACHE_MAX_BYTES = config('COMPRESSION_CACHE_MAX_BYTES', default=1048576, cast=int)
+
+# ==================== SUBMISSION JOURNAL ====================
+# Submissions the database can't take are appended to an fsync'd journal here,
+# acknowledged with 202 and replayed in order every JOURNAL_REPLAY_INTERVAL
+# seconds once it's back. On Railway, mount a volume here so a redeploy during
+# an outage doesn't discard it.
+JOURNAL_ROOT = Path(config('JOURNAL_ROOT', default=str(BASE_DIR / 'journal')))
+JOURNAL_REPLAY_INTERVAL = config('JOURNAL_REPLAY_INTERVAL', default=15, cast=int)
+
 # ==================== DEVELOPMENT/PRODUCTION NOTICE ====================
 if DEBUG:
     print("🎯 Running in DEVELOPMENT mode")
@@ -1,7 +1,10 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from content.media import serve_media
 
 admin.site.site_header = "MWASAMWADA WELL-BEING SERVICES ADMIN DASHBOARD"
 admin.site.site_title = "MWASAMWADA ADMIN PORTAL"
@@ -12,6 +15,8 @@ urlpatterns = [
     path('', include('content.urls')),  # include app URLs
 ]
 
-# Serve media files in development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Uploaded media in every environment: cache headers, conditional and range
+# requests, and X-Sendfile/X-Accel-Redirect when MEDIA_SENDFILE is set
+urlpatterns += [
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+]